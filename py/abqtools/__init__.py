@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+
+''' 
+ ARTS ET METIERS - ABAQUS DEMOS
+ 
+ Helper modules shared by the demo scripts
+ 
+ PIMM - PARIS - FRANCE
+ 
+ v0.0 - 18/10/2026
+'''
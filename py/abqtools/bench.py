@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+'''
+ ARTS ET METIERS - ABAQUS DEMOS
+
+ Benchmark of the demos on a ladder of element sizes (param['selt']/level)
+ build, write, solve and post times (from <demo>_timing.json), deck size, nodes and DOF
+ per level, scaling exponents t ~ DOF^k per phase fitted over the ladder
+
+ usage: python bench.py [--run] [--levels 1,2,4,8] [--out bench.json] [--against old.json] [demo_X.py ...]
+        (deck-only by default: param['run']=False, no solver licence needed)
+        [--worker queuedir]: decks built by a persistent CAE worker (worker.py) instead of one kernel per level
+
+ PIMM - PARIS - FRANCE
+
+ v0.0 - 18/10/2026
+'''
+
+import os
+import re
+import sys
+import ast
+import glob
+import json
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from abqtools.sweep import ABAQUS, run_point
+from abqtools.inpreader import read_inp
+
+LEVELS = (1, 2, 4, 8)
+# entries of param['selt'] that are element sizes (others: deviation factors)
+SIZE_INDEX = dict([('demo_PlateWithHole', (0, )), ('demo_CrossPlate', (0, )), ('demo_MeshedCrossSectionBeam', (0, 1))])
+
+
+def base_selt(script):
+ ''' param['selt'] as written in the demo source '''
+ with open(script) as f:
+  m = re.search(r"^param\['selt'\]\s*=\s*([^#\n]+)", f.read(), re.M)
+ return ast.literal_eval(m.group(1).strip())
+
+
+def scaled_selt(script, level):
+ ''' element size(s) divided by level '''
+ selt = base_selt(script); name = os.path.basename(script)[:-3]
+ if not isinstance(selt, (list, tuple)): return selt/float(level)
+ return [x/float(level) if j1 in SIZE_INDEX.get(name, range(len(selt))) else x for j1, x in enumerate(selt)]
+
+
+def element_dofs(etype):
+ ''' active degrees of freedom per node of an element type '''
+ t = etype.upper()
+ if t.startswith(('DC', 'WARP')): return 1
+ if t.startswith(('B3', 'S')): return 6
+ if t.startswith('B2'): return 3
+ d = 2 if t.startswith(('CPS', 'CPE', 'CAX', 'T2D')) else 3
+ return d+1 if t.endswith(('E', 'T')) else d
+
+
+def deck_size(mesh):
+ ''' nodes and DOF of a deck, parts counted once per instance '''
+ count = dict()
+ for x in mesh['instances'].values(): count[x] = count.get(x, 0)+1
+ nn, ndof = 0, 0
+ for scope, (lab, xyz) in mesh['nodes'].items():
+  if len(lab)==0: continue
+  d = np.zeros(int(np.max(lab))+1, dtype=np.int64)
+  for key, (elab, conn) in mesh['elements'].items():
+   if (key.rsplit('.', 1)[0] if '.' in key else '')!=scope: continue
+   c = np.asarray(conn).ravel(); c = c[(c>0) & (c<len(d))]
+   np.maximum.at(d, c, element_dofs(key.rsplit('.', 1)[-1]))
+  k = count.get(scope, 1) if scope else 1
+  nn += k*len(lab); ndof += k*int(np.sum(d[np.asarray(lab)]))
+ return nn, ndof
+
+
+def decks(workdir):
+ ''' main input files of a work directory (files *INCLUDEd by another deck excluded) '''
+ allinp = sorted(glob.glob(os.path.join(workdir, '*.inp'))); meshes = dict(); inc = set()
+ for x in allinp:
+  if os.path.abspath(x) in inc: continue
+  meshes[x] = read_inp(x, cache=False); inc.update(meshes[x]['files'][1:])
+ return dict([(k, v) for k, v in meshes.items() if os.path.abspath(k) not in inc]), allinp
+
+
+def category(phase):
+ if phase.endswith('SOLVE') or phase=='RUN': return 'solve'
+ if phase.startswith(('POST', 'PRINT')): return 'post'
+ return 'build'
+
+
+def measure(script, level, workroot, run=False, cmd=ABAQUS, queue=None):
+ ''' build (and solve if run) one level of the ladder -> dict of metrics '''
+ name = os.path.basename(script)[:-3]; workdir = os.path.join(workroot, name, 'L'+str(level))
+ ftime = os.path.join(workdir, name+'_timing.json')
+ if os.path.isfile(ftime): os.remove(ftime)
+ selt = scaled_selt(script, level)
+ status, wall = run_point(script, dict([('param', dict([('selt', selt), ('run', run)]))]), workdir, cmd=cmd, queue=queue)
+ out = dict([('level', level), ('selt', selt), ('status', status), ('wall', wall)])
+ if not os.path.isfile(ftime): return out
+ with open(ftime) as f: rec = json.load(f)
+ phases = dict([(str(k), v['wall']) for k, v in rec['summary'].items()])
+ for key in ('build', 'solve', 'post'): out[key] = sum([v for k, v in phases.items() if category(k)==key])
+ out['write'] = sum([v for k, v in phases.items() if k.endswith('WRITE INPUT')])
+ out['phases'] = phases; out['rss_peak_mb'] = rec['rss_peak_mb']
+ meshes, allinp = decks(workdir)
+ out['deck_mb'] = sum([os.path.getsize(x) for x in allinp])/1024.**2
+ sizes = [deck_size(x) for x in meshes.values()]
+ out['nodes'] = sum([x[0] for x in sizes]); out['dof'] = sum([x[1] for x in sizes])
+ return out
+
+
+def exponent(n, t, tmin=1e-2):
+ ''' slope of log(t) vs log(n) (None with less than 2 usable points) '''
+ n, t = np.asarray(n, dtype=float), np.asarray(t, dtype=float)
+ ok = (n>0) & (t>tmin)
+ if len(np.unique(n[ok]))<2: return None
+ return float(np.polyfit(np.log(n[ok]), np.log(t[ok]), 1)[0])
+
+
+def exponents(points, tmin=1e-2):
+ ''' scaling exponents vs DOF of the phase categories and of every phase '''
+ points = [x for x in points if 'dof' in x]
+ n = [x['dof'] for x in points]; out = dict()
+ for key in ('build', 'write', 'solve', 'post', 'deck_mb'):
+  out[key] = exponent(n, [x[key] for x in points], tmin=0. if key=='deck_mb' else tmin)
+ names = set(sum([list(x['phases'].keys()) for x in points], []))
+ for key in sorted(names): out['phase:'+key] = exponent(n, [x['phases'].get(key, 0.) for x in points], tmin=tmin)
+ return out
+
+
+def benchmark(scripts, levels=LEVELS, run=False, workroot=None, cmd=ABAQUS, queue=None):
+ ''' ladder of every script -> report dict (json) '''
+ workroot = workroot or os.path.join(os.getcwd(), 'bench')
+ report = dict([('levels', list(levels)), ('run', run), ('scripts', dict())])
+ for script in scripts:
+  points = [measure(script, level, workroot, run=run, cmd=cmd, queue=queue) for level in levels]
+  report['scripts'][os.path.basename(script)[:-3]] = dict([('points', points), ('exponents', exponents(points))])
+ return report
+
+
+def compare(old, new, tol=0.3):
+ ''' phases whose scaling exponent grew by more than tol -> [(script, key, old, new)] '''
+ out = []
+ for name, v in new['scripts'].items():
+  if name not in old['scripts']: continue
+  e0 = old['scripts'][name]['exponents']
+  for key, k1 in sorted(v['exponents'].items()):
+   k0 = e0.get(key)
+   if k0 is not None and k1 is not None and k1-k0>tol: out.append((name, key, k0, k1))
+ return out
+
+
+def print_report(report):
+ fmt = lambda x: '%9.3g' % x if isinstance(x, (int, float)) else '%9s' % '-'
+ for name in sorted(report['scripts'].keys()):
+  v = report['scripts'][name]; print(name)
+  print('    level      dof    nodes  deck_MB    build    write    solve     post')
+  for x in v['points']:
+   print(' '.join([fmt(x.get(k)) for k in ('level', 'dof', 'nodes', 'deck_mb', 'build', 'write', 'solve', 'post')])
+     +('' if x['status']==0 else '  (status '+str(x['status'])+')'))
+  print('  exponents t ~ DOF^k: '+', '.join([k+'='+('%.2f' % e) for k, e in sorted(v['exponents'].items())
+     if e is not None and not k.startswith('phase:')]))
+
+
+if __name__=='__main__':
+ parser = argparse.ArgumentParser(description='benchmark of the demos on a ladder of element sizes')
+ parser.add_argument('scripts', nargs='*')
+ parser.add_argument('--run', action='store_true', help='solve and post-process (default: deck only)')
+ parser.add_argument('--levels', default=','.join([str(x) for x in LEVELS]), help='refinement factors of selt')
+ parser.add_argument('--out', default='bench.json')
+ parser.add_argument('--against', default='', help='previous report: flag exponents grown by more than 0.3')
+ parser.add_argument('--worker', default='', help='queue of a persistent CAE worker (worker.py) building the decks')
+ args = parser.parse_args()
+ scripts = args.scripts or sorted(glob.glob(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'demo_*.py')))
+ report = benchmark(scripts, levels=[int(x) for x in args.levels.split(',')], run=args.run, queue=args.worker or None)
+ with open(args.out, 'w') as f: json.dump(report, f, indent=1, sort_keys=True)
+ print_report(report)
+ if args.against:
+  with open(args.against) as f: old = json.load(f)
+  for name, key, k0, k1 in compare(old, report): print('check scaling: '+name+' '+key+' '+('%.2f -> %.2f' % (k0, k1)))
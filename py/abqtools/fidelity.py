@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+'''
+ ARTS ET METIERS - ABAQUS DEMOS
+
+ Multi-fidelity driver of the plate demos (demo_PlateWithHole, demo_CrossPlate):
+ plane stress model first, 3D model (symmetric eighth) only when through-thickness
+ effects are expected (thickness/radius, stress gradient at the hole over the thickness)
+
+ usage: python fidelity.py demo_PlateWithHole.py [point.json] [--validate] [--worker queuedir]
+        (--validate: 3D model run in any case, error of the 2D peak stress and speedup)
+
+ PIMM - PARIS - FRANCE
+
+ v0.0 - 18/10/2026
+'''
+
+import os
+import sys
+import copy
+import json
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from abqtools.sweep import ABAQUS, run_point
+
+# 3D model needed above these values (t: thickness, r: hole radius, g: relative stress gradient at the hole)
+THRESHOLDS = dict([('t_over_r', 0.5), ('t_grad', 1.2)])
+
+
+# component layouts by column count (field.componentLabels of the ODB given to mises overrides them)
+LAYOUTS = dict([(3, ('S11', 'S22', 'S12')), (4, ('S11', 'S22', 'S33', 'S12')), (6, ('S11', 'S22', 'S33', 'S12', 'S13', 'S23'))])
+
+
+def mises(s, labels=None):
+ ''' von Mises stress of [n, ncomp] components named by labels (default: LAYOUTS, plane stress
+     (S11, S22, S12), plane strain/axisymmetric (S11, S22, S33, S12), 3D), ValueError otherwise '''
+ s = np.asarray(s, dtype=float)
+ labels = [str(x).upper() for x in labels] if labels is not None else LAYOUTS.get(s.shape[1])
+ if labels is None or len(labels)!=s.shape[1] or not set(labels)<=set(LAYOUTS[6]):
+  raise ValueError('unknown stress components: '+str(labels or s.shape[1]))
+ c = dict([(k, s[:,j1]) for j1, k in enumerate(labels)]); z = np.zeros(len(s))
+ s11, s22, s33 = [c.get(k, z) for k in ('S11', 'S22', 'S33')]
+ sh = sum([c.get(k, z)**2 for k in ('S12', 'S13', 'S23')])
+ return np.sqrt(0.5*((s11-s22)**2+(s22-s33)**2+(s33-s11)**2)+3.*sh)
+
+
+def hole_stress(xyz, s, center, rad, h, thickness=None):
+ ''' peak stress on the hole edge, its relative gradient along the ligament (fit of the Kirsch form
+     over max(3 element sizes, rad/2))
+     and, for the 3D model (symmetry plane z=0), the ratio mid-plane / free surface of the peak '''
+ xyz = np.asarray(xyz, dtype=float); d = xyz[:,:2]-np.asarray(center, dtype=float)[None,:]; r = np.sqrt(np.sum(d**2, 1))
+ edge = np.abs(r-rad)<0.25*h
+ ipk = np.flatnonzero(edge)[np.argmax(s[edge])]; smax = float(s[ipk])
+ e = d[ipk]/r[ipk]; zt = 1e-6*max(rad, thickness or 0.)
+ plane = np.abs(xyz[:,2]-xyz[ipk,2])<zt
+ along = np.dot(d, e); across = np.abs(d[:,0]*e[1]-d[:,1]*e[0])
+ for w in (0.5*h, h, 2.*h):
+  lig = plane & (across<w) & (along>=rad-0.25*h) & (along<=rad+max(3.*h, 0.5*rad))
+  npt = len(np.unique(np.round(along[lig]/(0.25*h))))
+  if npt>=4: break
+ #Kirsch form s = A+B*u+C*u^2, u = (rad/x)^2 (B*u only with 2-3 points) -> ds/dx at x=rad
+ u = (rad/np.maximum(along[lig], 0.5*rad))**2
+ if npt>=4: slope = -2./rad*np.dot(np.polyfit(u, s[lig], 2)[:2], [2., 1.])
+ elif npt>=2: slope = -2./rad*np.polyfit(u, s[lig], 1)[0]
+ else: slope = 0.
+ out = dict([('smax', smax), ('xpeak', xyz[ipk].tolist()), ('grad', float(-slope/smax))])
+ if thickness:
+  out['t_grad'] = float(thickness*out['grad']); out['t_over_r'] = float(thickness/rad)
+  if np.max(xyz[:,2])>zt:
+   mid, surf = edge & (xyz[:,2]<zt), edge & (xyz[:,2]>np.max(xyz[:,2])-zt)
+   if np.any(mid) and np.any(surf): out['kz'] = float(np.max(s[mid])/np.max(s[surf]))
+ return out
+
+
+def needs_3d(res, thresholds=THRESHOLDS):
+ ''' indicators of the plane stress run exceeding their threshold '''
+ return [k for k, v in sorted(thresholds.items()) if res.get(k, 0.)>v]
+
+
+def _results(workdir, script):
+ fname = os.path.join(workdir, os.path.basename(script)[:-3]+'_results.json')
+ if not os.path.isfile(fname): return None
+ with open(fname) as f: return json.load(f)
+
+
+def adaptive(script, point=None, workroot=None, validate=False, thresholds=THRESHOLDS, cmd=ABAQUS, queue=None):
+ ''' plane stress run, then the 3D run if an indicator exceeds its threshold (or validate)
+     -> report: results and wall time per model, triggers, speedup and 2D error when both ran '''
+ workroot = workroot or os.path.join(os.getcwd(), 'fidelity'); report = dict([('script', os.path.basename(script))])
+ for idim in (2, 3):
+  p = copy.deepcopy(point or dict()); p.setdefault('param', dict()).update(dict([('idim', idim), ('run', True)]))
+  workdir = os.path.join(workroot, str(idim)+'D')
+  status, wall = run_point(script, p, workdir, cmd=cmd, queue=queue)
+  report[str(idim)+'D'] = dict([('status', status), ('wall', wall), ('results', _results(workdir, script))])
+  if idim==2:
+   res = report['2D']['results']
+   report['triggers'] = needs_3d(res, thresholds) if status==0 and res else ['2D run failed']
+   if not report['triggers'] and not validate: break
+ if '3D' in report and report['2D']['results'] and report['3D']['results']:
+  report['speedup'] = report['3D']['wall']/max(report['2D']['wall'], 1e-9)
+  report['error_2d'] = report['2D']['results']['smax']/report['3D']['results']['smax']-1.
+ report['model'] = '3D' if report['triggers'] else '2D'
+ return report
+
+
+def print_report(report):
+ for key in ('2D', '3D'):
+  if key not in report: continue
+  v = report[key]; res = v['results'] or dict()
+  print(key+': status '+str(v['status'])+', wall %.1f s' % v['wall']+', '+', '.join([k+'=%.4g' % res[k]
+    for k in ('smax', 'grad', 't_over_r', 't_grad', 'kz') if k in res]))
+ print('model retained: '+report['model']+(' ('+', '.join(report['triggers'])+' above threshold)' if report['triggers'] else ''))
+ if 'speedup' in report: print('2D peak stress error %+.2f%%, speedup of the 2D model x%.1f' % (100.*report['error_2d'], report['speedup']))
+
+
+if __name__=='__main__':
+ queue = sys.argv[sys.argv.index('--worker')+1] if '--worker' in sys.argv else None
+ args = [x for x in sys.argv[1:] if not x.startswith('--') and x!=queue]
+ point = dict()
+ if len(args)>1:
+  with open(args[1]) as f: point = json.load(f)
+ report = adaptive(args[0], point, validate='--validate' in sys.argv, queue=queue)
+ with open(os.path.basename(args[0])[:-3]+'_fidelity.json', 'w') as f: json.dump(report, f, indent=1, sort_keys=True)
+ print_report(report)
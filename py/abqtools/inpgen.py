@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+'''
+ ARTS ET METIERS - ABAQUS DEMOS
+
+ CAE-free input file generator for the plate demos (PlateWithHole, CrossPlate)
+ structured quad/hex mesh of the quarter plate, same param dict as the demos
+
+ usage: python inpgen.py PlateWithHole|CrossPlate [jobname]
+
+ PIMM - PARIS - FRANCE
+
+ v0.0 - 18/10/2026
+'''
+
+import os
+import sys
+import numpy as np
+
+tol1 = 1e-9
+
+# default parameters of the demos (units: SI)
+PARAM = dict()
+PARAM['PlateWithHole'] = dict([('idim', 3), ('dim', [50.e-3, 50.e-3, 5.e-3]), ('rad', 5.e-3), ('selt', [1.0e-3, 0.1]),
+   ('quad', False), ('load', [1.e-3, 0.e-3]), ('run', False)])
+PARAM['CrossPlate'] = dict([('idim', 2), ('dim', [30.e-3, 30.e-3, 5.e-3]), ('rad', 8.e-3), ('selt', [1.0e-3, 0.1]),
+   ('quad', False), ('load', [1.e-3, 1.e-3]), ('run', False)])
+MAT = dict([('alu', dict([('dens', 2700.), ('elastic', (70.0e9, 0.3))]))])
+
+
+def spacing(n, bias=1.):
+ ''' n+1 points in [0,1], element size growing geometrically by 'bias' from 0 to 1 '''
+ if n<1: return np.array([0., 1.])
+ if abs(bias-1.)<1e-12: return np.linspace(0., 1., n+1)
+ q = bias**(1./max(n-1, 1)); h = q**np.arange(n)
+ return np.r_[0., np.cumsum(h)/np.sum(h)]
+
+
+def midpoints(t):
+ ''' insert the mid-points of consecutive values (nodes of quadratic elements) '''
+ t = np.asarray(t, dtype=float); return np.c_[t[:-1], 0.5*(t[:-1]+t[1:])].ravel().tolist()+[t[-1]]
+
+
+def ring_grid(center, rad, outer, s1, s2, t):
+ ''' structured grid between an arc (centre, radius) and a polyline outer=[P0,Pc,P1], the arc
+     being split at the direction of Pc; s1, s2, t in [0,1] -> points [len(s1)+len(s2)-1, len(t), 2] '''
+ center = np.asarray(center, dtype=float); P0, Pc, P1 = [np.asarray(x, dtype=float) for x in outer]
+ th = [np.arctan2(*(P-center)[::-1]) for P in (P0, Pc, P1)]
+ # keep the angles monotonic
+ th[1] = th[0]+np.angle(np.exp(1j*(th[1]-th[0]))); th[2] = th[1]+np.angle(np.exp(1j*(th[2]-th[1])))
+ s1 = np.asarray(s1, dtype=float); s2 = np.asarray(s2, dtype=float)[1:]
+ ang = np.r_[th[0]+s1*(th[1]-th[0]), th[1]+s2*(th[2]-th[1])]
+ out = np.r_[P0+s1[:,None]*(Pc-P0), Pc+s2[:,None]*(P1-Pc)]
+ arc = center+rad*np.c_[np.cos(ang), np.sin(ang)]
+ t = np.asarray(t, dtype=float)
+ return arc[:,None,:]*(1.-t[None,:,None])+out[:,None,:]*t[None,:,None]
+
+
+def plate_outline(param, geometry):
+ ''' arc centre and outer polyline of the quarter plate '''
+ a, b = param['dim'][0]/2., param['dim'][1]/2.
+ if geometry=='CrossPlate': return (a, b), [(a, 0.), (0., 0.), (0., b)]
+ return (0., 0.), [(a, 0.), (a, b), (0., b)]
+
+
+def plate_divisions(param, geometry, bias=1.):
+ ''' number of elements (arc part 1, arc part 2, radial) for the element size param['selt'][0] '''
+ h = param['selt'][0]; r = param['rad']
+ center, outer = plate_outline(param, geometry)
+ c, P = np.asarray(center), [np.asarray(x) for x in outer]
+ th = [np.arctan2(*(x-c)[::-1]) for x in P]
+ d1 = abs(np.angle(np.exp(1j*(th[1]-th[0])))); d2 = abs(np.angle(np.exp(1j*(th[2]-th[1]))))
+ n1 = int(np.ceil(max(r*d1, np.linalg.norm(P[1]-P[0]))/h)); n2 = int(np.ceil(max(r*d2, np.linalg.norm(P[2]-P[1]))/h))
+ nr = int(np.ceil((np.linalg.norm(P[1]-c)-r)/h))
+ return max(n1, 1), max(n2, 1), max(nr, 1)
+
+
+def _arc_angles(center, outer):
+ ''' angles of the hole arc on both sides of the centre-corner line (P0 side, P1 side) '''
+ th = [np.arctan2(x[1]-center[1], x[0]-center[0]) for x in outer]
+ return abs(np.angle(np.exp(1j*(th[1]-th[0])))), abs(np.angle(np.exp(1j*(th[2]-th[1]))))
+
+
+def graded_divisions(param, geometry, nelt, bias=1.):
+ ''' (arc part 1, arc part 2, radial) divisions for about nelt in-plane elements, radial sizes growing
+     by the ratio bias from the hole, first radial size as close as possible to the arc element size '''
+ r = param['rad']; center, outer = plate_outline(param, geometry)
+ d1, d2 = _arc_angles(center, outer)
+ L = np.linalg.norm(np.asarray(outer[1])-np.asarray(center))-r; best = None
+ for nr in range(1, max(2, int(nelt)//2+1)):
+  n = max(2, int(round(nelt/float(nr)))); n1 = min(max(1, int(round(n*d1/(d1+d2)))), n-1)
+  err = abs(np.log(L*spacing(nr, bias)[1]/(r*(d1+d2)/n)))
+  if best is None or err<best[0]: best = (err, (n1, n-n1, nr))
+ return best[1]
+
+
+def arc_size(param, geometry, div):
+ ''' element size along the hole of the (arc part 1, arc part 2, radial) divisions '''
+ return param['rad']*sum(_arc_angles(*plate_outline(param, geometry)))/(div[0]+div[1])
+
+
+def quad_connectivity(ni, nj, order=1):
+ ''' connectivity of a structured (ni x nj elements) grid numbered i*(order*nj+1)+j '''
+ m = order*nj+1; I, J = np.meshgrid(np.arange(ni)*order, np.arange(nj)*order, indexing='ij')
+ I, J = I.ravel(), J.ravel(); nid = lambda di, dj: (I+di)*m+(J+dj)
+ conn = [nid(0,0), nid(order,0), nid(order,order), nid(0,order)]
+ if order==2: conn += [nid(1,0), nid(2,1), nid(1,2), nid(0,1)]
+ return np.column_stack(conn)
+
+
+def plate_mesh(param, geometry='PlateWithHole', bias=1., div=None):
+ ''' nodes [n,2|3], connectivity, element type, node sets of the quarter plate '''
+ order = 2 if param['quad'] else 1
+ n1, n2, nr = div if div is not None else plate_divisions(param, geometry, bias)
+ center, outer = plate_outline(param, geometry)
+ # grid at node resolution (midside nodes for quadratic elements)
+ s1, s2, t = np.linspace(0., 1., n1+1), np.linspace(0., 1., n2+1), spacing(nr, bias)
+ if order==2: s1, s2, t = midpoints(s1), midpoints(s2), midpoints(t)
+ g = ring_grid(center, param['rad'], outer, s1, s2, t)
+ xy = g.reshape(-1, 2); conn = quad_connectivity(n1+n2, nr, order)
+ # counter-clockwise ordering
+ p = xy[conn[0,:4]]; area = np.sum(p[:,0]*np.roll(p[:,1], -1)-np.roll(p[:,0], -1)*p[:,1])
+ if area<0: conn = conn[:, [0,3,2,1]+([7,6,5,4] if order==2 else [])]
+ #
+ if param['idim']==3:
+  nz = int(np.ceil(param['dim'][2]/2./param['selt'][0])); z = np.linspace(0., param['dim'][2]/2., order*nz+1)
+  nxy = xy.shape[0]; xyz = np.c_[np.tile(xy, (len(z), 1)), np.repeat(z, nxy)]
+  k = np.arange(nz)*order; lay = lambda c, dz: (c[None,:,:]+(k[:,None,None]+dz)*nxy).reshape(-1, c.shape[1])
+  if order==1:
+   conn = np.c_[lay(conn, 0), lay(conn, 1)]; etype = 'C3D8'
+  else:
+   conn = np.c_[lay(conn[:,:4], 0), lay(conn[:,:4], 2), lay(conn[:,4:], 0), lay(conn[:,4:], 2), lay(conn[:,:4], 1)]; etype = 'C3D20'
+ else:
+  xyz = xy; etype = 'CPS8' if order==2 else 'CPS4'
+ # drop unused nodes (centre nodes of the quadratic grid), labels start at 1
+ used = np.unique(conn); newid = np.zeros(xyz.shape[0], dtype=np.int64); newid[used] = np.arange(1, len(used)+1)
+ xyz = xyz[used]; conn = newid[conn]
+ #
+ a, b = param['dim'][0]/2., param['dim'][1]/2.; sets = dict()
+ sets['x0'] = np.flatnonzero(xyz[:,0]<tol1)+1; sets['y0'] = np.flatnonzero(xyz[:,1]<tol1)+1
+ sets['xL'] = np.flatnonzero(xyz[:,0]>a-tol1)+1; sets['yL'] = np.flatnonzero(xyz[:,1]>b-tol1)+1
+ if param['idim']==3: sets['z0'] = np.flatnonzero(xyz[:,2]<tol1)+1
+ return xyz, conn, etype, sets
+
+
+def write_labels(f, labels, per_line=16):
+ labels = np.asarray(labels, dtype=np.int64); n = len(labels)//per_line*per_line
+ if n: np.savetxt(f, labels[:n].reshape(-1, per_line), fmt='%d', delimiter=', ')
+ if n<len(labels): f.write(', '.join([str(x) for x in labels[n:]])+'\n')
+
+
+def write_mesh(f, xyz, conn, etype, nsets=None, elsets=None):
+ ''' *Node, *Element, *Nset, *Elset blocks '''
+ f.write('*Node\n'); np.savetxt(f, np.c_[np.arange(1, xyz.shape[0]+1), xyz], fmt=['%d']+['%.12g']*xyz.shape[1], delimiter=', ')
+ f.write('*Element, type='+etype+'\n')
+ data = np.c_[np.arange(1, conn.shape[0]+1), conn]
+ # at most 16 values on the first line
+ if data.shape[1]<=16: np.savetxt(f, data, fmt='%d', delimiter=', ')
+ else: np.savetxt(f, data, fmt=', '.join(['%d']*15)+',\n'+', '.join(['%d']*(data.shape[1]-15)))
+ for key in sorted((nsets or dict()).keys()):
+  f.write('*Nset, nset='+key+'\n'); write_labels(f, nsets[key])
+ for key in sorted((elsets or dict()).keys()):
+  f.write('*Elset, elset='+key+'\n'); write_labels(f, elsets[key])
+
+
+def write_plate_inp(fname, param, geometry='PlateWithHole', mat=MAT, bias=1., div=None):
+ ''' input file of the plate demos (same model as the CAE script) -> number of nodes, elements '''
+ xyz, conn, etype, sets = plate_mesh(param, geometry, bias=bias, div=div)
+ name = list(mat.keys())[0]
+ with open(fname, 'w') as f:
+  f.write('*Heading\n demo_'+geometry+' (abqtools.inpgen)\n')
+  write_mesh(f, xyz, conn, etype, nsets=sets, elsets=dict([('sample', np.arange(1, conn.shape[0]+1))]))
+  f.write('*Solid Section, elset=sample, material='+name+'\n'+(repr(float(param['dim'][2]))+',\n' if param['idim']==2 else ',\n'))
+  f.write('*Material, name='+name+'\n*Density\n'+repr(float(mat[name]['dens']))+',\n')
+  f.write('*Elastic\n'+', '.join([repr(float(x)) for x in mat[name]['elastic']])+'\n')
+  f.write('*Boundary\nx0, XSYMM\ny0, YSYMM\n'+('z0, ZSYMM\n' if param['idim']==3 else ''))
+  f.write('*Step, name=demo_TensileTest, nlgeom=NO, inc=1000000\n*Dynamic, application=QUASI-STATIC\n1., 10., 0.0001, 10.\n')
+  f.write('*Boundary\nxL, 1, 1, '+repr(float(param['load'][0]))+'\nyL, 2, 2, '+repr(float(param['load'][1]))+'\n')
+  f.write('*Output, field, time interval=1.\n*Node Output\nRF, U\n*Element Output, directions=YES\nE, EE, S\n')
+  f.write('*Output, history, variable=PRESELECT\n*End Step\n')
+ return xyz.shape[0], conn.shape[0]
+
+
+if __name__=='__main__':
+ geometry = sys.argv[1] if len(sys.argv)>1 else 'PlateWithHole'
+ jobname = sys.argv[2] if len(sys.argv)>2 else 'demo_'+geometry
+ nn, ne = write_plate_inp(os.path.join(os.getcwd(), jobname+'.inp'), PARAM[geometry], geometry)
+ print(jobname+'.inp: '+str(nn)+' nodes, '+str(ne)+' elements')
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+'''
+ ARTS ET METIERS - ABAQUS DEMOS
+
+ Input file reader (*Node, *Element, *Nset, *Elset, *INCLUDE) into NumPy arrays,
+ with a memory-mappable cache (<deck>.npycache/*.npy) re-used while the deck is unchanged
+
+ usage: python inpreader.py deck.inp
+
+ PIMM - PARIS - FRANCE
+
+ v0.0 - 18/10/2026
+'''
+
+import os
+import sys
+import json
+import shutil
+import numpy as np
+
+CACHE_VERSION = 3
+
+
+def keyword(line):
+ ''' '*Element, type=C3D8' -> ('element', {'type': 'C3D8'}) '''
+ st1 = [x.strip() for x in line[1:].split(',')]
+ opts = dict()
+ for x in st1[1:]:
+  if not x: continue
+  k = x.split('=', 1); opts[k[0].strip().lower()] = k[1].strip() if len(k)>1 else ''
+ return st1[0].lower(), opts
+
+
+def lines(fname, files=None):
+ ''' non-comment lines of a deck, *INCLUDE files inlined '''
+ if files is not None: files.append(os.path.abspath(fname))
+ with open(fname) as f:
+  for line in f:
+   if line.startswith('**'): continue
+   if line[:8].lower()=='*include':
+    name = keyword(line)[1]['input'].strip('"\'')
+    for x in lines(os.path.join(os.path.dirname(os.path.abspath(fname)), name), files): yield x
+   else:
+    yield line
+
+
+def blocks(fname, files=None):
+ ''' (keyword, options, data lines) of a deck '''
+ kw, opts, data = None, None, []
+ for line in lines(fname, files):
+  if line.startswith('*'):
+   if kw is not None: yield kw, opts, data
+   kw, opts = keyword(line); data = []
+  elif line.strip():
+   data.append(line)
+ if kw is not None: yield kw, opts, data
+
+
+def numbers(data, dtype=float):
+ ''' all comma separated values of data lines '''
+ if not data: return np.zeros(0, dtype=dtype)
+ return np.array(''.join(data).replace(',', ' ').split(), dtype=dtype)
+
+
+def records(data):
+ ''' values per record of a data block (records continued on the next line end with ',') '''
+ n = 0
+ for line in data:
+  st1 = line.strip(); n += len([x for x in st1.split(',') if x.strip()])
+  if not st1.endswith(','): return n
+ return n
+
+
+def set_labels(data, opts, known):
+ ''' labels of a *Nset/*Elset block (generate ranges and set names expanded, known: lower-case names) '''
+ if 'generate' in opts:
+  g = numbers(data, np.int64).reshape(-1, 3)
+  return np.concatenate([np.arange(x[0], x[1]+1, max(x[2], 1)) for x in g]) if len(g) else np.zeros(0, dtype=np.int64)
+ tok = [x.strip() for x in ''.join(data).replace('\n', ',').split(',') if x.strip()]
+ try:
+  return np.array(tok, dtype=np.int64)
+ except ValueError:
+  out = [known[x.lower()] if x.lower() in known else np.array([int(x)], dtype=np.int64) for x in tok]
+  return np.concatenate(out) if out else np.zeros(0, dtype=np.int64)
+
+
+def _append(sets, name, labels):
+ sets[name] = np.r_[sets[name], labels] if name in sets else labels
+
+
+def parse(fname):
+ ''' deck -> mesh dict: nodes (labels, xyz), elements per type (labels, connectivity), nsets, elsets
+     set names in lower case (Abaqus names are case insensitive), prefixed by the part name inside *Part
+     (part.name) or by the instance of assembly sets (instance.name), repeated blocks of a set appended,
+     instances = {instance: part}, files = deck + included files '''
+ files = []; part = ''
+ nodes, elems, nsets, elsets, instances = dict(), dict(), dict(), dict(), dict()
+ for kw, opts, data in blocks(fname, files):
+  pref = part+'.' if part else ''
+  if kw=='part': part = opts.get('name', '')
+  elif kw=='end part': part = ''
+  elif kw=='instance': instances[opts.get('name', '')] = opts.get('part', '')
+  elif kw=='node':
+   ncol = len([x for x in data[0].split(',') if x.strip()]) if data else 4
+   v = numbers(data).reshape(-1, ncol); nodes.setdefault(part, []).append(v)
+   if 'nset' in opts: _append(nsets, pref+opts['nset'].lower(), v[:,0].astype(np.int64))
+  elif kw=='element':
+   nval = records(data); v = numbers(data, np.int64).reshape(-1, nval) if nval else np.zeros((0, 1), dtype=np.int64)
+   elems.setdefault((part, opts['type'].upper()), []).append(v)
+   if 'elset' in opts: _append(elsets, pref+opts['elset'].lower(), v[:,0])
+  elif kw in ('nset', 'elset'):
+   sets = nsets if kw=='nset' else elsets
+   if not part and opts.get('instance'): pref = opts['instance']+'.'
+   known = dict([(k[len(pref):], v) for k, v in sets.items() if k.startswith(pref)]) if pref else sets
+   _append(sets, pref+opts[kw].lower(), set_labels(data, opts, known))
+ #
+ mesh = dict([('nodes', dict()), ('elements', dict()), ('nsets', nsets), ('elsets', elsets), ('instances', instances), ('files', files)])
+ for key, v in nodes.items():
+  v = np.concatenate([np.pad(x, ((0, 0), (0, 4-x.shape[1]))) if x.shape[1]<4 else x for x in v])
+  mesh['nodes'][key] = (np.ascontiguousarray(v[:,0], dtype=np.int64), np.ascontiguousarray(v[:,1:4]))
+ for key, v in elems.items():
+  v = np.concatenate(v); name = key[0]+'.'+key[1] if key[0] else key[1]
+  mesh['elements'][name] = (np.ascontiguousarray(v[:,0]), np.ascontiguousarray(v[:,1:]))
+ return mesh
+
+
+def _stamp(files):
+ return [[x, os.path.getmtime(x), os.path.getsize(x)] for x in files]
+
+
+def save_cache(mesh, folder):
+ ''' one .npy per array + index.json (file stamps for invalidation) '''
+ if os.path.isdir(folder): shutil.rmtree(folder)
+ os.makedirs(folder); index = dict([('version', CACHE_VERSION), ('files', _stamp(mesh['files'])), ('instances', mesh['instances']), ('arrays', [])])
+ arrays = [('nodes', k, j1, v[j1]) for k, v in mesh['nodes'].items() for j1 in range(2)]
+ arrays += [('elements', k, j1, v[j1]) for k, v in mesh['elements'].items() for j1 in range(2)]
+ arrays += [(grp, k, 0, v) for grp in ('nsets', 'elsets') for k, v in mesh[grp].items()]
+ for j1, (grp, k, i, v) in enumerate(arrays):
+  np.save(os.path.join(folder, str(j1)+'.npy'), v); index['arrays'].append([grp, k, i, str(j1)+'.npy'])
+ with open(os.path.join(folder, 'index.json'), 'w') as f: json.dump(index, f)
+
+
+def load_cache(folder):
+ ''' memory-mapped mesh dict, None if missing or out of date '''
+ fname = os.path.join(folder, 'index.json')
+ if not os.path.isfile(fname): return None
+ with open(fname) as f: index = json.load(f)
+ if index.get('version')!=CACHE_VERSION: return None
+ for x in index['files']:
+  if not os.path.isfile(x[0]) or [x[0], os.path.getmtime(x[0]), os.path.getsize(x[0])]!=x: return None
+ mesh = dict([('nodes', dict()), ('elements', dict()), ('nsets', dict()), ('elsets', dict()),
+   ('instances', index['instances']), ('files', [x[0] for x in index['files']])])
+ for grp, k, i, name in index['arrays']:
+  v = np.load(os.path.join(folder, name), mmap_mode='r')
+  if grp in ('nodes', 'elements'):
+   mesh[grp].setdefault(k, [None, None])[i] = v
+  else: mesh[grp][k] = v
+ for grp in ('nodes', 'elements'):
+  for k in mesh[grp].keys(): mesh[grp][k] = tuple(mesh[grp][k])
+ return mesh
+
+
+def read_inp(fname, cache=True):
+ ''' mesh dict of a deck (see parse), from the binary cache when up to date '''
+ folder = os.path.abspath(fname)+'.npycache'
+ if cache:
+  mesh = load_cache(folder)
+  if mesh is not None: return mesh
+ mesh = parse(fname)
+ if cache: save_cache(mesh, folder)
+ return mesh
+
+
+if __name__=='__main__':
+ mesh = read_inp(sys.argv[1])
+ for k, v in mesh['nodes'].items(): print('nodes '+(k or '-')+': '+str(len(v[0])))
+ for k, v in mesh['elements'].items(): print('elements '+k+': '+str(v[1].shape))
+ print('nsets: '+', '.join(sorted(mesh['nsets'].keys()))); print('elsets: '+', '.join(sorted(mesh['elsets'].keys())))
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+'''
+ ARTS ET METIERS - ABAQUS DEMOS
+
+ Concurrent job execution under a core budget
+
+ PIMM - PARIS - FRANCE
+
+ v0.0 - 18/10/2026
+'''
+
+import os
+import time
+
+
+def core_split(njobs, ncpus, cpus_per_job=None):
+ ''' cpus per job and number of concurrent jobs for a total core budget '''
+ cpj = int(cpus_per_job) if cpus_per_job else max(1, int(ncpus)//max(1, njobs))
+ return cpj, max(1, int(ncpus)//cpj)
+
+
+def run_inputs(jobnames, ncpus=2, cpus_per_job=None, precision='full', poll=1.):
+ ''' run the input files <jobname>.inp (current directory) concurrently inside CAE
+     at most ncpus cores are used at once, jobs are started in order, a slot is refilled
+     as soon as any running job ends (status polled every poll seconds) '''
+ from abaqus import mdb
+ from abaqusConstants import OFF, PERCENTAGE, ANALYSIS, FULL, SINGLE, ODB, DEFAULT, COMPLETED, ABORTED, TERMINATED
+ cpj, nconc = core_split(len(jobnames), ncpus, cpus_per_job)
+ for name in jobnames:
+  if name in mdb.jobs.keys(): del mdb.jobs[name]
+  mdb.JobFromInputFile(name=name, inputFileName=os.path.join(os.getcwd(), name+'.inp'), type=ANALYSIS,
+    memory=90, memoryUnits=PERCENTAGE, getMemoryFromAnalysis=True, nodalOutputPrecision=FULL if precision=='full' else SINGLE,
+    resultsFormat=ODB, multiprocessingMode=DEFAULT, numCpus=cpj, numDomains=cpj, numGPUs=0)
+ #
+ pending, running = list(jobnames), []
+ while pending or running:
+  while pending and len(running)<nconc:
+   running.append(pending.pop(0)); mdb.jobs[running[-1]].submit(consistencyChecking=OFF)
+  done = [x for x in running if mdb.jobs[x].status in (COMPLETED, ABORTED, TERMINATED)]
+  if not done and len(running)==1: mdb.jobs[running[0]].waitForCompletion(); done = list(running)
+  if not done: time.sleep(poll)
+  running = [x for x in running if x not in done]
+ return [mdb.jobs[name].status for name in jobnames]
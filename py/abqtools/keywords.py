@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+'''
+ ARTS ET METIERS - ABAQUS DEMOS
+
+ Keyword block edition: one synchronization, blocks indexed by keyword, batched
+ replace/insert/delete edits committed with one kernel call per touched block
+
+ PIMM - PARIS - FRANCE
+
+ v0.0 - 18/10/2026
+'''
+
+
+def block_keyword(block):
+ ''' '*Beam Section, elset=...\\n...' -> '*beam section' (first non-comment line) '''
+ for line in block.split('\n'):
+  line = line.strip()
+  if line.startswith('*') and not line.startswith('**'): return line.split(',')[0].strip().lower()
+ return ''
+
+
+class KeywordEditor(object):
+ ''' kw = KeywordEditor(model); j1 = kw.find('*Step'); kw.replace(j1, text); kw.insert('after *Part', text)
+     kw.delete(range(...)); kw.commit()
+     indices refer to the blocks read at the synchronization, edits are applied by commit '''
+
+ def __init__(self, model, reset=True):
+  self.kb = model.keywordBlock
+  if reset: self.kb.setValues(edited=0)
+  self.kb.synchVersions(storeNodesAndElements=False)
+  self.blocks = list(self.kb.sieBlocks); self.index = dict()
+  for j1, st1 in enumerate(self.blocks): self.index.setdefault(block_keyword(st1), []).append(j1)
+  self.replaced, self.inserted = dict(), dict()
+
+ def find(self, keyword, n=0):
+  ''' index of the n-th block of a keyword (n=-1: last), KeyError if missing '''
+  try:
+   return self.index[keyword.strip().lower()][n]
+  except (KeyError, IndexError):
+   raise KeyError('keyword block not found: '+keyword)
+
+ def anchor(self, where):
+  ''' 'before *End Assembly', 'after *Part', 'after last *Part' -> index of the block the text goes after '''
+  pos, keyword = where.strip().split(' ', 1)
+  n = -1 if keyword.lower().startswith('last ') else 0
+  if n: keyword = keyword[5:]
+  j1 = self.find(keyword, n)
+  return j1-1 if pos.lower()=='before' else j1
+
+ def replace(self, j1, text):
+  self.replaced[j1] = text
+
+ def delete(self, j1):
+  ''' one block or an iterable of blocks '''
+  for x in ([j1] if isinstance(j1, int) else j1): self.replaced[x] = ''
+
+ def insert(self, where, text):
+  ''' text after the block at index where, or at an anchor ('before *End Assembly') '''
+  j1 = self.anchor(where) if isinstance(where, str) else where
+  self.inserted.setdefault(j1, []).append(text)
+  return j1
+
+ def commit(self):
+  ''' apply the edits from the last block to the first (indices stay valid), inserted texts merged
+      into the replacement of the block they follow -> number of kernel calls '''
+  ncall = 0
+  for j1 in sorted(set(self.replaced.keys()) | set(self.inserted.keys()), reverse=True):
+   ins = self.inserted.get(j1, [])
+   if j1 in self.replaced:
+    self.kb.replace(j1, '\n'.join([x for x in [self.replaced[j1]]+ins if x]))
+   else:
+    self.kb.insert(j1, '\n'.join(ins))
+   ncall += 1
+  self.replaced, self.inserted = dict(), dict()
+  return ncall
+
+
+def insert_before(model, keyword, text, reset=True):
+ ''' insert text before the first keyword block starting with keyword (case insensitive) '''
+ kw = KeywordEditor(model, reset=reset)
+ j1 = kw.insert('before '+keyword, text); kw.commit()
+ return j1+1
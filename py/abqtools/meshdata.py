@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+''' 
+ ARTS ET METIERS - ABAQUS DEMOS
+ 
+ Mesh data (CAE mesh objects <-> NumPy arrays), vectorized mesh operations
+ 
+ PIMM - PARIS - FRANCE
+ 
+ v0.0 - 18/10/2026
+'''
+
+import numpy as np
+from abqtools.periodic import pair_nodes
+
+
+def node_arrays(nodes):
+ ''' labels and coordinates of a MeshNodeArray '''
+ lab = np.array([n.label for n in nodes], dtype=np.int64)
+ xyz = np.array([n.coordinates for n in nodes], dtype=float).reshape(-1,3)
+ return lab, xyz
+
+
+def element_arrays(elements):
+ ''' labels and connectivity (indices in the part node array, padded with -1) of a MeshElementArray '''
+ lab = np.array([e.label for e in elements], dtype=np.int64)
+ con = [e.connectivity for e in elements]; m = max([len(c) for c in con]) if con else 0
+ conn = -np.ones((len(con), m), dtype=np.int64)
+ for j1, c in enumerate(con): conn[j1,:len(c)] = c
+ return lab, conn
+
+
+def element_types(elements):
+ ''' element type names of a MeshElementArray '''
+ return np.array([str(e.type) for e in elements])
+
+
+def nearest_circle(xy, centers, radius, chunk=4096):
+ ''' index of the circle (centers[k], radius) containing each point, -1 outside all circles '''
+ xy = np.asarray(xy, dtype=float); centers = np.asarray(centers, dtype=float).reshape(-1, 2)
+ out = -np.ones(xy.shape[0], dtype=np.int64)
+ if centers.shape[0]==0: return out
+ for j1 in range(0, xy.shape[0], chunk):
+  d2 = np.sum((xy[j1:j1+chunk,None,:]-centers[None,:,:])**2, 2); k = np.argmin(d2, 1)
+  out[j1:j1+chunk] = np.where(d2[np.arange(len(k)), k]<=radius**2, k, -1)
+ return out
+
+
+def classify_elements(conn, region):
+ ''' region of each element whose nodes all lie in the same region (region per node), -1 otherwise '''
+ r = np.asarray(region)[np.where(conn>=0, conn, conn[:,:1])]
+ return np.where(r.min(1)==r.max(1), r[:,0], -1)
+
+
+def rotation(axis, angle):
+ ''' rotation matrix of angle (degrees) about axis (right-hand rule) '''
+ u = np.asarray(axis, dtype=float); u = u/np.linalg.norm(u); t = np.radians(angle)
+ K = np.array([[0., -u[2], u[1]], [u[2], 0., -u[0]], [-u[1], u[0], 0.]])
+ return np.eye(3)+np.sin(t)*K+(1.-np.cos(t))*K.dot(K)
+
+
+def stack_mesh(xyz, conn, transforms, tol=1e-6):
+ ''' copies of a mesh moved by transforms=[(R, t), ...] (x -> R.x+t), the nodes of a copy lying
+     on nodes of the previous copies being merged (hashed grid, tolerance tol)
+     -> xyz [n,3], connectivity (node indices, -1 padding kept), copy index per element, merged node count '''
+ xyz = np.asarray(xyz, dtype=float).reshape(-1,3); conn = np.asarray(conn, dtype=np.int64)
+ allx, allc, copy, n, nmerged = [], [], [], 0, 0
+ for j1, (R, t) in enumerate(transforms):
+  x1 = xyz.dot(np.asarray(R, dtype=float).T)+np.asarray(t, dtype=float)
+  newid = -np.ones(x1.shape[0], dtype=np.int64)
+  if n:
+   # candidates: previous nodes inside the bounding box of the copy
+   x0 = np.concatenate(allx); cand = np.flatnonzero(np.all((x0>=x1.min(0)-tol) & (x0<=x1.max(0)+tol), 1))
+   if len(cand):
+    i2 = pair_nodes(x1, x0[cand], tol=tol)[0]; newid[i2>=0] = cand[i2[i2>=0]]
+  fresh = newid<0; nmerged += int(np.sum(~fresh))
+  newid[fresh] = n+np.arange(int(np.sum(fresh))); n += int(np.sum(fresh)); allx.append(x1[fresh])
+  allc.append(np.where(conn>=0, newid[np.maximum(conn, 0)], -1)); copy.append(np.full(conn.shape[0], j1, dtype=np.int64))
+ return np.concatenate(allx), np.concatenate(allc), np.concatenate(copy), nmerged
+
+
+def add_orphan_mesh(part, xyz, conn, etypes):
+ ''' nodes (labels 1..n) and elements (labels 1..m, one call per element type) of an orphan mesh part '''
+ part.addNodes(nodeData=tuple([(j1+1, )+tuple(x) for j1, x in enumerate(np.asarray(xyz, dtype=float).tolist())]))
+ etypes = np.asarray(etypes); lab = np.arange(1, conn.shape[0]+1)
+ for key in np.unique(etypes):
+  j1 = np.flatnonzero(etypes==key); c = conn[j1]; c = c[:, np.flatnonzero((c>=0).any(0))]+1
+  part.addElements(elementData=tuple([tuple(x) for x in np.c_[lab[j1], c].tolist()]), type=str(key))
+
+
+def _edge_array(part, idx):
+ out = part.edges[idx[0]:idx[0]+1]
+ for j1 in idx[1:]: out += part.edges[j1:j1+1]
+ return out
+
+
+def graded_plate(model, part, center, outer, rad, div, bias, nz=None, depth=None):
+ ''' quarter plate (inpgen.plate_outline: arc centre, outer polyline [P0, Pc, P1]) split along the
+     centre-Pc line into two mappable regions, seeds (div = arc part 1, arc part 2, radial) biased
+     from the hole (fine) to the outer edges (ratio bias), nz elements through depth, structured quad/hex '''
+ from abaqusConstants import QUAD, HEX, STRUCTURED, SINGLE, FIXED
+ c = np.asarray(center, dtype=float); P0, Pc, P1 = [np.asarray(x, dtype=float) for x in outer]
+ if depth:
+  d = [part.DatumPointByCoordinate(coords=x) for x in ((c[0], c[1], 0.), (Pc[0], Pc[1], 0.), (Pc[0], Pc[1], depth))]
+  part.PartitionCellByPlaneThreePoints(cells=part.cells, point1=part.datums[d[0].id], point2=part.datums[d[1].id], 
+    point3=part.datums[d[2].id])
+ else:
+  u = (Pc-c)/np.linalg.norm(Pc-c)
+  s = model.ConstrainedSketch(name='__partition__', sheetSize=4.*np.linalg.norm(Pc-c))
+  s.Line(point1=tuple(c), point2=tuple(Pc+0.01*np.linalg.norm(Pc-c)*u))
+  part.PartitionFaceBySketch(faces=part.faces, sketch=s); del model.sketches['__partition__']
+ #edges: arcs and outer sides (part 1: P0 side, part 2: P1 side), radial edges, thickness edges
+ tol = 1e-6*max(rad, np.linalg.norm(Pc-c))
+ ang = lambda x: np.arctan2(x[1]-c[1], x[0]-c[0])
+ dang = lambda a, b: abs(np.angle(np.exp(1j*(a-b))))
+ seg = lambda x, A, B: np.linalg.norm(x-(A+np.clip(np.dot(x-A, B-A)/np.dot(B-A, B-A), 0., 1.)*(B-A)))
+ groups = dict([(k, []) for k in ('part1', 'part2', 'end1', 'end2', 'thick')])
+ for j1, e in enumerate(part.edges):
+  v = [np.asarray(part.vertices[k].pointOn[0], dtype=float) for k in e.getVertices()]
+  if len(v)<2: continue
+  if np.linalg.norm((v[1]-v[0])[:2])<tol: groups['thick'].append(j1); continue
+  hole = [abs(np.linalg.norm(x[:2]-c)-rad)<tol for x in v]; pm = np.asarray(e.pointOn[0], dtype=float)[:2]
+  if hole[0] and hole[1]:
+   groups['part1' if dang(ang(pm), ang(P0))<dang(ang(Pc), ang(P0)) else 'part2'].append(j1)
+  elif hole[0] or hole[1]:
+   groups['end1' if hole[0] else 'end2'].append(j1)
+  else:
+   groups['part1' if seg(pm, P0, Pc)<seg(pm, Pc, P1) else 'part2'].append(j1)
+ #
+ for key, n in (('part1', div[0]), ('part2', div[1]), ('thick', nz)):
+  if groups[key] and n: part.seedEdgeByNumber(edges=_edge_array(part, groups[key]), number=int(n), constraint=FIXED)
+ kw = dict([(k+'Edges', _edge_array(part, groups[k])) for k in ('end1', 'end2') if groups[k]])
+ part.seedEdgeByBias(biasMethod=SINGLE, ratio=bias, number=int(div[2]), constraint=FIXED, **kw)
+ part.setMeshControls(regions=part.cells if depth else part.faces, elemShape=HEX if depth else QUAD, technique=STRUCTURED)
+ return groups
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+'''
+ ARTS ET METIERS - ABAQUS DEMOS
+
+ ODB post-processing (volume averages of integration point fields, histories, nodal fields)
+
+ PIMM - PARIS - FRANCE
+
+ v0.0 - 18/10/2026
+'''
+
+import numpy as np
+
+
+def ip_keys(block):
+ ''' (element label, integration point) of a bulk data block as one int64 key '''
+ return np.asarray(block.elementLabels, dtype=np.int64)*1000+np.asarray(block.integrationPoints, dtype=np.int64)
+
+
+def block_instance(block):
+ return block.instance.name if block.instance is not None else ''
+
+
+def ivol_index(ivol):
+ ''' IVOL of every bulk data block, sorted by key per instance -> {instance: (keys, volumes)} '''
+ keys, vols = {}, {}
+ for b in ivol.bulkDataBlocks:
+  inst = block_instance(b)
+  keys.setdefault(inst, []).append(ip_keys(b)); vols.setdefault(inst, []).append(np.asarray(b.data, dtype=np.float64).ravel())
+ index = dict()
+ for inst in keys.keys():
+  k1 = np.concatenate(keys[inst]); v1 = np.concatenate(vols[inst]); j1 = np.argsort(k1, kind='mergesort')
+  index[inst] = (k1[j1], v1[j1])
+ return index
+
+
+def volume_average(field, ivol, region=None, index=None):
+ ''' volume average (float64) of an integration point FieldOutput, weighted by IVOL
+     streams over the bulk data blocks of field (all element types), each value being
+     joined to its IVOL on (instance, element, integration point) -> mean, volume '''
+ from abaqusConstants import INTEGRATION_POINT
+ if region is None:
+  field = field.getSubset(position=INTEGRATION_POINT)
+ else:
+  field = field.getSubset(region=region, position=INTEGRATION_POINT); index = None
+  ivol = ivol.getSubset(region=region, position=INTEGRATION_POINT)
+ if index is None: index = ivol_index(ivol)
+ #
+ acc, vol, nmiss = None, 0., 0
+ for b in field.bulkDataBlocks:
+  k2, v2 = index.get(block_instance(b), (np.zeros(0, dtype=np.int64), np.zeros(0)))
+  k1 = ip_keys(b); j1 = np.minimum(np.searchsorted(k2, k1), max(len(k2)-1, 0))
+  ok = (k2[j1]==k1) if len(k2) else np.zeros(len(k1), dtype=bool)
+  nmiss += int(np.sum(~ok))
+  data = np.asarray(b.data, dtype=np.float64).reshape(len(k1), -1)[ok]; w = v2[j1[ok]]
+  acc = np.dot(w, data) if acc is None else acc+np.dot(w, data); vol += np.sum(w)
+ if nmiss: print('check output: '+str(nmiss)+' integration points without IVOL')
+ if acc is None: return np.zeros(0), 0.
+ return acc/vol, vol
+
+
+def set_averages(field, ivol, sets):
+ ''' volume averages over several element sets -> {name: (mean, volume)} '''
+ return dict([(key, volume_average(field, ivol, region=sets[key])) for key in sets.keys()])
+
+
+def loadcase_averages(step, name='S'):
+ ''' volume averages of a field for every load case of a perturbation step -> {load case: mean} '''
+ out = dict()
+ for fr in step.frames:
+  if fr.loadCase is None: continue
+  out[fr.loadCase.name] = volume_average(fr.fieldOutputs[name], fr.fieldOutputs['IVOL'])[0]
+ return out
+
+
+def history_arrays(step, variable):
+ ''' history output of every region of a step holding variable -> time [n], values [n, nregion], region names '''
+ names, cols, t = [], [], None
+ for key in sorted(step.historyRegions.keys()):
+  hr = step.historyRegions[key]
+  if variable not in hr.historyOutputs.keys(): continue
+  data = np.asarray(hr.historyOutputs[variable].data, dtype=np.float64).reshape(-1, 2)
+  if t is None: t = data[:,0]
+  names.append(key); cols.append(data[:len(t),1])
+ if t is None: return np.zeros(0), np.zeros((0, 0)), names
+ return t, np.column_stack(cols), names
+
+
+def signal_error(t_ref, y_ref, t, y):
+ ''' relative L2 error of y(t) (interpolated at t_ref) against y_ref, per column '''
+ y_ref = np.asarray(y_ref, dtype=float).reshape(len(t_ref), -1); y = np.asarray(y, dtype=float).reshape(len(t), -1)
+ yi = np.column_stack([np.interp(t_ref, t, y[:,j1]) for j1 in range(y.shape[1])])
+ return np.sqrt(np.sum((yi-y_ref)**2, 0)/np.maximum(np.sum(y_ref**2, 0), 1e-300))
+
+
+def node_history(step, variable, instance, labels):
+ ''' history output of nodes given by label (regions 'Node <instance>.<label>') -> time [n], values [n, nlabel] '''
+ cols = [np.asarray(step.historyRegions['Node '+instance+'.'+str(x)].historyOutputs[variable].data, dtype=np.float64).reshape(-1, 2)
+   for x in labels]
+ n = min([len(x) for x in cols])
+ return cols[0][:n,0], np.column_stack([x[:n,1] for x in cols])
+
+
+def nodal_field(field, instance):
+ ''' element nodal values of a field averaged at the nodes of an OdbInstance
+     -> node labels [n], values [n, ncomp], coordinates [n, 3] '''
+ from abaqusConstants import ELEMENT_NODAL
+ labs, vals = [], []
+ for b in field.getSubset(position=ELEMENT_NODAL).bulkDataBlocks:
+  if block_instance(b)!=instance.name: continue
+  labs.append(np.asarray(b.nodeLabels, dtype=np.int64)); vals.append(np.asarray(b.data, dtype=np.float64).reshape(len(labs[-1]), -1))
+ lab, inv = np.unique(np.concatenate(labs), return_inverse=True)
+ s = np.zeros((len(lab), vals[0].shape[1])); np.add.at(s, inv, np.concatenate(vals))
+ s /= np.bincount(inv)[:,None]
+ nl = np.array([n.label for n in instance.nodes], dtype=np.int64); xyz = np.array([n.coordinates for n in instance.nodes], dtype=np.float64)
+ j1 = np.argsort(nl)
+ return lab, s, xyz[j1[np.searchsorted(nl[j1], lab)]]
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+
+'''
+ ARTS ET METIERS - ABAQUS DEMOS
+
+ Output budget planner: ODB size estimated from the input deck (entities x components x frames)
+ before submission, output requests rewritten to fit a budget (field output decimated in time,
+ dense history output kept on sensor sets, single precision nodal output)
+
+ usage: python outplan.py deck.inp [budget_MB [sensor_set ...]]
+
+ PIMM - PARIS - FRANCE
+
+ v0.0 - 18/10/2026
+'''
+
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from abqtools.inpreader import keyword, read_inp
+
+# position and components (3D) of the output variables
+VARIABLES = dict([('U', ('node', 3)), ('V', ('node', 3)), ('A', ('node', 3)), ('RF', ('node', 3)), ('CF', ('node', 3)),
+   ('UR', ('node', 3)), ('RM', ('node', 3)), ('EPOT', ('node', 1)), ('RCHG', ('node', 1)), ('NT', ('node', 1)), ('RFL', ('node', 1)),
+   ('S', ('element', 6)), ('E', ('element', 6)), ('EE', ('element', 6)), ('LE', ('element', 6)), ('PE', ('element', 6)),
+   ('PEEQ', ('element', 1)), ('MISES', ('element', 1)), ('IVOL', ('element', 1)), ('EVOL', ('element', 1)),
+   ('HFL', ('element', 3)), ('EPG', ('element', 3)), ('EFLX', ('element', 3)), ('SF', ('element', 6)), ('SE', ('element', 6))])
+PRESELECT = ('U', 'RF', 'CF', 'S', 'E', 'PE', 'PEEQ')
+# integration points per element type (default: 8 in 3D, 4 in 2D)
+IPS = dict([('C3D8', 8), ('C3D8R', 1), ('C3D8I', 8), ('C3D20', 27), ('C3D20R', 8), ('C3D6', 2), ('C3D15', 9), ('C3D4', 1),
+   ('C3D10', 4), ('CPS3', 1), ('CPS4', 4), ('CPS4R', 1), ('CPS6', 3), ('CPS8', 9), ('CPS8R', 4), ('S3', 1), ('S4', 4),
+   ('S4R', 1), ('S8R', 4), ('B21', 2), ('B22', 3), ('B31', 2), ('B32', 3)])
+HISTORY_BYTES = 8      # (time, value) single precision pairs
+
+
+def element_ips(etype):
+ ''' integration points of an element type (heat transfer, piezo and hybrid variants included) '''
+ t = etype.upper()
+ if t.startswith('DC'): t = t[1:]
+ if t not in IPS and t[-1:] in ('E', 'T', 'H'): t = t[:-1]
+ return IPS.get(t, 4 if t.startswith(('CPS', 'CPE', 'CAX', 'C2')) else 8)
+
+
+def model_size(mesh):
+ ''' nodes, integration points, spatial dimension and set sizes of a deck (read_inp) '''
+ count = dict()
+ for x in mesh['instances'].values(): count[x] = count.get(x, 0)+1
+ inst = dict([(v, k) for k, v in mesh['instances'].items()])
+ nn = sum([count.get(k, 1)*len(v[0]) for k, v in mesh['nodes'].items()])
+ nip, nel, dim, etype = 0, 0, 2, dict()
+ for key, (elab, conn) in mesh['elements'].items():
+  scope, t = key.rsplit('.', 1) if '.' in key else ('', key)
+  k = count.get(scope, 1); nip += k*len(elab)*element_ips(t); nel += k*len(elab)
+  etype.setdefault(scope, t)
+  if not t.upper().startswith(('CPS', 'CPE', 'CAX', 'DC2', 'B2', 'WARP', 'T2D')): dim = 3
+ ips = lambda scope: element_ips(etype.get(mesh['instances'].get(scope, scope), 'C3D8'))
+ # set sizes under the instance name (part.set -> instance.set, assembly sets already keyed instance.set)
+ sets = dict()
+ for grp, per in (('nsets', lambda s: 1), ('elsets', ips)):
+  for key, v in mesh[grp].items():
+   scope = key.rsplit('.', 1)[0] if '.' in key else ''
+   name = inst.get(scope, scope)+'.'+key.rsplit('.', 1)[1] if scope else key
+   sets[(grp, name.lower())] = len(v)*per(scope)
+ return dict([('nodes', nn), ('elements', nel), ('ips', nip), ('dim', dim), ('sets', sets)])
+
+
+def components(var, dim):
+ pos, n = VARIABLES.get(var.upper(), ('element' if var[:1].upper() in 'SE' else 'node', 1))
+ if dim==2 and n==6: n = 4
+ if dim==2 and n==3: n = 2
+ return pos, n
+
+
+def scan(fname):
+ ''' steps of the main deck with their output requests and line numbers '''
+ with open(fname) as f: lines = f.readlines()
+ steps, cur, out, blk = [], None, None, None
+ for j1, line in enumerate(lines):
+  if line.startswith('**'): continue
+  if line.startswith('*'):
+   kw, opts = keyword(line); blk = None
+   if kw=='step':
+    cur = dict([('name', opts.get('name', str(len(steps)+1))), ('line', j1), ('procedure', None), ('data', []),
+      ('loadcases', 0), ('outputs', []), ('perturbation', 'perturbation' in opts), ('inc', int(opts.get('inc', 100)))])
+    steps.append(cur); out = None
+   elif cur is None: continue
+   elif kw in ('static', 'dynamic', 'heat transfer', 'frequency', 'modal dynamic', 'coupled temperature-displacement', 'visco'):
+    cur['procedure'] = kw; cur['popts'] = opts
+   elif kw=='load case': cur['loadcases'] += 1
+   elif kw=='output':
+    out = dict([('kind', 'field' if 'field' in opts else 'history'), ('opts', opts), ('line', j1), ('blocks', []), ('end', j1)])
+    cur['outputs'].append(out)
+    if opts.get('variable', '').upper()=='PRESELECT':
+     out['blocks'].append(dict([('kw', 'preselect'), ('set', ''), ('vars', list(PRESELECT) if out['kind']=='field' else []), ('line', j1)]))
+   elif kw in ('node output', 'element output') and out is not None:
+    blk = dict([('kw', kw), ('set', opts.get('nset', opts.get('elset', ''))), ('vars', []), ('line', j1)])
+    out['blocks'].append(blk); out['end'] = j1
+   elif kw=='end step': cur['end'] = j1; cur = None; out = None
+   else: out = None if kw not in ('energy output', 'contact output') else out
+  elif line.strip():
+   if blk is not None:
+    blk['vars'] += [x.strip() for x in line.split(',') if x.strip()]; out['end'] = j1
+   elif cur is not None and cur['procedure'] is not None and not cur['data'] and out is None:
+    cur['data'] = [x.strip() for x in line.split(',')]
+ return steps, lines
+
+
+def _float(data, j1, default=None):
+ try: return float(data[j1])
+ except (IndexError, ValueError): return default
+
+
+def step_increments(step, modes=50):
+ ''' number of increments (or frames: modes, load cases) of a step '''
+ proc, d = step['procedure'], step['data']
+ if step['loadcases']: return step['loadcases']
+ if proc=='frequency':
+  n = _float(d, 0); return int(n) if n else modes
+ if proc=='modal dynamic':
+  return int(np.ceil(_float(d, 1, 1.)/max(_float(d, 0, 1.), 1e-30)))
+ if step['perturbation'] or proc is None: return 1
+ inc, period = _float(d, 0, 1.), _float(d, 1, 1.)
+ return int(min(step['inc'], np.ceil(period/max(inc, 1e-30))))
+
+
+def output_frames(step, opts, modes=50):
+ ''' frames written by an output request of a step '''
+ n = step_increments(step, modes)
+ if step['procedure'] in ('frequency', ) or step['loadcases'] or step['perturbation']: return n
+ period = _float(step['data'], 1, 1.)
+ if 'time interval' in opts: return int(np.floor(period/float(opts['time interval'])+1e-6))+1
+ if 'number interval' in opts: return int(opts['number interval'])+1
+ f = int(opts.get('frequency', 1))
+ return n//f+1 if f>0 else 0
+
+
+def estimate(fname, nodal_precision='full', modes=50, mesh=None):
+ ''' ODB size of a deck -> dict(rows=[(step, kind, set, variables, frames, values, MB)], total MB) '''
+ mesh = mesh if mesh is not None else read_inp(fname, cache=False)
+ size = model_size(mesh); steps, lines = scan(fname); rows = []
+ nb = 8 if nodal_precision=='full' else 4
+ for step in steps:
+  for out in step['outputs']:
+   frames = output_frames(step, out['opts'], modes)
+   for blk in out['blocks']:
+    nval, bytes1 = 0, 0.
+    for var in blk['vars']:
+     pos, nc = components(var, size['dim'])
+     if blk['kw']=='node output' and pos!='node': continue
+     if blk['kw']=='element output' and pos!='element': continue
+     if blk['set']:
+      n = size['sets'].get(('nsets' if pos=='node' else 'elsets', blk['set'].lower()), 0)
+     else: n = size['nodes'] if pos=='node' else size['ips']
+     nval += n*nc
+     bytes1 += n*nc*(HISTORY_BYTES if out['kind']=='history' else (nb if pos=='node' else 4))
+    rows.append(dict([('step', step['name']), ('kind', out['kind']), ('set', blk['set'] or 'all'), ('vars', blk['vars']),
+      ('frames', frames), ('values', nval), ('mb', bytes1*frames/1024.**2), ('line', out['line'])]))
+ return dict([('rows', rows), ('total', sum([x['mb'] for x in rows])), ('nodal_precision', nodal_precision), ('size', size)])
+
+
+def print_plan(plan, budget=None):
+ print('ODB estimate: %.1f MB' % plan['total']+('' if budget is None else ' (budget %.1f MB)' % budget)+
+   ', nodal precision '+plan['nodal_precision'])
+ for x in plan['rows']:
+  print('  %-12s %-8s %-18s %6d frames %10d values %9.2f MB  %s' % (x['step'], x['kind'], x['set'][:18], x['frames'],
+    x['values'], x['mb'], ','.join(x['vars'])))
+ if budget is not None and plan['total']>budget: print('check output: ODB estimate above budget')
+
+
+def _set_option(line, key, value):
+ ''' keyword line with option key set to value (interval options replaced) '''
+ kw = [x.strip() for x in line.strip().split(',')]
+ kw = [x for x in kw if x.split('=')[0].strip().lower() not in ('time interval', 'number interval', 'frequency', key)]
+ return ', '.join(kw+[key+'='+value])+'\n'
+
+
+def _nodal_vars(out, dim):
+ return sorted(set([v for b in out['blocks'] for v in b['vars'] if components(v, dim)[0]=='node']))
+
+
+def _covered(step, sensor, nvar):
+ ''' sensor set already holding the variables nvar in a history request of the step '''
+ return any([b['set'].lower()==sensor.lower() and set(nvar)<=set(b['vars'])
+   for o in step['outputs'] if o['kind']=='history' for b in o['blocks']])
+
+
+def fit_budget(fname, budget, sensors=(), out=None, min_frames=11, modes=50):
+ ''' rewrite the output requests of a deck to fit budget (MB): field output decimated in time
+     (at least min_frames frames), the nodal variables of the decimated requests kept at their
+     original rate as history output on the sensor sets, single precision nodal output if still
+     above budget -> plan of the rewritten deck (written to out, default: in place) '''
+ mesh = read_inp(fname, cache=False); plan = estimate(fname, 'full', modes, mesh)
+ if plan['total']<=budget: return plan
+ steps, lines = scan(fname); dim = plan['size']['dim']; sets = plan['size']['sets']
+ field = sum([x['mb'] for x in plan['rows'] if x['kind']=='field'])
+ hist = sum([x['mb'] for x in plan['rows'] if x['kind']=='history'])
+ # cost of the sensor history added at the original rate
+ extra = 0.
+ for step in steps:
+  for o in [x for x in step['outputs'] if x['kind']=='field']:
+   nvar = _nodal_vars(o, dim); frames = output_frames(step, o['opts'], modes)
+   for s in sensors:
+    if nvar and not _covered(step, s, nvar):
+     extra += sets.get(('nsets', s.lower()), 1)*sum([components(v, dim)[1] for v in nvar])*HISTORY_BYTES*frames/1024.**2
+ k = int(np.ceil(field/max(budget-hist-extra, 1e-3*budget)))
+ #
+ insert = dict()
+ for step in steps:
+  for o in [x for x in step['outputs'] if x['kind']=='field']:
+   frames = output_frames(step, o['opts'], modes)
+   kk = max(1, min(k, (frames-1)//max(min_frames-1, 1)))
+   if kk<=1: continue
+   opts, line = o['opts'], lines[o['line']]
+   rate = [x.strip() for x in line.strip().split(',')[1:] if x.split('=')[0].strip().lower() in ('time interval', 'number interval', 'frequency')]
+   if 'time interval' in opts: lines[o['line']] = _set_option(line, 'time interval', repr(float(opts['time interval'])*kk))
+   elif 'number interval' in opts: lines[o['line']] = _set_option(line, 'number interval', str(max(1, int(opts['number interval'])//kk)))
+   else: lines[o['line']] = _set_option(line, 'frequency', str(int(opts.get('frequency', 1))*kk))
+   nvar = _nodal_vars(o, dim)
+   for s in sensors:
+    if nvar and not _covered(step, s, nvar):
+     insert.setdefault(o['end'], []).append('*Output, history'+''.join([', '+x for x in rate])+'\n*Node Output, nset='+s+'\n'+', '.join(nvar)+'\n')
+ for j1 in sorted(insert.keys(), reverse=True): lines[j1+1:j1+1] = insert[j1]
+ with open(out or fname, 'w') as f: f.writelines(lines)
+ plan = estimate(out or fname, 'full', modes, mesh)
+ return plan if plan['total']<=budget else estimate(out or fname, 'single', modes, mesh)
+
+
+if __name__=='__main__':
+ budget = float(sys.argv[2]) if len(sys.argv)>2 else None
+ if budget is None: print_plan(estimate(sys.argv[1]))
+ else: print_plan(fit_budget(sys.argv[1], budget, sensors=sys.argv[3:]), budget)
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+'''
+ ARTS ET METIERS - ABAQUS DEMOS
+
+ Periodic node pairing with a hashed grid
+
+ PIMM - PARIS - FRANCE
+
+ v0.0 - 18/10/2026
+'''
+
+import itertools
+import numpy as np
+
+
+def pair_nodes(xyz1, xyz2, axes=(0,1,2), tol=1e-6, shift=None):
+ ''' pair every node of xyz1 with the node of xyz2 lying at the same position
+     (compared on the coordinates listed in axes, after adding shift to xyz1)
+     -> i2 (index in xyz2, -1 if unmatched), report (unmatched/duplicates/unpaired) '''
+ axes = list(axes)
+ x1 = np.asarray(xyz1, dtype=float).reshape(-1,3)[:,axes]
+ x2 = np.asarray(xyz2, dtype=float).reshape(-1,3)[:,axes]
+ if shift is not None: x1 = x1+np.asarray(shift, dtype=float)[axes]
+ n1, n2, ndim = x1.shape[0], x2.shape[0], len(axes)
+ i2 = -np.ones(n1, dtype=np.int64); d2 = np.full(n1, np.inf)
+ #
+ if n1>0 and n2>0:
+  # grid: cell size >= tol so that any partner lies in the 3**ndim neighbouring cells
+  x0 = np.minimum(x1.min(0), x2.min(0)); ext = np.maximum(x1.max(0), x2.max(0))-x0
+  h = max(tol, ext.max()/1e5, 1e-300)
+  q1 = np.floor((x1-x0)/h).astype(np.int64)+1; q2 = np.floor((x2-x0)/h).astype(np.int64)+1
+  stride = np.cumprod(np.r_[1, np.maximum(q1.max(0), q2.max(0))[:-1]+2]).astype(np.int64)
+  k2 = q2.dot(stride); order2 = np.argsort(k2, kind='mergesort'); k2 = k2[order2]
+  #
+  for off in itertools.product((-1,0,1), repeat=ndim):
+   k1 = (q1+np.array(off, dtype=np.int64)).dot(stride)
+   lo = np.searchsorted(k2, k1, 'left'); hi = np.searchsorted(k2, k1, 'right')
+   for c in range(int((hi-lo).max())):
+    j1 = np.flatnonzero(lo+c<hi); j2 = order2[lo[j1]+c]
+    d = np.sqrt(np.sum((x1[j1]-x2[j2])**2, 1))
+    ok = (d<=tol) & (d<d2[j1]); i2[j1[ok]] = j2[ok]; d2[j1[ok]] = d[ok]
+ #
+ count = np.bincount(i2[i2>=0], minlength=n2)
+ report = dict([('unmatched', np.flatnonzero(i2<0)), ('duplicates', np.flatnonzero(count>1)),
+    ('unpaired', np.flatnonzero(count==0))])
+ return i2, report
+
+
+def pair_faces(xyz1, xyz2, normal, tol=1e-6):
+ ''' pair two opposite faces of normal direction 'normal' (0,1,2) on their in-plane coordinates '''
+ return pair_nodes(xyz1, xyz2, axes=[j1 for j1 in range(3) if j1!=normal], tol=tol)
+
+
+def periodic_images(xyz, dim, origin=(0.,0.,0.), tol=1e-6):
+ ''' nodes of a box lying on its plus faces (x=xL, y=yL, z=zL) and their image
+     translated back onto the minus faces -> dep, img (indices in xyz), plus [ndep,3], report '''
+ xyz = np.asarray(xyz, dtype=float).reshape(-1,3); dim = np.asarray(dim, dtype=float)
+ plus = xyz>np.asarray(origin, dtype=float)+dim-tol
+ dep = np.flatnonzero(plus.any(1))
+ i2, rep = pair_nodes(xyz[dep]-plus[dep]*dim, xyz, tol=tol)
+ ok = np.flatnonzero(i2>=0)
+ return dep[ok], i2[ok], plus[dep[ok]], dict([('unmatched', dep[rep['unmatched']])])
+
+
+VOIGT = ((0,0), (1,1), (2,2), (0,1), (0,2), (1,2))
+
+
+def strain_cases(eps=1.):
+ ''' displacement gradients [6,3,3] of the unit strain cases (11 22 33 12 13 23), symmetric,
+     normal strains and engineering shear strains equal to eps '''
+ H = np.zeros((6,3,3))
+ for k, (i, j) in enumerate(VOIGT): H[k,i,j] += eps/2.; H[k,j,i] += eps/2.
+ return H
+
+
+def check_pairs(report, name=''):
+ ''' print the unmatched/duplicate nodes of a pairing, return True if clean '''
+ nu, nd = len(report['unmatched']), len(report.get('duplicates', []))
+ if nu or nd: print('check periodic mesh '+name+': '+str(nu)+' unmatched, '+str(nd)+' duplicate nodes')
+ return nu==0 and nd==0
+
+
+def write_equations(fname, terms, dof=11, inst='', mode='w'):
+ ''' write one *Equation per row: terms=[(coef, node labels or set name[, dof]), ...]
+     label arrays (same length, prefixed by inst) give one node per equation,
+     set names (written as given) are repeated on every equation '''
+ pref = inst+'.' if inst else ''
+ cols, fmt = [], []
+ for term in terms:
+  coef, ref = term[0], term[1]; st1 = ', '+str(term[2] if len(term)>2 else dof)+', '+repr(float(coef))
+  if isinstance(ref, str): fmt.append(ref+st1)
+  else: cols.append(np.asarray(ref, dtype=np.int64).ravel()); fmt.append(pref+'%d'+st1)
+ # at most 4 terms per data line
+ body = '\n'.join([', '.join(fmt[j1:j1+4]) for j1 in range(0, len(fmt), 4)])
+ neq = cols[0].shape[0] if len(cols) else 0
+ with open(fname, mode) as f:
+  if neq>0: np.savetxt(f, np.column_stack(cols), fmt=str(len(fmt))+'\n'+body, header='*Equation', comments='')
+ return neq
+
+
+def write_periodic_equations(fname, lab, dep, img, plus, dim, refs, dofs=(1,), inst='', mode='w'):
+ ''' u(dep)-u(img)-sum_j plus_j*dim_j*u(refs_j)=0 for every dof of dofs (refs: set names of the
+     reference nodes carrying the macroscopic gradient along x, y, z) -> number of equations '''
+ lab = np.asarray(lab); neq = 0
+ for pattern in np.unique(plus, axis=0):
+  sel = np.flatnonzero(np.all(plus==pattern, 1))
+  for dof in dofs:
+   terms = [(1.0, lab[dep[sel]]), (-1.0, lab[img[sel]])]+[(-dim[j1], refs[j1]) for j1 in np.flatnonzero(pattern)]
+   neq += write_equations(fname, terms, dof=dof, inst=inst, mode=mode if neq==0 else 'a')
+ return neq
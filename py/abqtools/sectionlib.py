@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+'''
+ ARTS ET METIERS - ABAQUS DEMOS
+
+ Library of generated beam cross-sections (*BEAM SECTION GENERATE -> .bsp)
+ key = hash(section geometry + mesh size + material), entries shared between runs
+ and work directories ($ABQ_SECTION_LIBRARY)
+
+ usage: python sectionlib.py [librarydir]     (list the entries)
+
+ PIMM - PARIS - FRANCE
+
+ v0.0 - 18/10/2026
+'''
+
+import os
+import sys
+import json
+import shutil
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from abqtools.sweep import ResultCache, param_key, _normal
+
+LIBRARY = os.environ.get('ABQ_SECTION_LIBRARY', os.path.join(os.path.expanduser('~'), '.abq_section_library'))
+
+
+def section_key(**desc):
+ ''' content address of a cross-section description (geometry, mesh size, material, generator) '''
+ return param_key(**desc)
+
+
+def fetch(key, dest, root=LIBRARY):
+ ''' copy the .bsp of an entry to dest -> meta, None if not in the library '''
+ if not os.path.isdir(root): return None
+ lib = ResultCache(root); meta = lib.get(key)
+ if meta is None: return None
+ shutil.copy2(os.path.join(lib.path(key), meta['files'][0]), dest)
+ return meta
+
+
+def store(key, bsp, desc, root=LIBRARY):
+ ''' add a generated .bsp to the library '''
+ return ResultCache(root).put(key, [bsp], dict([('desc', _normal(desc))]))
+
+
+if __name__=='__main__':
+ lib = ResultCache(sys.argv[1] if len(sys.argv)>1 else LIBRARY)
+ for t, size, key in lib.entries():
+  print(key[:12]+'  '+json.dumps(lib.get(key)['desc'], sort_keys=True))
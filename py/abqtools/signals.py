@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+'''
+ ARTS ET METIERS - ABAQUS DEMOS
+
+ Pitch-catch signal processing of the transducer EPOT histories (NumPy, one column per transducer):
+ spectrum, spectrogram, Hilbert envelope, time of flight actuator -> receivers
+
+ usage: abaqus python signals.py job1.odb [job2.odb ...]   (history regions only, no field frame read)
+        python signals.py job1_epot.npz [...]              (records saved by demo_3Dplate_with_pzt)
+        -> <job>_pitchcatch.npz
+
+ PIMM - PARIS - FRANCE
+
+ v0.0 - 18/10/2026
+'''
+
+import os
+import re
+import sys
+import numpy as np
+
+
+def uniform(t, y):
+ ''' signals resampled on a uniform time grid (same number of samples) '''
+ t = np.asarray(t, dtype=float); y = np.asarray(y, dtype=float).reshape(len(t), -1)
+ tu = np.linspace(t[0], t[-1], len(t))
+ if np.allclose(np.diff(t), tu[1]-tu[0], rtol=1e-6, atol=0.): return t, y
+ return tu, np.column_stack([np.interp(tu, t, y[:,j1]) for j1 in range(y.shape[1])])
+
+
+def spectrum(t, y):
+ ''' one-sided amplitude spectrum of every column -> f, |Y| '''
+ dt = t[1]-t[0]; n = len(t)
+ return np.fft.rfftfreq(n, dt), 2.*np.abs(np.fft.rfft(y, axis=0))/n
+
+
+def spectrogram(t, y, nwin=64, step=None):
+ ''' Hann-windowed short-time spectra of every column -> f, window centres, |Y| [nwin//2+1, nframes, ncol] '''
+ n = y.shape[0]; nwin = min(nwin, n); step = step or max(1, nwin//4)
+ start = np.arange(0, n-nwin+1, step); idx = start[:,None]+np.arange(nwin)[None,:]
+ w = np.hanning(nwin)
+ Y = np.fft.rfft(y[idx]*w[None,:,None], axis=1)
+ return np.fft.rfftfreq(nwin, t[1]-t[0]), t[start+nwin//2], np.abs(Y).transpose(1, 0, 2)*2./np.sum(w)
+
+
+def envelope(y):
+ ''' Hilbert envelope (modulus of the analytic signal) of every column '''
+ n = y.shape[0]; h = np.zeros(n); h[0] = 1.
+ if n%2==0: h[n//2] = 1.; h[1:n//2] = 2.
+ else: h[1:(n+1)//2] = 2.
+ return np.abs(np.fft.ifft(np.fft.fft(y, axis=0)*h[:,None], axis=0))
+
+
+def arrival(t, env, threshold=0.1):
+ ''' first time each envelope exceeds threshold*max (onset) '''
+ above = env>=threshold*np.max(env, 0)[None,:]
+ return t[np.argmax(above, 0)]
+
+
+def xcorr_lag(t, y, ref):
+ ''' delay of every column of y with respect to ref (peak of the FFT cross-correlation) '''
+ n = len(t); m = 2**int(np.ceil(np.log2(2*n)))
+ c = np.fft.irfft(np.fft.rfft(y, m, axis=0)*np.conj(np.fft.rfft(ref, m))[:,None], m, axis=0)
+ lag = np.argmax(np.abs(c), 0); lag = np.where(lag>m//2, lag-m, lag)
+ return lag*(t[1]-t[0])
+
+
+def pitch_catch(t, V, actuator=0, nwin=64, threshold=0.1):
+ ''' spectra, spectrogram, envelopes and times of flight actuator -> every transducer '''
+ t, V = uniform(t, V); V = V-np.mean(V, 0)[None,:]
+ f, A = spectrum(t, V); fs, ts, S = spectrogram(t, V, nwin=nwin); env = envelope(V)
+ onset = arrival(t, env, threshold)
+ return dict([('t', t), ('V', V), ('f', f), ('amplitude', A), ('f_spectrogram', fs), ('t_spectrogram', ts),
+   ('spectrogram', S), ('envelope', env), ('onset', onset), ('tof_onset', onset-onset[actuator]),
+   ('tof_xcorr', xcorr_lag(t, V, V[:,actuator])), ('actuator', actuator)])
+
+
+def save_pitch_catch(fname, res):
+ ''' compact record (float32 arrays, compressed) '''
+ np.savez_compressed(fname, **dict([(k, np.asarray(v, dtype=np.float32) if isinstance(v, np.ndarray) and v.dtype.kind=='f' else v)
+   for k, v in res.items()]))
+
+
+def pitch_catch_matrix(t, cols, actuators, reciprocity=False, charges=None):
+ ''' signals of one run per actuator (V [nt, N] each) -> t, M [nt, receiver, actuator]
+     columns not run are filled by reciprocity of the charge drive (Z_ik = Z_ki, actuator i driven
+     by the charge Q_i: M[:,i,k] = M[:,k,i]*Q_k/Q_i, Q = 1 if charges is None), NaN otherwise;
+     the diagonal term M[:,k,k] of an actuator not run stays NaN '''
+ n = cols[0].shape[1]; M = np.full((len(t), n, n), np.nan)
+ for k, V in zip(actuators, cols): M[:,:,k] = V
+ if reciprocity:
+  q = np.ones(n) if charges is None else np.asarray(charges, dtype=float)
+  for k in [x for x in range(n) if x not in actuators]: M[:,:,k] = M[:,k,:]*q[k]/q[None,:]
+ return t, M
+
+
+def tof_matrix(t, M, threshold=0.1):
+ ''' envelope onsets of M [nt, receiver, actuator] (drive started at t=0), NaN for missing signals '''
+ n = M.shape[1]; t, V = uniform(t, M.reshape(len(t), -1)); V = V-np.mean(V, 0)[None,:]
+ ok = np.all(np.isfinite(V), 0) & (np.max(np.abs(V), 0)>0.)
+ tof = np.full(V.shape[1], np.nan)
+ if np.any(ok): tof[ok] = arrival(t, envelope(V[:,ok]), threshold)
+ return tof.reshape(n, n)
+
+
+def _set_number(name):
+ ''' 'PZT10_MNTOP' -> (10, 'PZT10_MNTOP'): transducers in numbering order (PZT2 before PZT10) '''
+ m = re.match(r'\D*(\d+)', name)
+ return (int(m.group(1)) if m else -1, name)
+
+
+def odb_signals(fname, step='dyna', variable='EPOT', pattern='_MNTOP'):
+ ''' history of the master node of every transducer (node sets *<pattern>, by transducer number) of an ODB '''
+ from odbAccess import openOdb
+ from abqtools.odbpost import node_history
+ odb = openOdb(fname, readOnly=True)
+ try:
+  out = None
+  for inst in odb.rootAssembly.instances.values():
+   keys = sorted([k for k in inst.nodeSets.keys() if k.endswith(pattern)], key=_set_number)
+   if not keys: continue
+   out = node_history(odb.steps[step], variable, inst.name, [inst.nodeSets[k].nodes[0].label for k in keys])
+   break
+ finally:
+  odb.close()
+ return out
+
+
+if __name__=='__main__':
+ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ for fname in sys.argv[1:]:
+  if fname.endswith('.odb'):
+   t, V = odb_signals(fname); job = fname[:-4]
+  else:
+   rec = np.load(fname); t, V = rec['t'], rec['V']; job = fname[:-9] if fname.endswith('_epot.npz') else fname[:-4]
+  res = pitch_catch(t, V); save_pitch_catch(job+'_pitchcatch.npz', res)
+  print(os.path.basename(job)+': time of flight (onset) '+str(res['tof_onset'].tolist())+', (xcorr) '+str(res['tof_xcorr'].tolist()))
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+
+'''
+ ARTS ET METIERS - ABAQUS DEMOS
+
+ Parameter sweeps with a content-addressed result cache
+ key = hash(demo script and imported abqtools sources + demo parameters with the overrides), the cached entry holds
+ the input files, the ODBs and the scalars saved by the demo
+
+ usage: python sweep.py demo_X.py points.json [cachedir]
+        points.json = [{"param": {"selt": 0.05}}, {"param": {"rad": 2e-3}, "mat": {...}}, ...]
+
+ PIMM - PARIS - FRANCE
+
+ v0.0 - 18/10/2026
+'''
+
+import os
+import re
+import sys
+import copy
+import json
+import time
+import glob
+import shutil
+import hashlib
+import subprocess
+
+ABAQUS = os.environ.get('ABAQUS_CMD', 'abaqus')
+CACHE = os.environ.get('ABQ_DEMO_CACHE', os.path.join(os.path.expanduser('~'), '.abq_demo_cache'))
+TIMEOUT = float(os.environ.get('ABQ_WORKER_TIMEOUT', 6*3600.))
+KEPT = ('*.inp', '*.odb', '*.bsp', '*_results.json', '*_timing.json')
+
+
+def _native(x):
+ ''' json objects -> native str (python 2 returns unicode) '''
+ if isinstance(x, dict): return dict([(_native(k), _native(v)) for k, v in x.items()])
+ if isinstance(x, list): return [_native(v) for v in x]
+ if type(x).__name__=='unicode': return str(x)
+ return x
+
+
+def _update(d, new):
+ for k, v in new.items():
+  if isinstance(v, dict) and isinstance(d.get(k), dict): _update(d[k], v)
+  else: d[k] = v
+
+
+def point_file():
+ ''' json file passed after '--' (abaqus cae noGUI=demo_X.py -- point.json) or by $ABQ_DEMO_POINT '''
+ args = sys.argv[sys.argv.index('--')+1:] if '--' in sys.argv else []
+ args = [x for x in args if x.endswith('.json')]
+ return args[-1] if args else os.environ.get('ABQ_DEMO_POINT', '')
+
+
+def apply_overrides(**dicts):
+ ''' update in place the parameter dicts of a demo (param=param, mat=mat, ...) from the sweep point '''
+ fname = point_file()
+ if not fname or not os.path.isfile(fname): return dict()
+ with open(fname) as f: point = _native(json.load(f))
+ for key in point.keys():
+  if key in dicts: _update(dicts[key], point[key])
+ return point
+
+
+def save_results(jobname, **scalars):
+ ''' scalar results of a demo -> <jobname>_results.json (kept by the cache) '''
+ tolist = lambda x: x.tolist() if hasattr(x, 'tolist') else x
+ with open(os.path.join(os.getcwd(), jobname+'_results.json'), 'w') as f:
+  json.dump(dict([(k, tolist(v)) for k, v in scalars.items()]), f, indent=1, sort_keys=True)
+
+
+def _normal(x):
+ ''' floats rounded to 12 significant digits (1e-3 and 0.001 give the same key) '''
+ if isinstance(x, dict): return dict([(str(k), _normal(v)) for k, v in x.items()])
+ if isinstance(x, (list, tuple)): return [_normal(v) for v in x]
+ if isinstance(x, float): return float('%.12g' % x)
+ return x
+
+
+def param_key(**desc):
+ ''' content address of a model description (parameter values only) '''
+ return hashlib.sha1(json.dumps(_normal(desc), sort_keys=True, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+
+def helper_sources(script):
+ ''' abqtools modules imported by a script, directly or through other abqtools modules -> sorted paths '''
+ root = os.path.dirname(os.path.abspath(__file__)); todo, found = [script], set()
+ while todo:
+  with open(todo.pop(), 'rb') as f: src = f.read().decode('latin-1')
+  for name in re.findall(r'^\s*(?:from|import)\s+abqtools\.(\w+)', src, re.M):
+   fname = os.path.join(root, name+'.py')
+   if fname not in found and os.path.isfile(fname): found.add(fname); todo.append(fname)
+ return sorted(found)
+
+
+def defaults(script):
+ ''' parameter dicts of a demo (param, mat, simu, ...) from its PARAMETERS section, empty if not readable '''
+ with open(script, 'rb') as f: src = f.read().decode('latin-1')
+ m = re.search(r'^# PARAMETERS.*?\n(.*?)^# SWEEP OVERRIDES', src, re.M | re.S)
+ env = dict()
+ try:
+  exec(m.group(1), dict(), env)
+ except Exception:
+  return dict()
+ return dict([(k, v) for k, v in env.items() if isinstance(v, dict)])
+
+
+def cache_key(script, point):
+ ''' content address of a sweep point: script and imported abqtools sources + normalized parameter
+     dicts of the demo with the overrides applied (an override equal to the default gives the same key) '''
+ h = hashlib.sha1()
+ for fname in [script]+helper_sources(script):
+  with open(fname, 'rb') as f: h.update(f.read())
+ merged = defaults(script); _update(merged, copy.deepcopy(_native(point)))
+ h.update(json.dumps(_normal(merged), sort_keys=True, separators=(',', ':')).encode('utf-8'))
+ return h.hexdigest()
+
+
+class ResultCache(object):
+ ''' directory of entries <root>/<key>/ with meta.json written last (complete entries only) '''
+
+ def __init__(self, root=CACHE, max_bytes=None, max_age=None):
+  self.root, self.max_bytes, self.max_age = root, max_bytes, max_age
+  if not os.path.isdir(root): os.makedirs(root)
+
+ def path(self, key):
+  return os.path.join(self.root, key)
+
+ def get(self, key):
+  ''' meta of a complete entry (None if missing), refreshes its access time '''
+  fname = os.path.join(self.path(key), 'meta.json')
+  if not os.path.isfile(fname): return None
+  with open(fname) as f: meta = json.load(f)
+  os.utime(fname, None)
+  return meta
+
+ def put(self, key, files, meta):
+  ''' copy files into the entry, then write meta.json '''
+  tmp = self.path(key)+'.tmp'+str(os.getpid())
+  if os.path.isdir(tmp): shutil.rmtree(tmp)
+  os.makedirs(tmp)
+  for x in files: shutil.copy2(x, tmp)
+  meta = dict(meta); meta['files'] = sorted([os.path.basename(x) for x in files]); meta['created'] = time.time()
+  with open(os.path.join(tmp, 'meta.json'), 'w') as f: json.dump(meta, f, indent=1, sort_keys=True)
+  if os.path.isdir(self.path(key)): shutil.rmtree(self.path(key))
+  os.rename(tmp, self.path(key))
+  self.evict()
+  return meta
+
+ def entries(self):
+  ''' [(last access, size, key)] of the complete entries '''
+  out = []
+  for key in os.listdir(self.root):
+   fname = os.path.join(self.root, key, 'meta.json')
+   if not os.path.isfile(fname): continue
+   size = sum([os.path.getsize(os.path.join(self.root, key, x)) for x in os.listdir(os.path.join(self.root, key))])
+   out.append((os.path.getmtime(fname), size, key))
+  return sorted(out)
+
+ def evict(self, max_bytes=None, max_age=None):
+  ''' remove entries older than max_age (s), then the least recently used ones above max_bytes '''
+  max_bytes = max_bytes if max_bytes is not None else self.max_bytes
+  max_age = max_age if max_age is not None else self.max_age
+  allk = self.entries(); now = time.time(); removed = []
+  if max_age is not None:
+   removed += [x for x in allk if now-x[0]>max_age]; allk = [x for x in allk if now-x[0]<=max_age]
+  if max_bytes is not None:
+   total = sum([x[1] for x in allk])
+   while allk and total>max_bytes: x = allk.pop(0); total -= x[1]; removed.append(x)
+  for x in removed: shutil.rmtree(self.path(x[2]), ignore_errors=True)
+  return [x[2] for x in removed]
+
+
+def run_point(script, point, workdir, cmd=ABAQUS, queue=None, timeout=TIMEOUT):
+ ''' build (and run if param['run']) a demo in workdir with the given overrides
+     (by the persistent worker serving queue if given, see worker.py: failed status
+     if no result within timeout seconds, the request is then cancelled) '''
+ if queue:
+  from abqtools.worker import submit, wait, cancel
+  t0 = time.time(); rid = submit(script, point, workdir, queue=queue, build_only=False)
+  res = wait([rid], queue=queue, timeout=timeout)[0]
+  if res is None:
+   cancel([rid], queue=queue)
+   return 1, time.time()-t0
+  return res['status'], res['wall']
+ if not os.path.isdir(workdir): os.makedirs(workdir)
+ with open(os.path.join(workdir, 'point.json'), 'w') as f: json.dump(point, f, sort_keys=True)
+ t0 = time.time()
+ status = subprocess.call(cmd+' cae noGUI='+os.path.abspath(script)+' -- point.json', shell=True, cwd=workdir)
+ return status, time.time()-t0
+
+
+def sweep(script, points, cache=None, workroot=None, cmd=ABAQUS, queue=None):
+ ''' run all points of a sweep, skipping meshing and solving for cached ones
+     -> [(key, meta, hit)], meta['results'] holding the scalars saved by the demo '''
+ cache = cache if cache is not None else ResultCache()
+ workroot = workroot or os.path.join(os.getcwd(), 'sweep')
+ out = []
+ for point in points:
+  key = cache_key(script, point); meta = cache.get(key)
+  if meta is not None: out.append((key, meta, True)); continue
+  workdir = os.path.join(workroot, key[:12])
+  if os.path.isdir(workdir): shutil.rmtree(workdir)
+  status, dt = run_point(script, point, workdir, cmd=cmd, queue=queue)
+  files = sorted(set(sum([glob.glob(os.path.join(workdir, x)) for x in KEPT], [])))
+  results = dict()
+  for x in files:
+   if x.endswith('_results.json'):
+    with open(x) as f: results[os.path.basename(x)[:-13]] = json.load(f)
+  meta = dict([('script', os.path.basename(script)), ('point', point), ('status', status), ('time', dt), ('results', results)])
+  if status==0: meta = cache.put(key, files, meta)
+  out.append((key, meta, False))
+ return out
+
+
+if __name__=='__main__':
+ with open(sys.argv[2]) as f: points = json.load(f)
+ cache = ResultCache(sys.argv[3]) if len(sys.argv)>3 else ResultCache()
+ for key, meta, hit in sweep(sys.argv[1], points, cache=cache):
+  print(key[:12]+(' hit  ' if hit else ' run  ')+json.dumps(meta['point'], sort_keys=True)+' '+json.dumps(meta['results'], sort_keys=True))
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+'''
+ ARTS ET METIERS - ABAQUS DEMOS
+
+ Per-phase instrumentation of the demo scripts: wall time, peak RSS of the
+ CAE kernel and entity counts per section, one JSON record per run
+
+ PIMM - PARIS - FRANCE
+
+ v0.0 - 18/10/2026
+'''
+
+import os
+import json
+import time
+
+
+def peak_rss():
+ ''' peak resident memory of the current process (MB), None if unknown '''
+ try:
+  import resource, sys
+  rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  return rss/1024.**2 if sys.platform=='darwin' else rss/1024.
+ except ImportError:
+  pass
+ try:
+  import ctypes
+  from ctypes import wintypes
+  class PMC(ctypes.Structure):
+   _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD)]+[(x, ctypes.c_size_t) for x in
+     ('PeakWorkingSetSize', 'WorkingSetSize', 'QuotaPeakPagedPoolUsage', 'QuotaPagedPoolUsage',
+      'QuotaPeakNonPagedPoolUsage', 'QuotaNonPagedPoolUsage', 'PagefileUsage', 'PeakPagefileUsage')]
+  pmc = PMC(); pmc.cb = ctypes.sizeof(PMC)
+  ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(pmc), pmc.cb)
+  return pmc.PeakWorkingSetSize/1024.**2
+ except Exception:
+  return None
+
+
+class PhaseTimer(object):
+ ''' tm.phase('MESH') closes the running phase and opens a new one, tm.count(nodes=...) attaches
+     entity counts to the running phase, tm.save() writes <name>_timing.json '''
+
+ def __init__(self, name):
+  self.name, self.t0, self.phases, self.current = name, time.time(), [], None
+
+ def phase(self, name):
+  self.stop()
+  self.current = dict([('name', name), ('start', time.time()-self.t0), ('counts', dict())])
+
+ def count(self, **counts):
+  if self.current is None: self.phase('')
+  self.current['counts'].update(dict([(k, int(v)) for k, v in counts.items()]))
+
+ def stop(self):
+  if self.current is None: return
+  self.current['wall'] = time.time()-self.t0-self.current['start']; self.current['rss_peak_mb'] = peak_rss()
+  self.phases.append(self.current); self.current = None
+
+ def summary(self):
+  ''' wall time and counts per phase name (phases run in loops are summed) '''
+  out = dict()
+  for x in self.phases:
+   y = out.setdefault(x['name'], dict([('wall', 0.), ('calls', 0), ('counts', dict())]))
+   y['wall'] += x['wall']; y['calls'] += 1; y['counts'].update(x['counts'])
+  return out
+
+ def record(self):
+  self.stop()
+  return dict([('script', self.name), ('date', time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.t0))),
+    ('total', time.time()-self.t0), ('rss_peak_mb', peak_rss()), ('phases', self.phases), ('summary', self.summary())])
+
+ def save(self, folder=None):
+  ''' <name>_timing.json in folder (default: current directory), also appended to $ABQ_DEMO_TIMING_LOG '''
+  rec = self.record()
+  with open(os.path.join(folder or os.getcwd(), self.name+'_timing.json'), 'w') as f: json.dump(rec, f, indent=1, sort_keys=True)
+  if os.environ.get('ABQ_DEMO_TIMING_LOG'):
+   with open(os.environ['ABQ_DEMO_TIMING_LOG'], 'a') as f: f.write(json.dumps(rec, sort_keys=True)+'\n')
+  return rec
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+'''
+ ARTS ET METIERS - ABAQUS DEMOS
+
+ Beam cross-section properties without Abaqus: 4-node quadrilateral mesh of the section,
+ Saint-Venant warping function (Laplace problem, sparse when SciPy is available),
+ area, centroid, second moments, torsion constant, shear centre, warping constant
+ and a *BEAM GENERAL SECTION, SECTION=GENERAL data file (.bsp)
+
+ usage: python warping.py R E selt [out.bsp]      (circle of radius R minus centred square of side E)
+
+ PIMM - PARIS - FRANCE
+
+ v0.0 - 18/10/2026
+'''
+
+import sys
+import json
+import numpy as np
+
+GAUSS = np.array([-1., 1.])/np.sqrt(3.)
+
+
+def ring_mesh(outer, inner, nr, nt):
+ ''' quadrilateral mesh between two star-shaped boundaries r=inner(theta) < r=outer(theta)
+     -> xy [nnode, 2], conn [nelt, 4] (counter-clockwise) '''
+ t = 2.*np.pi*np.arange(nt)/nt; s = np.linspace(0., 1., nr+1)
+ ri, ro = inner(t), outer(t)
+ r = ri[None,:]+s[:,None]*(ro-ri)[None,:]
+ xy = np.column_stack([(r*np.cos(t)[None,:]).ravel(), (r*np.sin(t)[None,:]).ravel()])
+ i, j = np.meshgrid(np.arange(nr), np.arange(nt), indexing='ij'); i, j = i.ravel(), j.ravel()
+ n = lambda a, b: a*nt+b%nt
+ return xy, np.column_stack([n(i, j), n(i+1, j), n(i+1, j+1), n(i, j+1)])
+
+
+def section_mesh(R, E, selt):
+ ''' circle of radius R minus the centred square of side E (section of demo_MeshedCrossSectionBeam),
+     square corners on mesh lines (8k angular divisions) '''
+ nt = 8*max(1, int(np.ceil(2.*np.pi*R/selt/8.))); nr = max(1, int(np.ceil((R-E/2.)/selt)))
+ inner = lambda t: E/2./np.maximum(np.abs(np.cos(t)), np.abs(np.sin(t)))
+ return ring_mesh(lambda t: R+0.*t, inner, nr, nt)
+
+
+def _shape(xy, conn):
+ ''' gauss point shape functions, gradients and weights of every element (2x2 points) '''
+ N, G, W = [], [], []
+ X = xy[conn]
+ for xi in GAUSS:
+  for eta in GAUSS:
+   n = 0.25*np.array([(1-xi)*(1-eta), (1+xi)*(1-eta), (1+xi)*(1+eta), (1-xi)*(1+eta)])
+   dn = 0.25*np.array([[-(1-eta), (1-eta), (1+eta), -(1+eta)], [-(1-xi), -(1+xi), (1+xi), (1-xi)]])
+   J = np.einsum('ak,ekb->eab', dn, X)
+   det = J[:,0,0]*J[:,1,1]-J[:,0,1]*J[:,1,0]
+   Jinv = np.stack([np.stack([J[:,1,1], -J[:,0,1]], 1), np.stack([-J[:,1,0], J[:,0,0]], 1)], 1)/det[:,None,None]
+   N.append(n); G.append(np.einsum('eab,bk->eak', Jinv, dn)); W.append(det)
+ return N, G, W
+
+
+def _solve(K, f, n):
+ ''' K u = f with u[0] = 0 (K singular: constant mode), K given as (rows, cols, values) '''
+ rows, cols, vals = K
+ try:
+  import scipy.sparse as sp
+  from scipy.sparse.linalg import spsolve
+  A = sp.csr_matrix((vals, (rows, cols)), shape=(n, n))[1:,1:]
+  return np.r_[0., spsolve(A.tocsc(), f[1:])]
+ except ImportError:
+  A = np.zeros((n, n)); np.add.at(A, (rows, cols), vals)
+  return np.r_[0., np.linalg.solve(A[1:,1:], f[1:])]
+
+
+def section_properties(xy, conn):
+ ''' area, centroid, second moments (centroidal, I11=int(x2^2)), torsion constant, shear centre,
+     warping constant (warping function normalized at the shear centre) -> dict, warping function '''
+ N, G, W = _shape(xy, conn)
+ gp = lambda v: [np.einsum('ek,ke->e', v[conn], n[:,None]*np.ones((1, len(conn)))) for n in N]
+ integ = lambda vals: sum([np.sum(v*w) for v, w in zip(vals, W)])
+ x, y = gp(xy[:,0]), gp(xy[:,1])
+ A = integ([np.ones_like(w) for w in W])
+ xc, yc = integ(x)/A, integ(y)/A
+ x, y = [v-xc for v in x], [v-yc for v in y]; xy0 = xy-np.array([xc, yc])
+ I11, I22, I12 = integ([v*v for v in y]), integ([v*v for v in x]), integ([u*v for u, v in zip(x, y)])
+ #warping function: int grad(w).grad(v) = int (y dv/dx - x dv/dy)
+ n = len(xy); f = np.zeros(n); Ke = 0.
+ for xg, yg, g, w in zip(x, y, G, W):
+  Ke = Ke+np.einsum('eak,eal->ekl', g, g)*w[:,None,None]
+  np.add.at(f, conn, (yg[:,None]*g[:,0,:]-xg[:,None]*g[:,1,:])*w[:,None])
+ rows = np.repeat(conn, 4, 1).ravel(); cols = np.tile(conn, (1, 4)).ravel()
+ omega = _solve((rows, cols, Ke.ravel()), f, n)
+ dwx, dwy = [np.einsum('ek,ek->e', g[:,0,:], omega[conn]) for g in G], [np.einsum('ek,ek->e', g[:,1,:], omega[conn]) for g in G]
+ J = I11+I22+integ([a*b-c*d for a, b, c, d in zip(x, dwy, y, dwx)])
+ #shear centre: warping about the pole orthogonal to x and y
+ w = gp(omega); Iwx, Iwy = integ([a*b for a, b in zip(w, x)]), integ([a*b for a, b in zip(w, y)])
+ xs, ys = np.linalg.solve([[I12, -I22], [I11, -I12]], [-Iwx, -Iwy])
+ omega = omega-ys*xy0[:,0]+xs*xy0[:,1]; w = gp(omega)
+ omega = omega-integ(w)/A; w = gp(omega)
+ props = dict([('A', A), ('centroid', [xc, yc]), ('I11', I11), ('I12', I12), ('I22', I22), ('J', J),
+   ('shear_center', [xc+xs, yc+ys]), ('Gamma0', 0.), ('Gammaw', integ([v*v for v in w]))])
+ return dict([(k, np.asarray(v).tolist()) for k, v in props.items()]), omega
+
+
+def write_bsp(fname, props, young, nu, n1=(0.0, 0.0, -1.0)):
+ ''' data lines of *BEAM GENERAL SECTION, SECTION=GENERAL (A, I11, I12, I22, J, Gamma0, Gammaw / n1 / E, G)
+     with the *CENTROID and *SHEAR CENTER options '''
+ fmt = lambda v: ', '.join(['%.8e' % x for x in v])
+ with open(fname, 'w') as f:
+  f.write('** section properties (warping function, NumPy)\n')
+  f.write(fmt([props[k] for k in ('A', 'I11', 'I12', 'I22', 'J', 'Gamma0', 'Gammaw')])+'\n')
+  f.write(fmt(n1)+'\n'+fmt([young, young/(2.*(1.+nu))])+'\n')
+  f.write('*CENTROID\n'+fmt(props['centroid'])+'\n*SHEAR CENTER\n'+fmt(props['shear_center'])+'\n')
+
+
+if __name__=='__main__':
+ R, E, selt = [float(x) for x in sys.argv[1:4]]
+ xy, conn = section_mesh(R, E, selt); props, omega = section_properties(xy, conn)
+ print(str(len(xy))+' nodes, '+str(len(conn))+' elements'); print(json.dumps(props, indent=1, sort_keys=True))
+ if len(sys.argv)>4: write_bsp(sys.argv[4], props, 70e9, 0.3)
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+'''
+ ARTS ET METIERS - ABAQUS DEMOS
+
+ Guided wave speeds of an isotropic plate (bulk, Rayleigh-Lamb A0/S0 roots) and
+ automatic element size, time increment and output interval for a given frequency
+
+ usage: python waves.py E nu rho thickness frequency [--quad]
+
+ PIMM - PARIS - FRANCE
+
+ v0.0 - 18/10/2026
+'''
+
+import sys
+import numpy as np
+
+# elements per shortest wavelength (linear elements; quadratic: half), increments and outputs per period
+EPW = 10.
+PPC = 20.
+OPC = 10.
+
+
+def bulk_speeds(E, nu, rho):
+ ''' longitudinal and shear wave speeds -> cL, cT '''
+ return np.sqrt(E*(1.-nu)/(rho*(1.+nu)*(1.-2.*nu))), np.sqrt(E/(2.*rho*(1.+nu)))
+
+
+def _sc(x2, h):
+ ''' sin(x h)/x and cos(x h) as real functions of x^2 (x imaginary when x^2<0) '''
+ x = np.sqrt(np.abs(x2))
+ sx = np.where(x2>=0., np.sin(x*h), np.sinh(x*h))/np.where(x>0., x, 1.)
+ sx = np.where(x>0., sx, h)
+ return sx, np.where(x2>=0., np.cos(x*h), np.cosh(x*h))
+
+
+def rayleigh_lamb(c, f, d, cL, cT, mode='A'):
+ ''' Rayleigh-Lamb characteristic function (real, no pole) at phase speeds c, frequency f, thickness d '''
+ w = 2.*np.pi*f; k = w/np.asarray(c, dtype=float); h = d/2.
+ p2 = (w/cL)**2-k**2; q2 = (w/cT)**2-k**2
+ sp, cp = _sc(p2, h); sq, cq = _sc(q2, h)
+ if mode=='A': return (q2-k**2)**2*sp*cq+4.*k**2*q2*cp*sq
+ return (q2-k**2)**2*cp*sq+4.*k**2*p2*sp*cq
+
+
+def lamb_speed(f, d, cL, cT, mode='A', n=2000):
+ ''' phase speed of the fundamental mode (A0 or S0): lowest root, refined by bisection
+     (scan from k*d/2=300, below which sinh overflows) '''
+ c = np.linspace(max(1e-3*cT, np.pi*f*d/300.), 1.5*cL, n); y = rayleigh_lamb(c, f, d, cL, cT, mode)
+ j1 = np.nonzero(np.sign(y[:-1])*np.sign(y[1:])<0)[0]
+ if len(j1)==0: return None
+ c0, c1 = c[j1[0]], c[j1[0]+1]
+ for _ in range(60):
+  cm = 0.5*(c0+c1)
+  if np.sign(rayleigh_lamb(cm, f, d, cL, cT, mode))==np.sign(rayleigh_lamb(c0, f, d, cL, cT, mode)): c0 = cm
+  else: c1 = cm
+ return float(0.5*(c0+c1))
+
+
+def wave_speeds(E, nu, rho, d, f):
+ ''' bulk, plate (low frequency S0), A0 and S0 phase speeds at f '''
+ cL, cT = bulk_speeds(E, nu, rho)
+ return dict([('cL', float(cL)), ('cT', float(cT)), ('cP', float(np.sqrt(E/(rho*(1.-nu**2))))),
+   ('A0', lamb_speed(f, d, cL, cT, 'A')), ('S0', lamb_speed(f, d, cL, cT, 'S'))])
+
+
+def auto_size(E, nu, rho, d, f, quad=False, epw=EPW, ppc=PPC, opc=OPC, dim=None, tend=None):
+ ''' element size from the shortest wavelength at f (A0, S0, SH0=cT), max increment and output interval
+     from the period; with dim (plate box) and tend: estimated nodes, DOF and increments '''
+ v = wave_speeds(E, nu, rho, d, f)
+ cmin = min([x for x in (v['A0'], v['S0'], v['cT']) if x])
+ out = dict([('speeds', v), ('cmin', cmin), ('wavelength', cmin/f), ('frequency', f)])
+ out['selt'] = out['wavelength']/(epw/2. if quad else epw)
+ out['dt'] = 1./(f*ppc); out['tout'] = 1./(f*opc)
+ if dim is not None:
+  order = 2 if quad else 1
+  nelt = [max(1, int(np.ceil(x/out['selt']))) for x in dim]
+  out['elements'] = int(np.prod(nelt)); out['nodes'] = int(np.prod([order*x+1 for x in nelt])); out['dof'] = 3*out['nodes']
+ if tend is not None:
+  out['increments'] = int(np.ceil(tend/out['dt'])); out['frames'] = int(np.ceil(tend/out['tout']))+1
+ return out
+
+
+def print_sizing(size):
+ v = size['speeds']
+ print('wave speeds (m/s): cL=%.0f cT=%.0f cP=%.0f A0=%s S0=%s at %.3g Hz' % (v['cL'], v['cT'], v['cP'],
+   '%.0f' % v['A0'] if v['A0'] else '-', '%.0f' % v['S0'] if v['S0'] else '-', size['frequency']))
+ print('shortest wavelength %.3g m -> element size %.3g m, max increment %.3g s, output interval %.3g s'
+   % (size['wavelength'], size['selt'], size['dt'], size['tout']))
+ if 'dof' in size: print('plate mesh: ~%d elements, ~%d nodes, ~%d DOF' % (size['elements'], size['nodes'], size['dof']))
+ if 'increments' in size: print('time integration: %d increments, %d output frames' % (size['increments'], size['frames']))
+
+
+if __name__=='__main__':
+ E, nu, rho, d, f = [float(x) for x in sys.argv[1:6]]
+ print_sizing(auto_size(E, nu, rho, d, f, quad='--quad' in sys.argv))
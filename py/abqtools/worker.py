@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+
+'''
+ ARTS ET METIERS - ABAQUS DEMOS
+
+ Persistent build worker: the CAE kernel is started once and serves a file queue,
+ every request builds one demo (fresh Mdb() at the top of the demo) with its overrides
+ in its work directory and returns status, timings and written files
+
+ usage: abaqus cae noGUI=worker.py -- queuedir       (CAE kernel)
+        python worker.py --local queuedir            (local stand-in: same queue, plain python, decks of
+                                                       the plate demos written by inpgen, no solve)
+ queue: <id>.req.json (request) -> <id>.run.json (claimed) -> <id>.res.json (result), 'stop' ends the worker,
+        <id>.cancel drops the request (not started) or its result (running)
+
+ PIMM - PARIS - FRANCE
+
+ v0.0 - 18/10/2026
+'''
+
+import os
+import sys
+import copy
+import json
+import glob
+import time
+import uuid
+import inspect
+import traceback
+import subprocess
+
+HERE = os.path.abspath(inspect.getfile(inspect.currentframe()))
+sys.path.insert(0, os.path.dirname(os.path.dirname(HERE)))
+from abqtools.sweep import ABAQUS, _update
+
+# demos built by the local stand-in: script -> (inpgen geometry, job name of the demo)
+LOCAL = dict([('demo_PlateWithHole', ('PlateWithHole', 'demo_PlateWithHole')), ('demo_CrossPlate', ('CrossPlate', 'demo_TensileTest'))])
+
+QUEUE = os.environ.get('ABQ_WORKER_QUEUE', os.path.join(os.path.expanduser('~'), '.abq_worker_queue'))
+
+
+def _write(fname, data):
+ ''' json written next to fname then renamed (readers never see a partial file) '''
+ with open(fname+'.tmp', 'w') as f: json.dump(data, f, indent=1, sort_keys=True)
+ if os.path.isfile(fname): os.remove(fname)
+ os.rename(fname+'.tmp', fname)
+
+
+def local_build(script, point):
+ ''' deck of a plate demo written by inpgen with the overrides of point (no CAE kernel, no solve) '''
+ from abqtools.inpgen import PARAM, MAT, write_plate_inp, graded_divisions
+ name = os.path.basename(script)[:-3]
+ if name not in LOCAL: raise RuntimeError(name+' needs the CAE kernel (local stand-in: '+', '.join(sorted(LOCAL.keys()))+')')
+ geometry, jobname = LOCAL[name]
+ param, mat = copy.deepcopy(PARAM[geometry]), copy.deepcopy(MAT)
+ _update(param, point.get('param', dict())); _update(mat, point.get('mat', dict()))
+ bias, div = 1., None
+ if param.get('mesh')=='graded':
+  bias = param.get('bias', 8.); div = graded_divisions(param, geometry, param.get('nelt', 400), bias)
+ write_plate_inp(os.path.join(os.getcwd(), jobname+'.inp'), param, geometry, mat=mat, bias=bias, div=div)
+
+
+def execute(req, local=False):
+ ''' build one demo in its work directory (local: local_build) -> result dict (errors reported, never raised) '''
+ workdir = os.path.abspath(req['workdir']); script = os.path.abspath(req['script'])
+ if not os.path.isdir(workdir): os.makedirs(workdir)
+ fpoint = os.path.join(workdir, 'point.json'); _write(fpoint, req['point'])
+ cwd = os.getcwd(); os.chdir(workdir); os.environ['ABQ_DEMO_POINT'] = fpoint
+ status, error, t0 = 0, '', time.time()
+ try:
+  if local:
+   local_build(script, req['point'])
+  else:
+   with open(script) as f: code = compile(f.read(), script, 'exec')
+   exec(code, dict([('__name__', '__main__'), ('__file__', script)]))
+ except SystemExit as e:
+  status = e.code if isinstance(e.code, int) else int(e.code is not None)
+ except Exception:
+  status, error = 1, traceback.format_exc()
+ finally:
+  os.chdir(cwd); del os.environ['ABQ_DEMO_POINT']
+ out = dict([('id', req['id']), ('script', script), ('workdir', workdir), ('status', status), ('error', error),
+   ('wall', time.time()-t0), ('files', sorted(glob.glob(os.path.join(workdir, '*.inp'))+glob.glob(os.path.join(workdir, '*.cae'))))])
+ ftime = os.path.join(workdir, os.path.basename(script)[:-3]+'_timing.json')
+ if os.path.isfile(ftime) and os.path.getmtime(ftime)>=t0:
+  with open(ftime) as f: out['timing'] = json.load(f)['summary']
+ return out
+
+
+def serve(queue=QUEUE, poll=0.2, idle=None, local=False):
+ ''' serve the queue until 'stop' appears (or idle seconds without request) -> number of requests '''
+ if not os.path.isdir(queue): os.makedirs(queue)
+ n, last = 0, time.time()
+ while not os.path.isfile(os.path.join(queue, 'stop')):
+  pending = sorted(glob.glob(os.path.join(queue, '*.req.json')), key=os.path.getmtime)
+  if not pending:
+   if idle is not None and time.time()-last>idle: break
+   time.sleep(poll); continue
+  run = pending[0][:-9]+'.run.json'
+  try:
+   os.rename(pending[0], run)
+  except OSError:
+   continue
+  with open(run) as f: req = json.load(f)
+  if not os.path.isfile(run[:-9]+'.cancel'):
+   res = execute(req, local=local)
+   if not os.path.isfile(run[:-9]+'.cancel'): _write(run[:-9]+'.res.json', res)
+  if os.path.isfile(run[:-9]+'.cancel'): os.remove(run[:-9]+'.cancel')
+  os.remove(run)
+  n += 1; last = time.time()
+ if os.path.isfile(os.path.join(queue, 'stop')): os.remove(os.path.join(queue, 'stop'))
+ return n
+
+
+def submit(script, point, workdir, queue=QUEUE, build_only=True):
+ ''' queue a build of script with the overrides point in workdir (param['run']=False if build_only) -> id '''
+ if not os.path.isdir(queue): os.makedirs(queue)
+ point = copy.deepcopy(point)
+ if build_only: point.setdefault('param', dict())['run'] = False
+ rid = uuid.uuid4().hex
+ _write(os.path.join(queue, rid+'.req.json'), dict([('id', rid), ('script', os.path.abspath(script)), ('point', point),
+   ('workdir', os.path.abspath(workdir))]))
+ return rid
+
+
+def wait(ids, queue=QUEUE, timeout=None, poll=0.2):
+ ''' results of the requests ids (in order), None for the ones not done before timeout '''
+ t0 = time.time(); out = dict()
+ while len(out)<len(ids) and (timeout is None or time.time()-t0<timeout):
+  for rid in ids:
+   fname = os.path.join(queue, rid+'.res.json')
+   if rid in out or not os.path.isfile(fname): continue
+   with open(fname) as f: out[rid] = json.load(f)
+   os.remove(fname)
+  if len(out)<len(ids): time.sleep(poll)
+ return [out.get(rid) for rid in ids]
+
+
+def cancel(ids, queue=QUEUE):
+ ''' withdraw requests: removed if not claimed, else marked so that the worker drops the result '''
+ for rid in ids:
+  fname = os.path.join(queue, rid+'.req.json')
+  try:
+   os.remove(fname); continue
+  except OSError:
+   pass
+  if os.path.isfile(os.path.join(queue, rid+'.res.json')): os.remove(os.path.join(queue, rid+'.res.json'))
+  elif os.path.isfile(os.path.join(queue, rid+'.run.json')):
+   with open(os.path.join(queue, rid+'.cancel'), 'w') as f: f.write('')
+
+
+def start(queue=QUEUE, cmd=ABAQUS, local=False):
+ ''' worker process in the background (CAE kernel, or the local stand-in) -> Popen '''
+ if local: return subprocess.Popen([sys.executable, HERE, '--local', queue])
+ return subprocess.Popen(cmd+' cae noGUI='+HERE+' -- '+queue, shell=True)
+
+
+def stop(queue=QUEUE):
+ with open(os.path.join(queue, 'stop'), 'w') as f: f.write('')
+
+
+if __name__=='__main__':
+ args = sys.argv[sys.argv.index('--')+1:] if '--' in sys.argv else sys.argv[1:]
+ args = [x for x in args if x!='--local']
+ print('worker: '+str(serve(args[0] if args else QUEUE, local='--local' in sys.argv))+' requests served')
@@ -14,9 +14,15 @@ from abaqus import *
 from abaqusConstants import *
 from caeModules import *
 import numpy as np
-import os
+import os, sys, inspect
+sys.path.insert(0, os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe()))))
+from abqtools.outplan import estimate, fit_budget, print_plan
+from abqtools.jobs import run_inputs
+from abqtools.sweep import apply_overrides
+from abqtools.timing import PhaseTimer
 
 Mdb()
+tm = PhaseTimer('demo_3DTensileTest')
 
 # PARAMETERS  (units: SI)
 #----------------------------------------------------------------------------
@@ -26,11 +32,17 @@ param['red']=[2.e-3,1.]                 # middle thickness & radius
 param['load']=100.                      # force amplitude & velocity
 param['quad']=True                      # linear/quadratic elements
 param['selt']=5.e-3                     # element size
+param['outbudget']=None                 # ODB budget (MB): output requests planned before submission
 param['run']=False                      # run
 
+# SWEEP OVERRIDES  (abaqus cae noGUI=demo_3DTensileTest.py -- point.json)
+#----------------------------------------------------------------------------
+apply_overrides(param=param)
+
 
 # MATERIAL (11 22 33 12 13 23)
 #----------------------------------------------------------------------------
+tm.phase('MATERIAL')
 mdb.models['Model-1'].Material(name='alu')
 mdb.models['Model-1'].materials['alu'].Density(table=((2700.0, ), ))
 mdb.models['Model-1'].materials['alu'].Elastic(table=((70.0e9, 0.3), ))
@@ -38,6 +50,7 @@ mdb.models['Model-1'].materials['alu'].Elastic(table=((70.0e9, 0.3), ))
 
 # GEOMETRY
 #----------------------------------------------------------------------------   
+tm.phase('GEOMETRY')
 s = mdb.models['Model-1'].ConstrainedSketch(name='__profile__', sheetSize=200.0); s.setPrimaryObject(option=STANDALONE)
 x0=sqrt(param['red'][1]**2-(param['red'][0]/2.+param['red'][1]-param['dim'][2]/2.)**2)
 s.Line(point1=(0.0, 0.0), point2=(param['dim'][0]/2., 0.0))
@@ -52,6 +65,7 @@ del mdb.models['Model-1'].sketches['__profile__']
 
 # PARTITION
 #---------------------------------------------------------------------------- 
+tm.phase('PARTITION')
 p = mdb.models['Model-1'].parts['sample']
 e1=p.edges.getByBoundingBox(xMin=x0-1e-5, xMax=x0+1e-5, yMin=0.)
 e2=p.edges.getByBoundingBox(xMin=param['dim'][0]/2.-1e-5, zMax=1e-5)
@@ -60,6 +74,7 @@ p.PartitionCellBySweepEdge(sweepPath=e2[0], cells=p.cells.getByBoundingBox(), ed
 
 # SYMMETRY
 #---------------------------------------------------------------------------- 
+tm.phase('SYMMETRY')
 p = mdb.models['Model-1'].parts['sample']
 f1 = p.faces.getByBoundingBox(xMax=1e-6); p.Mirror(mirrorPlane=f1[0], keepOriginal=ON, keepInternalBoundaries=ON)
 f1 = p.faces.getByBoundingBox(yMax=1e-6); p.Mirror(mirrorPlane=f1[0], keepOriginal=ON, keepInternalBoundaries=ON)
@@ -68,6 +83,7 @@ f1 = p.faces.getByBoundingBox(zMax=1e-6); p.Mirror(mirrorPlane=f1[0], keepOrigin
 
 # SETS & SURFACES
 #----------------------------------------------------------------------------  
+tm.phase('SETS & SURFACES')
 f1 = p.faces.getByBoundingBox(xMax=-param['dim'][0]/2.+1e-5); p.Set(name='X0', faces=f1)
 f1 = p.faces.getByBoundingBox(xMin=param['dim'][0]/2.-1e-5); p.Set(name='XL', faces=f1)
 f1 = p.faces.getByBoundingBox(zMax=-param['dim'][1]/2.+1e-5); p.Set(name='Z0', faces=f1) 
@@ -77,6 +93,7 @@ f1 = p.faces.getByBoundingBox(xMin=-1e-5, xMax=1e-5); p.Set(name='MIDDLE', faces
 
 # SECTION
 #----------------------------------------------------------------------------
+tm.phase('SECTION')
 mdb.models['Model-1'].HomogeneousSolidSection(name='sec', material='alu', thickness=None)
 p.SectionAssignment(sectionName='sec', offsetField='', offsetType=MIDDLE_SURFACE, offset=0.0, 
   region=(p.cells.getByBoundingBox(),),  thicknessAssignment=FROM_SECTION)
@@ -84,6 +101,7 @@ p.SectionAssignment(sectionName='sec', offsetField='', offsetType=MIDDLE_SURFACE
  
 # MESH
 #----------------------------------------------------------------------------
+tm.phase('MESH')
 if param['quad']:
  #quadratic 
  elemType1 = mesh.ElemType(elemCode=C3D20, elemLibrary=STANDARD)
@@ -96,11 +114,12 @@ else:
  elemType3 = mesh.ElemType(elemCode=C3D4, elemLibrary=STANDARD)
 p.setElementType(regions=(p.cells.getByBoundingBox(),), elemTypes=(elemType1,elemType2,elemType3))
 p.seedPart(size=param['selt'], deviationFactor=0.1, minSizeFactor=0.1)
-p.generateMesh()
+p.generateMesh(); tm.count(nodes=len(p.nodes), elements=len(p.elements))
 
 
 # ASSEMBLY
 #----------------------------------------------------------------------------  
+tm.phase('ASSEMBLY')
 a = mdb.models['Model-1'].rootAssembly;a.DatumCsysByDefault(CARTESIAN)
 a.Instance(dependent=ON, name='sample',part=p)
 #
@@ -112,18 +131,21 @@ mdb.models['Model-1'].MultipointConstraint(name='RGB1', mpcType=BEAM_MPC, csys=N
  
 # STEP
 #---------------------------------------------------------------------------- 
+tm.phase('STEP')
 mdb.models['Model-1'].ImplicitDynamicsStep(name='demo_TensileTest', previous='Initial', 
     timePeriod=10.0, maxNumInc=1000000, initialInc=1., minInc=1e-04, application=QUASI_STATIC, amplitude=RAMP)
 
 
 # OUTPUT
 #----------------------------------------------------------------------------
+tm.phase('OUTPUT')
 mdb.models['Model-1'].fieldOutputRequests['F-Output-1'].setValues(variables=(
     'S', 'E', 'EE', 'U', 'RF'), timeInterval=1.)
 
     
 # LOAD
 #---------------------------------------------------------------------------- 
+tm.phase('LOAD')
 a = mdb.models['Model-1'].rootAssembly
 #
 mdb.models['Model-1'].EncastreBC(name='fix', createStepName='Initial', region=a.instances['sample'].sets['X0'], localCsys=None)
@@ -133,6 +155,7 @@ mdb.models['Model-1'].ConcentratedForce(name='Load', createStepName='demo_Tensil
 
 # JOB
 #----------------------------------------------------------------------------
+tm.phase('JOB')
 jobname='demo_3DTensileTest'
 
 mdb.Job(name=jobname, model='Model-1', description='', type=ANALYSIS, 
@@ -145,15 +168,28 @@ mdb.Job(name=jobname, model='Model-1', description='', type=ANALYSIS,
 
 mdb.saveAs(pathName=os.path.join(os.getcwd(),jobname))
 session.viewports['Viewport: 1'].setValues(displayedObject=mdb.models['Model-1'].rootAssembly)
-if param['run']:
+if param['run'] and param['outbudget']:
+ #deck first, output requests fitted to the ODB budget, run from the deck
+ tm.phase('WRITE INPUT')
+ mdb.jobs[jobname].writeInput(consistencyChecking=OFF)
+ tm.phase('PLAN OUTPUT')
+ plan = fit_budget(os.path.join(os.getcwd(), jobname+'.inp'), param['outbudget'], sensors=['RP1'])
+ print_plan(plan, param['outbudget'])
+ tm.phase('SOLVE')
+ run_inputs([jobname], ncpus=2, precision=plan['nodal_precision'])
+elif param['run']:
+ tm.phase('SOLVE')
  mdb.jobs[jobname].submit(consistencyChecking=OFF)	
  mdb.jobs[jobname].waitForCompletion()
 else:
+ tm.phase('WRITE INPUT')
  mdb.jobs[jobname].writeInput(consistencyChecking=OFF)
+ if param['outbudget']: print_plan(estimate(os.path.join(os.getcwd(), jobname+'.inp')), param['outbudget'])
 
 
 # POST
 #---------------------------------------------------------------------------- 
+tm.phase('POST')
 if param['run']:
  o3 = session.openOdb(name=os.path.join(os.getcwd(), jobname+'.odb'))
  session.viewports['Viewport: 1'].setValues(displayedObject=o3)
@@ -163,4 +199,4 @@ if param['run']:
     outputPosition=INTEGRATION_POINT, refinement=(COMPONENT, 'S11'), )
  session.viewports['Viewport: 1'].makeCurrent()
 
- 
\ No newline at end of file
+tm.save()
@@ -14,9 +14,21 @@ from abaqus import *
 from abaqusConstants import *
 from caeModules import *
 import numpy as np
-import os
+import os, sys, inspect
+sys.path.insert(0, os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe()))))
+from abqtools.meshdata import node_arrays
+from abqtools.periodic import write_equations
+from abqtools.keywords import insert_before
+from abqtools.odbpost import node_history, signal_error
+from abqtools.signals import pitch_catch, save_pitch_catch, pitch_catch_matrix, tof_matrix
+from abqtools.waves import auto_size, print_sizing
+from abqtools.outplan import estimate, fit_budget, print_plan
+from abqtools.jobs import run_inputs
+from abqtools.sweep import apply_overrides, save_results
+from abqtools.timing import PhaseTimer
 
 Mdb()
+tm = PhaseTimer('demo_3Dplate_with_pzt')
 
 # PARAMETERS  (units: SI)
 #----------------------------------------------------------------------------
@@ -26,8 +38,14 @@ param['name']='sample'              # name of the part
 param['dim']=[200e-3,30e-3,1e-3]    # dimensions of sample
 param['quad']=False                 # linear/quadratic elements
 param['selt']=1e-3                  # element size
+param['autosize']=False             # element size, increments and output interval from the plate wave speeds at the frequency
 param['load']=[100., 10e3]          # voltage amplitude & frequency
+param['outbudget']=None             # ODB budget (MB): output requests planned before submission
 param['run']=False                  # run
+param['analysis']='direct'          # 'direct' (implicit dynamics) or 'modal' (frequency extraction + modal dynamics)
+param['drive']='voltage'            # pzt1 excitation: 'voltage' (potential BC) or 'charge' (equivalent charge, used by 'modal')
+param['matrix']=False               # pitch-catch matrix: one job per actuator, others grounded receivers
+param['ncpus']=4                    # matrix: core budget of the concurrent jobs
 # piezo [xc, yc, th, rad]    
 param['pzt']=[[param['dim'][0]/4., param['dim'][1]/2., 0.5e-3, 12.5e-3],
               [3.*param['dim'][0]/4.,  param['dim'][1]/2., 0.5e-3, 12.5e-3]]
@@ -37,6 +55,10 @@ simu=dict()
 simu['tend']=1e-3                      # time period
 simu['dt']=[1e-6,1e-8,1e-4]            # step time [init/min/max]
 simu['tout']=2e-6                      # step time for output
+simu['fcut']=4.                        # modal: highest mode frequency / excitation frequency
+simu['epw']=10.                        # autosize: elements per shortest wavelength (linear elements, quadratic: half)
+simu['ppc']=20.                        # autosize: increments per excitation period
+simu['opc']=10.                        # autosize: outputs per excitation period
 
 # MATERIALS  (units: SI)
 mat=dict()
@@ -47,8 +69,24 @@ mat['nce51']=dict([('dens',7850.), ('elastic',['orthotropic',(13.2e10, 8.76e10,
     ('dielectric',['orthotropic', (1.72e-08, 1.72e-08, 1.68e-08)])])
 
 
+# SWEEP OVERRIDES  (abaqus cae noGUI=demo_3Dplate_with_pzt.py -- point.json)
+#----------------------------------------------------------------------------
+apply_overrides(param=param, mat=mat, simu=simu)
+
+
+# AUTOMATIC SIZING (A0/S0/SH0 speeds of the plate at the excitation frequency)
+#----------------------------------------------------------------------------
+if param['autosize']:
+ tm.phase('SIZING')
+ size = auto_size(mat['alu']['elastic'][1][0], mat['alu']['elastic'][1][1], mat['alu']['dens'], param['dim'][2], param['load'][1], 
+   quad=param['quad'], epw=simu['epw'], ppc=simu['ppc'], opc=simu['opc'], dim=param['dim'], tend=simu['tend'])
+ print_sizing(size); tm.count(dof=size['dof'], increments=size['increments'])
+ param['selt']=size['selt']; simu['dt']=[size['dt'], 1e-2*size['dt'], size['dt']]; simu['tout']=size['tout']
+
+
 # MATERIAL (11 22 33 12 13 23)
 #----------------------------------------------------------------------------
+tm.phase('MATERIAL')
 for key in mat.keys():
  mdb.models['Model-1'].Material(name=key)
  if 'dens' in mat[key].keys():
@@ -63,6 +101,7 @@ for key in mat.keys():
 
 # GEOMETRY
 #----------------------------------------------------------------------------   
+tm.phase('GEOMETRY')
 # 3D plate
 s = mdb.models['Model-1'].ConstrainedSketch(name='__profile__',sheetSize=2.*max(param['dim']))
 s.setPrimaryObject(option=STANDALONE)
@@ -97,6 +136,7 @@ for jpzt in range(len(param['pzt'])):
 
 # MESH (3D)
 #----------------------------------------------------------------------------
+tm.phase('MESH (3D)')
 if param['quad']: 
  elem3DT1E = mesh.ElemType(elemCode=C3D20E, elemLibrary=STANDARD)
  elem3DT2E = mesh.ElemType(elemCode=C3D15E, elemLibrary=STANDARD)
@@ -134,10 +174,12 @@ for jpzt in range(len(param['pzt'])):
  p.setElementType(regions=p.sets[st1+'_elt'], elemTypes=(elem3DT1E,elem3DT2E,elem3DT3E))
 #
 p.SetByBoolean(name='mn_pzt', sets=tuple(mn_pzt), operation=UNION)
+tm.count(nodes=len(p.nodes), elements=len(p.elements))
 
 
 # SECTION
 #----------------------------------------------------------------------------
+tm.phase('SECTION')
 for key in mat.keys(): mdb.models['Model-1'].HomogeneousSolidSection(name='S'+key, material=key, thickness=None)
 # plate
 p = mdb.models['Model-1'].parts[param['name']]
@@ -154,73 +196,153 @@ for jpzt in range(len(param['pzt'])):
 
 # ASSEMBLY
 #----------------------------------------------------------------------------  
+tm.phase('ASSEMBLY')
 a = mdb.models['Model-1'].rootAssembly;a.DatumCsysByDefault(CARTESIAN)
 a.Instance(dependent=ON, name=param['name'],part=p)
 
 
 # STEP
 #---------------------------------------------------------------------------- 
-mdb.models['Model-1'].ImplicitDynamicsStep(name='dyna', previous='Initial', timePeriod=simu['tend'],  
+tm.phase('STEP')
+if param['analysis']=='modal':
+ #modes extracted once up to the cutoff, then modal superposition (fixed increment)
+ mdb.models['Model-1'].FrequencyStep(name='modes', previous='Initial', eigensolver=LANCZOS, numEigen=ALL, 
+    maxEigen=simu['fcut']*param['load'][1])
+ mdb.models['Model-1'].ModalDynamicsStep(name='dyna', previous='modes', timePeriod=simu['tend'], incSize=simu['dt'][0])
+else:
+ mdb.models['Model-1'].ImplicitDynamicsStep(name='dyna', previous='Initial', timePeriod=simu['tend'],  
     maxNumInc=int(simu['tend']/simu['dt'][1]+1), initialInc=simu['dt'][0], minInc=simu['dt'][1], maxInc=simu['dt'][2])
 
 
 # OUTPUT
 #----------------------------------------------------------------------------
-mdb.models['Model-1'].fieldOutputRequests['F-Output-1'].setValues(timeInterval=simu['tout'],
-  variables=('S', 'EE', 'U', 'V', 'A', 'RF', 'CF','EPOT'))
-#
+tm.phase('OUTPUT')
 r1 = mdb.models['Model-1'].rootAssembly.allInstances[param['name']].sets['mn_pzt']
-mdb.models['Model-1'].HistoryOutputRequest(name='allpzt', createStepName='dyna',  
+if param['analysis']=='modal':
+ nout = max(1, int(round(simu['tout']/simu['dt'][0])))
+ #mode shapes in 'modes' only, decimated output of 'dyna' by F-Output-2
+ mdb.models['Model-1'].fieldOutputRequests['F-Output-1'].setValues(variables=('U', 'EPOT'))
+ mdb.models['Model-1'].fieldOutputRequests['F-Output-1'].deactivate('dyna')
+ mdb.models['Model-1'].FieldOutputRequest(name='F-Output-2', createStepName='dyna', frequency=nout,
+   variables=('U', 'V', 'A', 'EPOT'))
+ mdb.models['Model-1'].HistoryOutputRequest(name='allpzt', createStepName='dyna',  
+    variables=('EPOT', ), frequency=nout, region=r1, sectionPoints=DEFAULT, rebar=EXCLUDE)
+else:
+ mdb.models['Model-1'].fieldOutputRequests['F-Output-1'].setValues(timeInterval=simu['tout'],
+   variables=('S', 'EE', 'U', 'V', 'A', 'RF', 'CF','EPOT'))
+ #
+ mdb.models['Model-1'].HistoryOutputRequest(name='allpzt', createStepName='dyna',  
     variables=('EPOT', ), timeInterval=simu['tout'], 
     region=r1, sectionPoints=DEFAULT, rebar=EXCLUDE)
 
 
 # LOAD
 #---------------------------------------------------------------------------- 
-a = mdb.models['Model-1'].rootAssembly
-#
+tm.phase('LOAD')
+a = mdb.models['Model-1'].rootAssembly; p = mdb.models['Model-1'].parts[param['name']]
+#potential BCs are not allowed in modal dynamics: charge drive
+drive = 'charge' if param['analysis']=='modal' else param['drive']
 for jpzt in range(len(param['pzt'])):
  st1='pzt'+str(jpzt+1)
  #null potential
  r1 = a.instances[param['name']].sets[st1+'_nbot']
  mdb.models['Model-1'].ElectricPotentialBC(name=st1+'_Vnul', createStepName='Initial',  
     region=r1, distributionType=UNIFORM, fieldName='', magnitude=0.0)
- #applied voltage on pzt1
- if jpzt==0:
-  #
-  mdb.models['Model-1'].PeriodicAmplitude(name='sinus', timeSpan=STEP, 
-    frequency=2*pi*param['load'][1], start=0.0, a_0=0.0, data=((0.0, 1.0), ))
-  #
-  r1 = a.instances[param['name']].sets[st1+'_ntop']
-  mdb.models['Model-1'].ElectricPotentialBC(name=st1+'_Vapp', createStepName='dyna', 
-    region=r1, fixed=OFF, distributionType=UNIFORM, fieldName='', 
-    magnitude=param['load'][0], amplitude='sinus')
+#
+mdb.models['Model-1'].PeriodicAmplitude(name='sinus', timeSpan=STEP, 
+  frequency=2*pi*param['load'][1], start=0.0, a_0=0.0, data=((0.0, 1.0), ))
+#actuators: pzt1, or every transducer in turn (matrix)
+#charge drive is reciprocal (Z_ij=Z_ji): each run gives a full column, the last one is not run
+recip = param['matrix'] and drive=='charge'
+actuators = list(range(len(param['pzt'])-(1 if recip else 0))) if param['matrix'] else [0]
 
 
 # JOB
 #----------------------------------------------------------------------------
-jobname='demo_3Dplate_with_pzt'
-
-mdb.Job(name=jobname, model='Model-1', description='', type=ANALYSIS, 
+tm.phase('JOB')
+jobnames=[]
+for jact in actuators:
+ jobname='demo_3Dplate_with_pzt'+('_modal' if param['analysis']=='modal' else '')+('_a'+str(jact+1) if param['matrix'] else '')
+ jobnames.append(jobname)
+ #applied voltage (or charge) on the actuator, drive of the previous actuator removed
+ st1='pzt'+str(jact+1); curpzt=param['pzt'][jact]
+ for key in [x for x in mdb.models['Model-1'].boundaryConditions.keys() if x.endswith('_Vapp')]: del mdb.models['Model-1'].boundaryConditions[key]
+ for key in [x for x in mdb.models['Model-1'].loads.keys() if x.endswith('_Qapp')]: del mdb.models['Model-1'].loads[key]
+ if drive=='charge':
+  #charge of the blocked capacitance C0=eps33*pi*r^2/th under the voltage amplitude
+  C0 = mat['nce51']['dielectric'][1][2]*pi*curpzt[3]**2/curpzt[2]
+  mdb.models['Model-1'].ConcCharge(name=st1+'_Qapp', createStepName='dyna', region=a.instances[param['name']].sets[st1+'_mntop'], 
+    magnitude=C0*param['load'][0], amplitude='sinus')
+ else:
+  r1 = a.instances[param['name']].sets[st1+'_ntop']
+  mdb.models['Model-1'].ElectricPotentialBC(name=st1+'_Vapp', createStepName='dyna', 
+    region=r1, fixed=OFF, distributionType=UNIFORM, fieldName='', 
+    magnitude=param['load'][0], amplitude='sinus')
+ #equipotential top electrodes: V(sntop) = V(mntop) (receivers of the matrix, every transducer under charge drive)
+ eqn = [j1 for j1 in range(len(param['pzt'])) if drive=='charge' or (param['matrix'] and j1!=jact)]
+ for j1 in eqn:
+  st1='pzt'+str(j1+1)
+  write_equations(os.path.join(os.getcwd(), jobname+'_eqn.inp'), ((1.0, node_arrays(p.sets[st1+'_sntop'].nodes)[0]),
+    (-1.0, param['name']+'.'+st1+'_mntop')), dof=9, inst=param['name'], mode='w' if j1==eqn[0] else 'a')
+ if eqn: insert_before(mdb.models['Model-1'], '*End Assembly', '*INCLUDE, input='+jobname+'_eqn.inp')
+ #
+ mdb.Job(name=jobname, model='Model-1', description='', type=ANALYSIS, 
     atTime=None, waitMinutes=0, waitHours=0, queue=None, memory=90, 
     memoryUnits=PERCENTAGE, getMemoryFromAnalysis=True, 
     explicitPrecision=SINGLE, nodalOutputPrecision=FULL, echoPrint=OFF, 
     modelPrint=OFF, contactPrint=OFF, historyPrint=OFF, userSubroutine='', 
     scratch='', resultsFormat=ODB, multiprocessingMode=DEFAULT, numCpus=2, 
     numDomains=2, numGPUs=0)
-
-mdb.saveAs(pathName=os.path.join(os.getcwd(), jobname))
-session.viewports['Viewport: 1'].setValues(displayedObject=mdb.models['Model-1'].rootAssembly)
-if param['run']:
+ #
+ mdb.saveAs(pathName=os.path.join(os.getcwd(), jobname))
+ session.viewports['Viewport: 1'].setValues(displayedObject=mdb.models['Model-1'].rootAssembly)
+ if param['matrix']:
+  #decks only, the jobs are run together under the core budget
+  tm.phase('WRITE INPUT')
+  mdb.jobs[jobname].writeInput(consistencyChecking=OFF)
+ elif param['run'] and param['outbudget']:
+  #deck first, output requests fitted to the ODB budget, run from the deck
+  tm.phase('WRITE INPUT')
+  mdb.jobs[jobname].writeInput(consistencyChecking=OFF)
+  tm.phase('PLAN OUTPUT')
+  plan = fit_budget(os.path.join(os.getcwd(), jobname+'.inp'), param['outbudget'], sensors=[param['name']+'.mn_pzt'])
+  print_plan(plan, param['outbudget'])
+  tm.phase('SOLVE')
+  run_inputs([jobname], ncpus=2, precision=plan['nodal_precision'])
+ elif param['run']:
+  tm.phase('SOLVE')
   mdb.jobs[jobname].submit(consistencyChecking=OFF)	
   mdb.jobs[jobname].waitForCompletion()
-else:
+ else:
+  tm.phase('WRITE INPUT')
   mdb.jobs[jobname].writeInput(consistencyChecking=OFF)
+  if param['outbudget']: print_plan(estimate(os.path.join(os.getcwd(), jobname+'.inp')), param['outbudget'])
+#
+if param['matrix'] and param['run']:
+ tm.phase('SOLVE')
+ run_inputs(jobnames, ncpus=param['ncpus'])
  
 
 # POST
 #---------------------------------------------------------------------------- 
-if param['run']:
+tm.phase('POST')
+names = ['pzt'+str(j1+1) for j1 in range(len(param['pzt']))]
+if param['matrix'] and param['run']:
+ #EPOT of every transducer for every actuator -> M[time, receiver, actuator]
+ cols = []
+ for jobname in jobnames:
+  o3 = session.openOdb(name=os.path.join(os.getcwd(), jobname+'.odb'))
+  inst = o3.rootAssembly.instances[param['name'].upper()]
+  t, V = node_history(o3.steps['dyna'], 'EPOT', inst.name, [inst.nodeSets[x.upper()+'_MNTOP'].nodes[0].label for x in names])
+  cols.append(V); o3.close()
+ #drive charges C0*V of the transducers (reciprocity: columns scaled by the charge ratio)
+ charges = [mat['nce51']['dielectric'][1][2]*pi*x[3]**2/x[2]*param['load'][0] for x in param['pzt']]
+ t, M = pitch_catch_matrix(t, cols, actuators, reciprocity=recip, charges=charges)
+ tof = tof_matrix(t, M)
+ np.savez_compressed(os.path.join(os.getcwd(), 'demo_3Dplate_with_pzt'+('_modal' if param['analysis']=='modal' else '')+'_matrix.npz'),
+   t=t, M=M.astype(np.float32), tof=tof, actuators=np.array(actuators), reciprocity=recip, drive=drive)
+ print('time of flight matrix (receiver x actuator): '); print(tof)
+elif param['run']:
  o3 = session.openOdb(name=os.path.join(os.getcwd(), jobname+'.odb'))
  session.viewports['Viewport: 1'].setValues(displayedObject=o3)
  session.viewports['Viewport: 1'].odbDisplay.display.setValues(plotState=(CONTOURS_ON_UNDEF, ))
@@ -228,4 +350,22 @@ if param['run']:
  session.viewports['Viewport: 1'].odbDisplay.setPrimaryVariable(variableLabel='U', 
     outputPosition=NODAL, refinement=(INVARIANT, 'Magnitude'), )
  session.viewports['Viewport: 1'].makeCurrent()
+ #EPOT of the transducers (history regions of the top electrode master nodes)
+ inst = o3.rootAssembly.instances[param['name'].upper()]
+ t, V = node_history(o3.steps['dyna'], 'EPOT', inst.name, [inst.nodeSets[x.upper()+'_MNTOP'].nodes[0].label for x in names])
+ np.savez(os.path.join(os.getcwd(), jobname+'_epot.npz'), t=t, V=V, drive=drive)
+ #pitch-catch: spectra, envelopes, time of flight pzt1 -> pzt2
+ res = pitch_catch(t, V, actuator=0); save_pitch_catch(os.path.join(os.getcwd(), jobname+'_pitchcatch.npz'), res)
+ print('time of flight (onset): ', dict(zip(names, res['tof_onset']))); print('time of flight (xcorr): ', dict(zip(names, res['tof_xcorr'])))
+ #truncation error of the modal run against the direct run (same drive)
+ fref = os.path.join(os.getcwd(), 'demo_3Dplate_with_pzt_epot.npz')
+ if param['analysis']=='modal' and os.path.isfile(fref):
+  ref = np.load(fref)
+  if str(ref['drive'])!=drive:
+   print('no truncation error: direct run with drive='+str(ref['drive'])+', expected '+drive)
+  else:
+   err = signal_error(ref['t'], ref['V'], t, V)
+   print('truncation error (modal/direct, EPOT): ', dict(zip(names, err)))
+   save_results(jobname, truncation_error=err, fcut=simu['fcut']*param['load'][1])
 
+tm.save()
@@ -14,8 +14,18 @@ from abaqus import *
 from abaqusConstants import *
 from caeModules import *
 import numpy as np
+import os, sys, inspect
+sys.path.insert(0, os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe()))))
+from abqtools.meshdata import node_arrays, element_arrays, element_types, nearest_circle, classify_elements
+from abqtools.meshdata import rotation, stack_mesh, add_orphan_mesh
+from abqtools.periodic import periodic_images, check_pairs, write_periodic_equations, strain_cases, VOIGT
+from abqtools.keywords import insert_before
+from abqtools.odbpost import volume_average, loadcase_averages
+from abqtools.sweep import apply_overrides, save_results
+from abqtools.timing import PhaseTimer
 
 Mdb()
+tm = PhaseTimer('demo_Composite')
 
 # PARAMETERS  (units: SI)
 #----------------------------------------------------------------------------
@@ -26,7 +36,11 @@ param['dim']=[40e-3,10e-3,40e-3]    # dimensions of sample
 param['fiber']=[6,3,1.25e-3,2]      # nx ny, radius, ntimes
 param['selt']=1e-3                  # element size
 param['quad']=False                 # linear/quadratic elements
+param['fibersets']=False            # one element set per fiber
+param['stacking']='mesh'            # layer stacking: 'mesh' (orphan mesh, NumPy) or 'boolean' (InstanceFromBooleanMerge)
 param['load']=1e-3                  # applied displacement
+param['homogenization']=False       # 6x6 stiffness: periodic BCs, 6 unit strain load cases of one job
+param['eps']=1e-3                   # unit strain magnitude (homogenization)
 param['run']=False                  # run
     
 # MATERIALS  (units: SI)
@@ -35,8 +49,14 @@ mat['matrix']=dict([('dens',2800.), ('elastic',['isotropic',(70.0e9, 0.3)])])
 mat['allfibers']=dict([('dens',2800.), ('elastic',['isotropic',(7.0e9, 0.3)])])
 
 
+# SWEEP OVERRIDES  (abaqus cae noGUI=demo_Composite.py -- point.json)
+#----------------------------------------------------------------------------
+apply_overrides(param=param, mat=mat)
+
+
 # MATERIAL (11 22 33 12 13 23)
 #----------------------------------------------------------------------------
+tm.phase('MATERIAL')
 for key in mat.keys():
  mdb.models['Model-1'].Material(name=key)
  mdb.models['Model-1'].materials[key].Density(table=((mat[key]['dens'],), ))
@@ -45,6 +65,7 @@ for key in mat.keys():
 
 # GEOMETRY
 #----------------------------------------------------------------------------   
+tm.phase('GEOMETRY')
 # 3D plate
 s = mdb.models['Model-1'].ConstrainedSketch(name='__profile__',sheetSize=2.*max(param['dim']))
 s.setPrimaryObject(option=STANDALONE)
@@ -75,6 +96,7 @@ s.unsetPrimaryObject(); del mdb.models['Model-1'].sketches['__profile__']
 
 # MESH 
 #----------------------------------------------------------------------------
+tm.phase('MESH')
 if param['quad']: 
  elemType1 = mesh.ElemType(elemCode=S8R, elemLibrary=STANDARD)
  elemType2 = mesh.ElemType(elemCode=STRI65, elemLibrary=STANDARD) 
@@ -98,20 +120,23 @@ p.generateMeshByOffset(region=r1, meshType=SOLID, offsetDirection=OUTWARD,
   shareNodes=False, deleteBaseElements=True, extendElementSets=False)
 p.deleteMesh(regions=p.faces)
 p.setElementType(regions=(p.elements,), elemTypes=(elem3DT1, elem3DT2,elem3DT3))
+tm.count(nodes=len(p.nodes), elements=len(p.elements))
 #
-p.Set(name='all', elements=p.elements); allfibers=[]
-for jx in range(xc.shape[0]):
- for jy in range(yc.shape[0]):
-  delta=0. if jy%2==0 else param['fiber'][2]*1.
-  e0 = p.elements.getByBoundingCylinder(radius=param['fiber'][2]+tol1,
-    center1=(xc[jx]+delta,yc[jy],0.0), center2=(xc[jx]+delta,yc[jy],param['dim'][2]))
-  allfibers.append(p.Set(name='fiber'+str(jx)+'_'+str(jy), elements=e0))
-p.SetByBoolean(name='allfibers', sets=tuple(allfibers), operation=UNION)
-p.SetByBoolean(name='matrix', sets=(p.sets['all'],p.sets['allfibers']), operation=DIFFERENCE)
+p.Set(name='all', elements=p.elements)
+#fiber elements: all nodes inside one fiber circle (single vectorized pass, sets from labels)
+lab, xyz = node_arrays(p.nodes); elab, conn = element_arrays(p.elements)
+xyc = np.array([[xc[jx]+(0. if jy%2==0 else param['fiber'][2]*1.), yc[jy]] for jx in range(xc.shape[0]) for jy in range(yc.shape[0])])
+ifib = classify_elements(conn, nearest_circle(xyz[:,:2], xyc, param['fiber'][2]+tol1))
+p.SetFromElementLabels(name='allfibers', elementLabels=tuple(elab[ifib>=0].tolist()))
+p.SetFromElementLabels(name='matrix', elementLabels=tuple(elab[ifib<0].tolist()))
+if param['fibersets']:
+ for j1 in np.unique(ifib[ifib>=0]):
+  jx, jy = divmod(int(j1), yc.shape[0]); p.SetFromElementLabels(name='fiber'+str(jx)+'_'+str(jy), elementLabels=tuple(elab[ifib==j1].tolist()))
 
 
 # SECTION
 #----------------------------------------------------------------------------
+tm.phase('SECTION')
 st0=['matrix', 'allfibers']
 for mat in st0:
  mdb.models['Model-1'].HomogeneousSolidSection(name=mat, material=mat, thickness=None)
@@ -120,24 +145,40 @@ for mat in st0:
 
 # ASSEMBLY
 #---------------------------------------------------------------------------- 
+tm.phase('ASSEMBLY')
 a = mdb.models['Model-1'].rootAssembly; a.DatumCsysByDefault(CARTESIAN)
-p = mdb.models['Model-1'].parts[param['name']]; alllayers=[]
-for j1 in range(param['fiber'][3]): 
- st0='layer'+str(j1+1); alllayers.append(a.Instance(name=st0, part=p, dependent=ON))
- if j1>0:
-  a.translate(instanceList=(st0, ), vector=(0.0, j1*param['dim'][1], 0.0))
-  if j1%2:
-   a.rotate(instanceList=(st0, ), axisPoint=(0.0, 0.0, 0.0), axisDirection=(0.0, 1.0, 0.0), angle=90.0)
-   a.translate(instanceList=(st0, ), vector=(0.0, 0.0, param['dim'][2]))
-#
-a.InstanceFromBooleanMerge(name='Composite', instances=tuple(alllayers), keepIntersections=ON,  
-  originalInstances=DELETE, mergeNodes=BOUNDARY_ONLY, nodeMergingTolerance=tol1, domain=BOTH)
-mdb.models['Model-1'].rootAssembly.features.changeKey(fromName='Composite-1', toName='Composite')
+p = mdb.models['Model-1'].parts[param['name']]
+if param['stacking']=='mesh':
+ #rigid copies of the layer mesh (every other one rotated by 90 deg), interface nodes merged
+ tr = [(rotation((0.,1.,0.), 90.*(j1%2)), (0.0, j1*param['dim'][1], param['dim'][2]*(j1%2))) for j1 in range(param['fiber'][3])]
+ xyz2, conn2, layer, nmerged = stack_mesh(xyz, conn, tr, tol=tol1); etype = np.tile(element_types(p.elements), len(tr))
+ p = mdb.models['Model-1'].Part(name='Composite', dimensionality=THREE_D, type=DEFORMABLE_BODY)
+ add_orphan_mesh(p, xyz2, conn2, etype); tm.count(merged_nodes=nmerged)
+ fib = np.tile(ifib>=0, len(tr)); elab2 = np.arange(1, len(fib)+1)
+ p.SetFromElementLabels(name='allfibers', elementLabels=tuple(elab2[fib].tolist()))
+ p.SetFromElementLabels(name='matrix', elementLabels=tuple(elab2[~fib].tolist()))
+ for mat in ['matrix', 'allfibers']:
+  p.SectionAssignment(region=p.sets[mat], sectionName=mat, offset=0.0, offsetType=MIDDLE_SURFACE, offsetField='', thicknessAssignment=FROM_SECTION)
+ a.Instance(name='Composite', part=p, dependent=ON)
+else:
+ alllayers=[]
+ for j1 in range(param['fiber'][3]): 
+  st0='layer'+str(j1+1); alllayers.append(a.Instance(name=st0, part=p, dependent=ON))
+  if j1>0:
+   a.translate(instanceList=(st0, ), vector=(0.0, j1*param['dim'][1], 0.0))
+   if j1%2:
+    a.rotate(instanceList=(st0, ), axisPoint=(0.0, 0.0, 0.0), axisDirection=(0.0, 1.0, 0.0), angle=90.0)
+    a.translate(instanceList=(st0, ), vector=(0.0, 0.0, param['dim'][2]))
+ #
+ a.InstanceFromBooleanMerge(name='Composite', instances=tuple(alllayers), keepIntersections=ON,  
+   originalInstances=DELETE, mergeNodes=BOUNDARY_ONLY, nodeMergingTolerance=tol1, domain=BOTH)
+ mdb.models['Model-1'].rootAssembly.features.changeKey(fromName='Composite-1', toName='Composite')
 
 
 # SETS
 #----------------------------------------------------------------------------
-p = mdb.models['Model-1'].parts['Composite']
+tm.phase('SETS')
+p = mdb.models['Model-1'].parts['Composite']; tm.count(nodes=len(p.nodes), elements=len(p.elements))
 n1 = p.nodes.getByBoundingBox(xMax=tol1); p.Set(name='x0', nodes=n1) 
 n1 = p.nodes.getByBoundingBox(yMax=tol1); p.Set(name='y0', nodes=n1) 
 n1 = p.nodes.getByBoundingBox(zMax=tol1); p.Set(name='z0', nodes=n1) 
@@ -148,44 +189,80 @@ n1 = p.nodes.getByBoundingBox(zMin=param['dim'][2]-tol1); p.Set(name='zL', nodes
 
 # STEP
 #---------------------------------------------------------------------------- 
-mdb.models['Model-1'].StaticStep(name='Static', previous='Initial', 
+tm.phase('STEP')
+if param['homogenization']:
+ mdb.models['Model-1'].StaticLinearPerturbationStep(name='Homogenization', previous='Initial')
+else:
+ mdb.models['Model-1'].StaticStep(name='Static', previous='Initial', 
     timePeriod=10.0, maxNumInc=1000, initialInc=0.1, minInc=1e-06, maxInc=1.0)
 
 
 # OUTPUT
 #----------------------------------------------------------------------------
-mdb.models['Model-1'].fieldOutputRequests['F-Output-1'].setValues(variables=(
-    'S', 'E', 'EE', 'U', 'RF'), timeInterval=1.)
+tm.phase('OUTPUT')
+if param['homogenization']:
+ #perturbation step: one frame per load case, no frequency options
+ mdb.models['Model-1'].fieldOutputRequests['F-Output-1'].setValues(variables=(
+    'S', 'E', 'EE', 'U', 'RF', 'IVOL'))
+else:
+ mdb.models['Model-1'].fieldOutputRequests['F-Output-1'].setValues(variables=(
+    'S', 'E', 'EE', 'U', 'RF', 'IVOL'), timeInterval=1.)
 
 
 # LOAD
 #---------------------------------------------------------------------------- 
+tm.phase('LOAD')
 a = mdb.models['Model-1'].rootAssembly
-#
-r1 = a.instances['Composite'].sets['x0']
-mdb.models['Model-1'].DisplacementBC(name='fixX', createStepName='Initial', 
-    region=r1, u1=SET, u2=UNSET, u3=UNSET, ur1=UNSET, ur2=UNSET, ur3=UNSET, 
-    amplitude=UNSET, distributionType=UNIFORM, fieldName='', localCsys=None)
-#
-r1 = a.instances['Composite'].sets['y0']
-mdb.models['Model-1'].DisplacementBC(name='fixY', createStepName='Initial', 
-    region=r1, u1=UNSET, u2=SET, u3=UNSET, ur1=UNSET, ur2=UNSET, ur3=UNSET, 
-    amplitude=UNSET, distributionType=UNIFORM, fieldName='', localCsys=None)
-#
-r1 = a.instances['Composite'].sets['z0']
-mdb.models['Model-1'].DisplacementBC(name='fixZ', createStepName='Initial', 
-    region=r1, u1=UNSET, u2=UNSET, u3=SET, ur1=UNSET, ur2=UNSET, ur3=UNSET, 
-    amplitude=UNSET, distributionType=UNIFORM, fieldName='', localCsys=None)
-#
-r1 = a.instances['Composite'].sets['xL']
-mdb.models['Model-1'].DisplacementBC(name='BC-4', createStepName='Static', 
-    region=r1, u1=param['load'], u2=UNSET, u3=UNSET, ur1=UNSET, ur2=UNSET, ur3=UNSET, 
-    amplitude=UNSET, fixed=OFF, distributionType=UNIFORM, fieldName='', localCsys=None)
+if param['homogenization']:
+ #fully periodic: u(plus faces) = u(image on minus faces) + sum_j L_j*H[:,j], column j of H carried by Refj
+ p = mdb.models['Model-1'].parts['Composite']; lab, xyz = node_arrays(p.nodes)
+ box = [param['dim'][0], param['fiber'][3]*param['dim'][1], param['dim'][2]]
+ dep, img, plus, rep = periodic_images(xyz, box, tol=tol1); check_pairs(rep, 'RVE')
+ for j1 in range(3):
+  rp1 = a.ReferencePoint(point=(1.5*box[0]+j1*param['selt'], 0., 0.))
+  a.Set(name='Ref'+str(j1+1), referencePoints=(a.referencePoints[rp1.id], ))
+ neq = write_periodic_equations(os.path.join(os.getcwd(), 'demo_Composite_eqn.inp'), lab, dep, img, plus, box, 
+    ['Ref1', 'Ref2', 'Ref3'], dofs=(1, 2, 3), inst='Composite'); tm.count(constraints=neq)
+ j1 = int(np.argmin(np.sum(xyz**2, 1))); p.Set(name='origin', nodes=p.nodes[j1:j1+1])
+ mdb.models['Model-1'].DisplacementBC(name='fixO', createStepName='Initial', region=a.instances['Composite'].sets['origin'], 
+    u1=SET, u2=SET, u3=SET, ur1=UNSET, ur2=UNSET, ur3=UNSET, amplitude=UNSET, distributionType=UNIFORM, fieldName='', localCsys=None)
+ #H[i,j] = u_i of Refj, one BC per component, scaled by the load cases
+ for j1 in range(3):
+  for i1 in range(3):
+   mdb.models['Model-1'].DisplacementBC(name='H'+str(i1+1)+str(j1+1), createStepName='Homogenization', region=a.sets['Ref'+str(j1+1)], 
+     amplitude=UNSET, fixed=OFF, distributionType=UNIFORM, fieldName='', localCsys=None, 
+     **dict([('u'+str(k+1), param['eps'] if k==i1 else UNSET) for k in range(3)]))
+ H = strain_cases(1.)
+ for jcase in range(6):
+  mdb.models['Model-1'].steps['Homogenization'].LoadCase(name='eps'+''.join([str(x+1) for x in VOIGT[jcase]]), 
+    includeActiveBaseStateBC=ON, boundaryConditions=tuple([('H'+str(i1+1)+str(j1+1), H[jcase,i1,j1]) for j1 in range(3) for i1 in range(3)]))
+else:
+ r1 = a.instances['Composite'].sets['x0']
+ mdb.models['Model-1'].DisplacementBC(name='fixX', createStepName='Initial', 
+     region=r1, u1=SET, u2=UNSET, u3=UNSET, ur1=UNSET, ur2=UNSET, ur3=UNSET, 
+     amplitude=UNSET, distributionType=UNIFORM, fieldName='', localCsys=None)
+ #
+ r1 = a.instances['Composite'].sets['y0']
+ mdb.models['Model-1'].DisplacementBC(name='fixY', createStepName='Initial', 
+     region=r1, u1=UNSET, u2=SET, u3=UNSET, ur1=UNSET, ur2=UNSET, ur3=UNSET, 
+     amplitude=UNSET, distributionType=UNIFORM, fieldName='', localCsys=None)
+ #
+ r1 = a.instances['Composite'].sets['z0']
+ mdb.models['Model-1'].DisplacementBC(name='fixZ', createStepName='Initial', 
+     region=r1, u1=UNSET, u2=UNSET, u3=SET, ur1=UNSET, ur2=UNSET, ur3=UNSET, 
+     amplitude=UNSET, distributionType=UNIFORM, fieldName='', localCsys=None)
+ #
+ r1 = a.instances['Composite'].sets['xL']
+ mdb.models['Model-1'].DisplacementBC(name='BC-4', createStepName='Static', 
+     region=r1, u1=param['load'], u2=UNSET, u3=UNSET, ur1=UNSET, ur2=UNSET, ur3=UNSET, 
+     amplitude=UNSET, fixed=OFF, distributionType=UNIFORM, fieldName='', localCsys=None)
 
 
 # JOB
 #----------------------------------------------------------------------------
+tm.phase('JOB')
 jobname='demo_Composite'
+if param['homogenization']: insert_before(mdb.models['Model-1'], '*End Assembly', '*INCLUDE, input='+jobname+'_eqn.inp')
 
 mdb.Job(name=jobname, model='Model-1', description='', type=ANALYSIS, 
     atTime=None, waitMinutes=0, waitHours=0, queue=None, memory=90, 
@@ -198,19 +275,38 @@ mdb.Job(name=jobname, model='Model-1', description='', type=ANALYSIS,
 mdb.saveAs(pathName=os.path.join(os.getcwd(), jobname))
 session.viewports['Viewport: 1'].setValues(displayedObject=mdb.models['Model-1'].rootAssembly)
 if param['run']:
+ tm.phase('SOLVE')
  mdb.jobs[jobname].submit(consistencyChecking=OFF)	
  mdb.jobs[jobname].waitForCompletion()
 else:
+ tm.phase('WRITE INPUT')
  mdb.jobs[jobname].writeInput(consistencyChecking=OFF)
 
 
 # POST
 #---------------------------------------------------------------------------- 
-if param['run']:
+tm.phase('POST')
+if param['run'] and param['homogenization']:
+ #effective stiffness (11 22 33 12 13 23): column k = mean stress of unit strain case k
+ o3 = session.openOdb(name=os.path.join(os.getcwd(), jobname+'.odb'))
+ mS = loadcase_averages(o3.steps['Homogenization'], 'S')
+ C = np.array([mS['eps'+''.join([str(x+1) for x in VOIGT[k]])] for k in range(6)]).T/param['eps']
+ Cinv = np.linalg.inv(C)
+ print('C=', C); print('C^-1=', Cinv)
+ save_results(jobname, C=C, Cinv=Cinv)
+elif param['run']:
  o3 = session.openOdb(name=os.path.join(os.getcwd(), jobname+'.odb'))
  session.viewports['Viewport: 1'].setValues(displayedObject=o3)
  session.viewports['Viewport: 1'].odbDisplay.display.setValues(plotState=(CONTOURS_ON_UNDEF, CONTOURS_ON_DEF, ))
  session.viewports['Viewport: 1'].odbDisplay.setFrame(step=0, frame=-1 )
  session.viewports['Viewport: 1'].odbDisplay.setPrimaryVariable(variableLabel='S', 
     outputPosition=INTEGRATION_POINT, refinement=(COMPONENT, 'S11'), )
- session.viewports['Viewport: 1'].makeCurrent()
\ No newline at end of file
+ session.viewports['Viewport: 1'].makeCurrent()
+ # mean stress & strain (11 22 33 12 13 23)
+ fr = o3.steps['Static'].frames[-1]
+ mS, vol = volume_average(fr.fieldOutputs['S'], fr.fieldOutputs['IVOL'])
+ mE, vol = volume_average(fr.fieldOutputs['E'], fr.fieldOutputs['IVOL'])
+ print('mean S=', mS); print('mean E=', mE)
+ save_results(jobname, mS=mS, mE=mE, vol=vol)
+
+tm.save()
@@ -4,6 +4,7 @@
  ARTS ET METIERS - ABAQUS DEMOS
  
  Cross Plate
+ (CAE-free input file: python abqtools/inpgen.py CrossPlate)
  
  Eric Monteiro - PIMM    
  
@@ -14,9 +15,17 @@ from abaqus import *
 from abaqusConstants import *
 from caeModules import *
 import numpy as np
-import os
+import os, sys, inspect
+sys.path.insert(0, os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe()))))
+from abqtools.sweep import apply_overrides, save_results
+from abqtools.odbpost import nodal_field
+from abqtools.fidelity import hole_stress, mises
+from abqtools.inpgen import plate_outline, graded_divisions, arc_size
+from abqtools.meshdata import graded_plate
+from abqtools.timing import PhaseTimer
 
 Mdb()
+tm = PhaseTimer('demo_CrossPlate')
 
 # PARAMETERS  (units: SI)
 #----------------------------------------------------------------------------
@@ -28,10 +37,18 @@ param['load']=[1.e-3,1.e-3]                   # displacement amplitude in X- & Y
 param['quad']=False                      # linear/quadratic elements
 param['selt']=[1.0e-3, 0.1]                     # element size
 param['run']=False                      # run
+param['mesh']='free'                   # 'free' (uniform seeds) or 'graded' (mappable partitions, biased seeds, all quad/hex)
+param['nelt']=400                      # graded: target number of in-plane elements
+param['bias']=8.                       # graded: radial element size ratio, outer edges / hole
+
+# SWEEP OVERRIDES  (abaqus cae noGUI=demo_CrossPlate.py -- point.json)
+#----------------------------------------------------------------------------
+apply_overrides(param=param)
 
 
 # MATERIAL (11 22 33 12 13 23)
 #----------------------------------------------------------------------------
+tm.phase('MATERIAL')
 mdb.models['Model-1'].Material(name='alu')
 mdb.models['Model-1'].materials['alu'].Density(table=((2700.0, ), ))
 mdb.models['Model-1'].materials['alu'].Elastic(table=((70.0e9, 0.3), ))
@@ -39,6 +56,7 @@ mdb.models['Model-1'].materials['alu'].Elastic(table=((70.0e9, 0.3), ))
 
 # GEOMETRY
 #----------------------------------------------------------------------------   
+tm.phase('GEOMETRY')
 s = mdb.models['Model-1'].ConstrainedSketch(name='__profile__', sheetSize=200.0); s.setPrimaryObject(option=STANDALONE)
 s.Line(point1=(0.0, 0.0), point2=(0.0, param['dim'][1]/2.))
 s.Line(point1=(0.0, param['dim'][1]/2.), point2=(param['dim'][0]/2.-param['rad'], param['dim'][1]/2.))
@@ -58,6 +76,7 @@ del mdb.models['Model-1'].sketches['__profile__']
 
 # SETS & SURFACES
 #---------------------------------------------------------------------------- 
+tm.phase('SETS & SURFACES')
 p = mdb.models['Model-1'].parts['sample']
 if param['idim']==3 :
  f1 = p.faces.getByBoundingBox(xMax=1e-6); p.Set(name='x0', faces=f1) 
@@ -73,6 +92,7 @@ else:
  
 # SECTION
 #----------------------------------------------------------------------------
+tm.phase('SECTION')
 if param['idim']==3 :
   r1=p.cells.getByBoundingBox()
   mdb.models['Model-1'].HomogeneousSolidSection(name='sec', material='alu', thickness=None)
@@ -87,6 +107,7 @@ else:
 
 # MESH
 #----------------------------------------------------------------------------
+tm.phase('MESH')
 if param['idim']==3 :
  if param['quad']:
   #quadratic 
@@ -110,29 +131,45 @@ else:
   elemType2 = mesh.ElemType(elemCode=CPS3, elemLibrary=STANDARD)
  elemtypes=(elemType1,elemType2)  
 #   
-p.setElementType(regions=(r1,), elemTypes=elemtypes)
-p.seedPart(size=param['selt'][0], deviationFactor=param['selt'][1], minSizeFactor=0.1)
-p.generateMesh()
+hmesh = param['selt'][0]
+if param['mesh']=='graded':
+ #two mappable regions split at the corner, radial seeds biased from the hole, structured quad/hex
+ center, outer = plate_outline(param, 'CrossPlate')
+ div = graded_divisions(param, 'CrossPlate', param['nelt'], param['bias'])
+ nz = max(1, int(np.ceil(param['dim'][2]/2./param['selt'][0]))) if param['idim']==3 else None
+ graded_plate(mdb.models['Model-1'], p, center, outer, param['rad'], div, param['bias'], nz=nz,
+    depth=param['dim'][2]/2. if param['idim']==3 else None)
+ r1 = p.cells.getByBoundingBox() if param['idim']==3 else p.faces.getByBoundingBox()
+ hmesh = arc_size(param, 'CrossPlate', div)
+ p.setElementType(regions=(r1,), elemTypes=elemtypes)
+else:
+ p.setElementType(regions=(r1,), elemTypes=elemtypes)
+ p.seedPart(size=param['selt'][0], deviationFactor=param['selt'][1], minSizeFactor=0.1)
+p.generateMesh(); tm.count(nodes=len(p.nodes), elements=len(p.elements))
 
 # ASSEMBLY
 #----------------------------------------------------------------------------  
+tm.phase('ASSEMBLY')
 a = mdb.models['Model-1'].rootAssembly;a.DatumCsysByDefault(CARTESIAN)
 a.Instance(dependent=ON, name='sample',part=p)
  
 # STEP
 #---------------------------------------------------------------------------- 
+tm.phase('STEP')
 mdb.models['Model-1'].ImplicitDynamicsStep(name='demo_TensileTest', previous='Initial', 
     timePeriod=10.0, maxNumInc=1000000, initialInc=1., minInc=1e-04, application=QUASI_STATIC, amplitude=RAMP)
 
 
 # OUTPUT
 #----------------------------------------------------------------------------
+tm.phase('OUTPUT')
 mdb.models['Model-1'].fieldOutputRequests['F-Output-1'].setValues(variables=(
     'S', 'E', 'EE', 'U', 'RF'), timeInterval=1.)
 
     
 # LOAD
 #---------------------------------------------------------------------------- 
+tm.phase('LOAD')
 a = mdb.models['Model-1'].rootAssembly
 #
 r1 = a.instances['sample'].sets['x0']
@@ -157,6 +194,7 @@ mdb.models['Model-1'].DisplacementBC(name='moveY', createStepName='demo_TensileT
 
 # JOB
 #----------------------------------------------------------------------------
+tm.phase('JOB')
 mdb.Job(name='demo_TensileTest', model='Model-1', description='', type=ANALYSIS, 
     atTime=None, waitMinutes=0, waitHours=0, queue=None, memory=90, 
     memoryUnits=PERCENTAGE, getMemoryFromAnalysis=True, 
@@ -166,11 +204,16 @@ mdb.Job(name='demo_TensileTest', model='Model-1', description='', type=ANALYSIS,
     numDomains=2, numGPUs=0)
 
 if param['run']:
+ tm.phase('SOLVE')
  mdb.jobs['demo_TensileTest'].submit(consistencyChecking=OFF)	
  mdb.jobs['demo_TensileTest'].waitForCompletion()
+else:
+ tm.phase('WRITE INPUT')
+ mdb.jobs['demo_TensileTest'].writeInput(consistencyChecking=OFF)
  
 # POST
 #---------------------------------------------------------------------------- 
+tm.phase('POST')
 if param['run']:
  o3 = session.openOdb(name=os.path.join(os.getcwd(),'demo_TensileTest.odb'))
  session.viewports['Viewport: 1'].setValues(displayedObject=o3)
@@ -179,5 +222,10 @@ if param['run']:
  session.viewports['Viewport: 1'].odbDisplay.setPrimaryVariable(variableLabel='S', 
     outputPosition=INTEGRATION_POINT, refinement=(COMPONENT, 'S11'), )
  session.viewports['Viewport: 1'].makeCurrent()
+ #stress concentration at the hole: peak von Mises, gradient along the ligament (fidelity.py indicators)
+ inst = o3.rootAssembly.instances['SAMPLE']
+ fS = o3.steps['demo_TensileTest'].frames[-1].fieldOutputs['S']; lab, S, xyz = nodal_field(fS, inst)
+ res = hole_stress(xyz, mises(S, fS.componentLabels), (param['dim'][0]/2., param['dim'][1]/2.), param['rad'], hmesh, thickness=param['dim'][2])
+ save_results('demo_CrossPlate', idim=param['idim'], nodes=len(inst.nodes), **res)
 
- 
+tm.save()
@@ -14,12 +14,22 @@ from abaqus import *
 from abaqusConstants import *
 from caeModules import *
 import numpy as np
-import os
+import os, sys, inspect
+sys.path.insert(0, os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe()))))
+from abqtools.meshdata import node_arrays
+from abqtools.periodic import pair_faces, periodic_images, check_pairs, write_equations, write_periodic_equations
+from abqtools.keywords import insert_before
+from abqtools.jobs import run_inputs
+from abqtools.odbpost import volume_average, set_averages
+from abqtools.sweep import apply_overrides, save_results
+from abqtools.timing import PhaseTimer
 
 Mdb()
+tm = PhaseTimer('demo_HomoHeatTransfer')
 
 # PARAMETERS  (units: SI)
 #----------------------------------------------------------------------------
+tol1=1e-6
 param=dict()
 param['name']='sample'              # name of the part
 param['dim']=[1.,10.,10.]           # dimensions of sample
@@ -27,6 +37,9 @@ param['fibre']=[5.,5.,2.]           # fibre position and radius [yf, zf, rf]
 param['quad']=False                 # linear/quadratic elements
 param['selt']=0.1                   # element size
 param['run']=True                   # run
+param['parallel']=False             # write the 3 load cases, then run them concurrently
+param['ncpus']=6                    # total core budget (parallel)
+param['loadcases']=False            # one job: the 3 gradients as load cases (single factorization)
 
 mat=dict()
 mat['resin']=dict([('dens',1200.), ('elastic',[70.0e9, 0.3]), ('cond',237.)])
@@ -38,16 +51,28 @@ simu['Timp']=10                        # imposed temperature
 simu['tend']=1                         # time period
 simu['dt']=0.1                         # step time
 
+# SWEEP OVERRIDES  (abaqus cae noGUI=demo_HomoHeatTransfer.py -- point.json)
+#----------------------------------------------------------------------------
+apply_overrides(param=param, mat=mat, simu=simu)
+
+
 # MATERIAL (11 22 33 12 13 23)
 #----------------------------------------------------------------------------
+tm.phase('MATERIAL')
 for key in mat.keys():
  mdb.models['Model-1'].Material(name=key)
  mdb.models['Model-1'].materials[key].Density(table=((mat[key]['dens'],), ))
  mdb.models['Model-1'].materials[key].Elastic(type=ISOTROPIC, table=(tuple(mat[key]['elastic']), ))
  mdb.models['Model-1'].materials[key].Conductivity(type=ISOTROPIC, table=((mat[key]['cond'],), ))
+ if param['loadcases']:
+  #conduction analogy: u1 <-> T, (S11,S12,S13) <-> -HFL  (u2=u3=0)
+  k=mat[key]['cond'] 
+  mdb.models['Model-1'].materials[key].Elastic(type=ANISOTROPIC, table=((k, 0., k, 0., 0., k, 0., 0., 0., k, 
+    0., 0., 0., 0., k, 0., 0., 0., 0., 0., k), ))
 
 # GEOMETRY
 #----------------------------------------------------------------------------   
+tm.phase('GEOMETRY')
 s = mdb.models['Model-1'].ConstrainedSketch(name='__profile__', sheetSize=200.0); s.setPrimaryObject(option=STANDALONE)
 s.Line(point1=(0.0, 0.0), point2=(0.0, param['dim'][1]))
 p = mdb.models['Model-1'].Part(dimensionality=THREE_D, name=param['name'], type=DEFORMABLE_BODY)
@@ -56,6 +81,7 @@ del mdb.models['Model-1'].sketches['__profile__']
 
 # PARTITION
 #---------------------------------------------------------------------------- 
+tm.phase('PARTITION')
 p = mdb.models['Model-1'].parts[param['name']]
 f0 = p.faces.getByBoundingBox(xMin=-1e-6, xMax=1e-6)
 e0 = p.edges.getByBoundingBox(xMin=-1e-6, xMax=1e-6, zMax=1e-6)
@@ -71,6 +97,7 @@ s.unsetPrimaryObject(); del mdb.models['Model-1'].sketches['__profile__']
 
 # MESH (2D)
 #----------------------------------------------------------------------------
+tm.phase('MESH (2D)')
 if param['quad']:
  #quadratic 
  elemType1 = mesh.ElemType(elemCode=DS8, elemLibrary=STANDARD)
@@ -87,13 +114,24 @@ p.generateMesh()
 
 # MESH (3D)
 #----------------------------------------------------------------------------
+tm.phase('MESH (3D)')
 p = mdb.models['Model-1'].parts[param['name']]; r1=p.elements.getByBoundingBox()
 p.generateMeshByOffset(region=regionToolset.Region(side1Elements=r1), offsetDirection=OUTWARD, 
     meshType=SOLID, totalThickness=param['dim'][0], numLayers=int(np.ceil(param['dim'][0]/param['selt'])))
 p.deleteMesh(regions=p.faces.getByBoundingBox(xMin=-1e-6, xMax=1e-6))
 p.RemoveFaces(faceList = p.faces.getByBoundingBox(), deleteCells=False)
 #
-if param['quad']:
+if param['quad'] and param['loadcases']:
+ #quadratic (stress elements, conduction analogy)
+ elemType1 = mesh.ElemType(elemCode=C3D20, elemLibrary=STANDARD)
+ elemType2 = mesh.ElemType(elemCode=C3D15, elemLibrary=STANDARD)
+ elemType3 = mesh.ElemType(elemCode=C3D10, elemLibrary=STANDARD)
+elif param['loadcases']:
+ #linear (stress elements, conduction analogy)
+ elemType1 = mesh.ElemType(elemCode=C3D8, elemLibrary=STANDARD)
+ elemType2 = mesh.ElemType(elemCode=C3D6, elemLibrary=STANDARD)
+ elemType3 = mesh.ElemType(elemCode=C3D4, elemLibrary=STANDARD)
+elif param['quad']:
  #quadratic 
  elemType1 = mesh.ElemType(elemCode=DC3D20, elemLibrary=STANDARD)
  elemType2 = mesh.ElemType(elemCode=DC3D15, elemLibrary=STANDARD)
@@ -105,9 +143,11 @@ else:
  elemType3 = mesh.ElemType(elemCode=DC3D4, elemLibrary=STANDARD)
 p = mdb.models['Model-1'].parts[param['name']]; r1=p.elements.getByBoundingBox()
 p.setElementType(regions=(r1,), elemTypes=(elemType1,elemType2,elemType3))
+tm.count(nodes=len(p.nodes), elements=len(p.elements))
 
 # SETS 
 #----------------------------------------------------------------------------  
+tm.phase('SETS')
 p = mdb.models['Model-1'].parts[param['name']]
 #
 c1 = p.elements.getByBoundingBox(); p.Set(name='allE', elements=c1)
@@ -125,6 +165,7 @@ n1 = p.nodes.getByBoundingBox(zMin=param['dim'][2]-1e-6); p.Set(name='nN', nodes
 
 # SECTION
 #----------------------------------------------------------------------------
+tm.phase('SECTION')
 for key in ['resin','fibre']:
  mdb.models['Model-1'].HomogeneousSolidSection(name='S'+key, material=key, thickness=None)
  p = mdb.models['Model-1'].parts[param['name']]
@@ -133,58 +174,69 @@ for key in ['resin','fibre']:
 
 # ASSEMBLY
 #----------------------------------------------------------------------------  
+tm.phase('ASSEMBLY')
 a = mdb.models['Model-1'].rootAssembly;a.DatumCsysByDefault(CARTESIAN)
 a.Instance(dependent=ON, name=param['name'],part=p)
  
 # STEP
 #---------------------------------------------------------------------------- 
-mdb.models['Model-1'].HeatTransferStep(name='HeatTransfer', previous='Initial', response=STEADY_STATE,  
+tm.phase('STEP')
+if param['loadcases']:
+ mdb.models['Model-1'].StaticLinearPerturbationStep(name='Gradients', previous='Initial')
+else:
+ mdb.models['Model-1'].HeatTransferStep(name='HeatTransfer', previous='Initial', response=STEADY_STATE,  
     timePeriod=simu['tend'], maxNumInc=10000000, initialInc=simu['dt'], minInc=1e-08, maxInc=simu['tend'], amplitude=RAMP)
 
 # OUTPUT
 #----------------------------------------------------------------------------
-mdb.models['Model-1'].fieldOutputRequests['F-Output-1'].setValues(variables=(
+tm.phase('OUTPUT')
+if param['loadcases']:
+ mdb.models['Model-1'].fieldOutputRequests['F-Output-1'].setValues(variables=('S', 'U', 'IVOL'))
+else:
+ mdb.models['Model-1'].fieldOutputRequests['F-Output-1'].setValues(variables=(
     'NT', 'HFL', 'RFL', 'IVOL'), frequency=LAST_INCREMENT)
 
 # INTERACTION 
 #----------------------------------------------------------------------------  
+tm.phase('INTERACTION')
 p = mdb.models['Model-1'].parts[param['name']] ; D=np.zeros([3,3])
 #
 oppfaces = [['nB','nF'], ['nL','nR'], ['nS','nN']]
-for jcase in range(len(oppfaces)):
- #delete previous constraints
- for key in mdb.models['Model-1'].constraints.keys():
-  if key.startswith('eqn_'): del mdb.models['Model-1'].constraints[key]
+jobnames = []
+if param['loadcases']:
+ #3 gradients = 3 load cases of a single job
+ jobname='demo_HomoHeatTransfer'; jobnames.append(jobname)
  #
- curfaces = oppfaces[jcase] ; 
- n1=p.sets[curfaces[0]].nodes ; n2=p.sets[curfaces[1]].nodes 
- xyz=np.array([x.coordinates for x in n2]) 
- for i1 in range(len(n1)):
-  i2=np.argmin(np.sqrt(np.sum((n1[i1].coordinates-xyz)**2,1)))
-  pref = 'eq'+curfaces[0][0]+'_'+str(i1) ; pref2=param['name']+'.'+pref
-  p.Set(name=pref+'_1', nodes=n1[i1:i1+1]) ; p.Set(name=pref+'_2', nodes=n2[i2:i2+1])  
-  if i1==0: 
-   p.Set(name='RNTm', nodes=n1[i1:i1+1]); p.Set(name='RNTp', nodes=n2[i2:i2+1]) 
-  else:
-   mdb.models['Model-1'].Equation(name=pref, terms=((1.0, pref2+'_2', 11), (-1.0, pref2+'_1', 11), (+1.0, param['name']+'.RNTm', 11), (-1.0, param['name']+'.RNTp', 11)))
+ a = mdb.models['Model-1'].rootAssembly 
+ lab, xyz = node_arrays(p.sets['allN'].nodes)
+ #fully periodic: u(plus face) = u(image on minus faces) + sum_j L_j*G_j 
+ dep, img, plus, rep = periodic_images(xyz, param['dim'], tol=tol1) ; check_pairs(rep, 'RVE')
+ for j1 in range(3):
+  rp1 = a.ReferencePoint(point=(1.5*param['dim'][0]+j1*param['selt'], 0., 0.))
+  a.Set(name='Grad'+str(j1+1), referencePoints=(a.referencePoints[rp1.id], ))
+ neq = write_periodic_equations(os.path.join(os.getcwd(), jobname+'_eqn.inp'), lab, dep, img, plus, param['dim'], 
+    ['Grad1', 'Grad2', 'Grad3'], dofs=(1, ), inst=param['name']); tm.count(constraints=neq)
+ j1 = int(np.argmin(np.sum(xyz**2, 1))) ; p.Set(name='RNTm', nodes=p.sets['allN'].nodes[j1:j1+1])
  
  # LOAD
  #---------------------------------------------------------------------------- 
- a = mdb.models['Model-1'].rootAssembly
- #
- r1 = a.instances[param['name']].sets['RNTm']
- mdb.models['Model-1'].TemperatureBC(name='Timp', createStepName='HeatTransfer', 
-    region=r1, fixed=OFF, distributionType=UNIFORM, fieldName='', 
-    magnitude=simu['Timp'], amplitude=UNSET)
- #
- r1 = a.instances[param['name']].sets['RNTp']
- mdb.models['Model-1'].TemperatureBC(name='Timp2', createStepName='HeatTransfer', 
-    region=r1, fixed=OFF, distributionType=UNIFORM, fieldName='', 
-    magnitude=simu['Timp']+simu['grad']*param['dim'][jcase], amplitude=UNSET)
+ tm.phase('LOAD')
+ mdb.models['Model-1'].DisplacementBC(name='u23', createStepName='Initial', region=a.instances[param['name']].sets['allN'], 
+    u1=UNSET, u2=SET, u3=SET, ur1=UNSET, ur2=UNSET, ur3=UNSET, amplitude=UNSET, distributionType=UNIFORM, fieldName='', localCsys=None)
+ mdb.models['Model-1'].DisplacementBC(name='Timp', createStepName='Initial', region=a.instances[param['name']].sets['RNTm'], 
+    u1=SET, u2=UNSET, u3=UNSET, ur1=UNSET, ur2=UNSET, ur3=UNSET, amplitude=UNSET, distributionType=UNIFORM, fieldName='', localCsys=None)
+ for j1 in range(3):
+  mdb.models['Model-1'].DisplacementBC(name='Grad'+str(j1+1), createStepName='Gradients', region=a.sets['Grad'+str(j1+1)], 
+    u1=simu['grad'], u2=UNSET, u3=UNSET, ur1=UNSET, ur2=UNSET, ur3=UNSET, amplitude=UNSET, fixed=OFF, 
+    distributionType=UNIFORM, fieldName='', localCsys=None)
+ for jcase in range(3):
+  mdb.models['Model-1'].steps['Gradients'].LoadCase(name='grad'+str(jcase+1), includeActiveBaseStateBC=ON,
+    boundaryConditions=tuple([('Grad'+str(j1+1), float(j1==jcase)) for j1 in range(3)]))
 
  # JOB
  #----------------------------------------------------------------------------
- jobname='demo_HomoHeatTransfer'+str(jcase)
+ tm.phase('JOB')
+ insert_before(mdb.models['Model-1'], '*End Assembly', '*INCLUDE, input='+jobname+'_eqn.inp')
 
  mdb.Job(name=jobname, model='Model-1', description='', type=ANALYSIS, 
     atTime=None, waitMinutes=0, waitHours=0, queue=None, memory=90, 
@@ -196,14 +248,87 @@ for jcase in range(len(oppfaces)):
 
  mdb.saveAs(pathName=os.path.join(os.getcwd(),jobname))
  if param['run']:
+  tm.phase('SOLVE')
   mdb.jobs[jobname].submit(consistencyChecking=OFF)	
   mdb.jobs[jobname].waitForCompletion()
  else:
+  tm.phase('WRITE INPUT')
   mdb.jobs[jobname].writeInput(consistencyChecking=OFF)
+
+else:
+ #1 job per gradient
+ for jcase in range(len(oppfaces)):
+  jobname='demo_HomoHeatTransfer'+str(jcase) ; jobnames.append(jobname)
+  #
+  curfaces = oppfaces[jcase] ; 
+  n1=p.sets[curfaces[0]].nodes ; n2=p.sets[curfaces[1]].nodes 
+  lab1, xyz1 = node_arrays(n1) ; lab2, xyz2 = node_arrays(n2)
+  #pair opposite nodes (hashed grid on the in-plane coordinates)
+  i2s, rep = pair_faces(xyz1, xyz2, normal=jcase, tol=tol1)
+  check_pairs(rep, curfaces[0]+'/'+curfaces[1])
+  i1s = np.flatnonzero(i2s>=0) ; i2s = i2s[i1s]
+  p.Set(name='RNTm', nodes=n1[int(i1s[0]):int(i1s[0])+1]); p.Set(name='RNTp', nodes=n2[int(i2s[0]):int(i2s[0])+1]) 
+  #periodic equations, written in bulk to an included file
+  neq = write_equations(os.path.join(os.getcwd(), jobname+'_eqn.inp'), ((1.0, lab2[i2s[1:]]), (-1.0, lab1[i1s[1:]]), 
+     (+1.0, param['name']+'.RNTm'), (-1.0, param['name']+'.RNTp')), dof=11, inst=param['name']); tm.count(constraints=neq)
  
- # POST
- #---------------------------------------------------------------------------- 
- if param['run']:
+  # LOAD
+  #---------------------------------------------------------------------------- 
+  tm.phase('LOAD')
+  a = mdb.models['Model-1'].rootAssembly
+  #
+  r1 = a.instances[param['name']].sets['RNTm']
+  mdb.models['Model-1'].TemperatureBC(name='Timp', createStepName='HeatTransfer', 
+     region=r1, fixed=OFF, distributionType=UNIFORM, fieldName='', 
+     magnitude=simu['Timp'], amplitude=UNSET)
+  #
+  r1 = a.instances[param['name']].sets['RNTp']
+  mdb.models['Model-1'].TemperatureBC(name='Timp2', createStepName='HeatTransfer', 
+     region=r1, fixed=OFF, distributionType=UNIFORM, fieldName='', 
+     magnitude=simu['Timp']+simu['grad']*param['dim'][jcase], amplitude=UNSET)
+
+  # JOB
+  #----------------------------------------------------------------------------
+  tm.phase('JOB')
+  insert_before(mdb.models['Model-1'], '*End Assembly', '*INCLUDE, input='+jobname+'_eqn.inp')
+
+  mdb.Job(name=jobname, model='Model-1', description='', type=ANALYSIS, 
+     atTime=None, waitMinutes=0, waitHours=0, queue=None, memory=90, 
+     memoryUnits=PERCENTAGE, getMemoryFromAnalysis=True, 
+     explicitPrecision=SINGLE, nodalOutputPrecision=FULL, echoPrint=OFF, 
+     modelPrint=OFF, contactPrint=OFF, historyPrint=OFF, userSubroutine='', 
+     scratch='', resultsFormat=ODB, multiprocessingMode=DEFAULT, numCpus=2, 
+     numDomains=2, numGPUs=0)
+
+  mdb.saveAs(pathName=os.path.join(os.getcwd(),jobname))
+  if param['run'] and not(param['parallel']):
+   tm.phase('SOLVE')
+   mdb.jobs[jobname].submit(consistencyChecking=OFF)	
+   mdb.jobs[jobname].waitForCompletion()
+  else:
+   tm.phase('WRITE INPUT')
+   mdb.jobs[jobname].writeInput(consistencyChecking=OFF)
+
+# RUN (concurrent load cases)
+#----------------------------------------------------------------------------
+tm.phase('RUN')
+if param['run'] and param['parallel'] and not(param['loadcases']):
+ run_inputs(jobnames, ncpus=param['ncpus'])
+ 
+# POST
+#---------------------------------------------------------------------------- 
+tm.phase('POST')
+for jcase in range(len(jobnames)):
+ jobname=jobnames[jcase]
+ if param['run'] and param['loadcases']:
+  o3 = session.openOdb(name=os.path.join(os.getcwd(),jobname+'.odb'))
+  for fr in o3.steps['Gradients'].frames:
+   if fr.loadCase is None: continue
+   j1 = int(fr.loadCase.name[-1])-1
+   #(S11,S12,S13) = -HFL
+   mS, vol = volume_average(fr.fieldOutputs['S'], fr.fieldOutputs['IVOL'])
+   D[:,j1] = mS[[0,3,4]]/simu['grad']
+ elif param['run']:
   o3 = session.openOdb(name=os.path.join(os.getcwd(),jobname+'.odb'))
   session.viewports['Viewport: 1'].setValues(displayedObject=o3)
   session.viewports['Viewport: 1'].odbDisplay.display.setValues(plotState=(CONTOURS_ON_DEF, ))
@@ -213,24 +338,20 @@ for jcase in range(len(oppfaces)):
   #
   csys1 = o3.rootAssembly.DatumCsysByThreePoints(name='Csys1', coordSysType=CARTESIAN,
     origin=(0,0,0), point1=(1.0, 0.0, 0), point2=(0.0, 1.0, 0.0) )
-  r1 = o3.rootAssembly.elementSets[' ALL ELEMENTS']
   #
   hfl0 = o3.steps['HeatTransfer'].frames[-1].fieldOutputs['HFL'].getTransformedField(datumCsys=csys1)
   ivol0 = o3.steps['HeatTransfer'].frames[-1].fieldOutputs['IVOL']
-  #
-  hfl1 = hfl0.getSubset(region=r1, position=INTEGRATION_POINT); HFL = hfl1.bulkDataBlocks[0].data
-  ivol1 = ivol0.getSubset(region=r1, position=INTEGRATION_POINT); IVOL = ivol1.bulkDataBlocks[0].data
-  #
-  e_hfl = hfl1.bulkDataBlocks[0].elementLabels ; i_hfl = hfl1.bulkDataBlocks[0].integrationPoints
-  e_ivol = ivol1.bulkDataBlocks[0].elementLabels ; i_ivol = ivol1.bulkDataBlocks[0].integrationPoints
-  if not(np.all(e_ivol==e_hfl) and np.all(i_ivol==i_hfl)): print('check output order')
-  #
-  vol = np.sum(IVOL)
-  mHFL = np.sum(HFL*IVOL,0)/vol
-  #
+  #volume averages (all element blocks, aligned on element/integration point)
+  mHFL, vol = volume_average(hfl0, ivol0)
   D[:,jcase]=-mHFL/(simu['grad'])
+  #
+  r1 = o3.rootAssembly.instances[param['name'].upper()].elementSets
+  for key, val in set_averages(hfl0, ivol0, dict([(key, r1[key.upper()]) for key in ['fibre','resin']])).items():
+   print(jobname+' '+key+': mean HFL=', val[0], ' volume=', val[1])
  
 # PRINT EFFECTIVE PROPERTIES
 #----------------------------------------------------------------------------
-if param['run']: print('D=',D)
+tm.phase('PRINT EFFECTIVE PROPERTIES')
+if param['run']: print('D=',D); save_results('demo_HomoHeatTransfer', D=D)
 
+tm.save()
@@ -14,9 +14,16 @@ from abaqus import *
 from abaqusConstants import *
 from caeModules import *
 import numpy as np
-import os
+import os, sys, inspect
+sys.path.insert(0, os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe()))))
+from abqtools.sweep import apply_overrides, save_results
+from abqtools.keywords import KeywordEditor
+from abqtools.sectionlib import section_key, fetch, store
+from abqtools.warping import section_mesh, section_properties, write_bsp
+from abqtools.timing import PhaseTimer
 
 Mdb()
+tm = PhaseTimer('demo_MeshedCrossSectionBeam')
 
 # PARAMETERS  (units: SI)
 #----------------------------------------------------------------------------
@@ -26,86 +33,123 @@ param['load']=100.                     # force amplitude
 param['quad']=False                    # linear/quadratic elements
 param['selt']=[5.e-3,1e-3]             # element size [E_beam,E_sec]
 param['run']=True                     # run
+param['seclib']=True                   # cross-section library: .bsp re-used while section, mesh size and material are unchanged
+param['secsolver']='abaqus'            # cross-section: 'abaqus' (*BEAM SECTION GENERATE job) or 'native' (NumPy warping function)
 
+# MATERIALS  (units: SI)
+mat=dict()
+mat['alu']=dict([('dens',2700.), ('elastic',(70.0e9, 0.3))])
 
+# SWEEP OVERRIDES  (abaqus cae noGUI=demo_MeshedCrossSectionBeam.py -- point.json)
 #----------------------------------------------------------------------------
-# CROSS-SECTION GENERATION 
-#----------------------------------------------------------------------------
+apply_overrides(param=param, mat=mat)
 
 
-# MATERIAL (11 22 33 12 13 23)
+# SECTION LIBRARY
 #----------------------------------------------------------------------------
-mdb.models.changeKey(fromName='Model-1', toName='Model-CrossSection')
-mdb.models['Model-CrossSection'].Material(name='alu')
-mdb.models['Model-CrossSection'].materials['alu'].Density(table=((2700.0, ), ))
-mdb.models['Model-CrossSection'].materials['alu'].Elastic(table=((70.0e9, 0.3), ))
-
-
-# CROSS-SECTION GEOMETRY 
-#----------------------------------------------------------------------------   
-s = mdb.models['Model-CrossSection'].ConstrainedSketch(name='__profile__', sheetSize=200.0); s.setPrimaryObject(option=STANDALONE)
-s.CircleByCenterPerimeter(center=(0.0, 0.0), point1=(0.0, param['dim'][1]))
-s.rectangle(point1=(-param['dim'][2]/2., -param['dim'][2]/2.), point2=(param['dim'][2]/2., param['dim'][2]/2.))
-p = mdb.models['Model-CrossSection'].Part(name='GeoSection', dimensionality=TWO_D_PLANAR, type=DEFORMABLE_BODY)
-p.BaseShell(sketch=s) ; s.unsetPrimaryObject()
-del mdb.models['Model-CrossSection'].sketches['__profile__']
-#
-p = mdb.models['Model-CrossSection'].parts['GeoSection']
-session.viewports['Viewport: 1'].setValues(displayedObject=p)
+secdesc = dict([('dim', param['dim'][1:]), ('selt', param['selt'][1]), ('mat', mat['alu']), ('elements', ['WARP2D4', 'WARP2D3'])])
+seckey = section_key(**secdesc)
+cached = param['secsolver']=='abaqus' and param['seclib'] and fetch(seckey, os.path.join(os.getcwd(), 'CrossSection.bsp')) is not None
+if cached: print('cross-section '+seckey[:12]+' found in the library: section job skipped')
 
 
-# CROSS-SECTION SECTION
+# NATIVE CROSS-SECTION (quadrilateral mesh, Saint-Venant warping function)
 #----------------------------------------------------------------------------
-mdb.models['Model-CrossSection'].HomogeneousSolidSection(name='sec', material='alu', thickness=None)
-p = mdb.models['Model-CrossSection'].parts['GeoSection']
-p.SectionAssignment(sectionName='sec', offsetField='', offsetType=MIDDLE_SURFACE, offset=0.0, 
-  region=(p.faces.getByBoundingBox(),),  thicknessAssignment=FROM_SECTION)
+if param['secsolver']=='native':
+ tm.phase('CROSS-SECTION NATIVE')
+ xy, conn = section_mesh(param['dim'][1], param['dim'][2], param['selt'][1])
+ secprops, omega = section_properties(xy, conn); tm.count(nodes=len(xy), elements=len(conn))
+ save_results('CrossSection_native', **secprops)
+secjob = param['secsolver']=='abaqus' and not cached
 
 
-# CROSS-SECTION MESH
 #----------------------------------------------------------------------------
-elemType1 = mesh.ElemType(elemCode=WARP2D4, elemLibrary=STANDARD, secondOrderAccuracy=ON)
-elemType2 = mesh.ElemType(elemCode=WARP2D3, elemLibrary=STANDARD, secondOrderAccuracy=ON)
-p.setElementType(regions=(p.faces.getByBoundingBox(),), elemTypes=(elemType1,elemType2))
-p.seedPart(size=param['selt'][1], deviationFactor=0.1, minSizeFactor=0.1)
-p.generateMesh()
-
-
-# CROSS-SECTION ASSEMBLY
-#----------------------------------------------------------------------------  
-a = mdb.models['Model-CrossSection'].rootAssembly;a.DatumCsysByDefault(CARTESIAN)
-p = mdb.models['Model-CrossSection'].parts['GeoSection']
-a.Instance(dependent=ON, name='CrossSection',part=p)
-
-
-# STEP
-#---------------------------------------------------------------------------- 
-mdb.models['Model-CrossSection'].StaticStep(name='dummy', previous='Initial')
-del mdb.models['Model-CrossSection'].fieldOutputRequests['F-Output-1']
-del mdb.models['Model-CrossSection'].historyOutputRequests['H-Output-1']
-#
-mdb.models['Model-CrossSection'].keywordBlock.synchVersions()
-nKblock=len(mdb.models['Model-CrossSection'].keywordBlock.sieBlocks)
-for j1 in range(nKblock):
-    st1=mdb.models['Model-CrossSection'].keywordBlock.sieBlocks[j1]
-    if st1.startswith('*Step'):break
-if j1<nKblock:
-    mdb.models['Model-CrossSection'].keywordBlock.replace(j1, """*STEP""")
-    mdb.models['Model-CrossSection'].keywordBlock.replace(j1+1, """*BEAM SECTION GENERATE""")
-    for j2 in range(j1+2,nKblock-1): mdb.models['Model-CrossSection'].keywordBlock.replace(j2, """""")
-    mdb.models['Model-CrossSection'].keywordBlock.insert(j1+1,"""*SECTION POINTS \n 1,1,1 \n 2,2,1 \n 3,3,1""")
+# CROSS-SECTION GENERATION 
+#----------------------------------------------------------------------------
 
 
-# JOB
-#----------------------------------------------------------------------------
-mdb.Job(name='CrossSection', model='Model-CrossSection', description='', 
+mdb.models.changeKey(fromName='Model-1', toName='Model-CrossSection')
+if secjob:
+ #section model built only for the *BEAM SECTION GENERATE job (not for a library hit or the native solver)
+
+ # MATERIAL (11 22 33 12 13 23)
+ #----------------------------------------------------------------------------
+ tm.phase('CROSS-SECTION MATERIAL')
+ mdb.models['Model-CrossSection'].Material(name='alu')
+ mdb.models['Model-CrossSection'].materials['alu'].Density(table=((mat['alu']['dens'], ), ))
+ mdb.models['Model-CrossSection'].materials['alu'].Elastic(table=(mat['alu']['elastic'], ))
+
+
+ # CROSS-SECTION GEOMETRY 
+ #----------------------------------------------------------------------------   
+ tm.phase('CROSS-SECTION GEOMETRY')
+ s = mdb.models['Model-CrossSection'].ConstrainedSketch(name='__profile__', sheetSize=200.0); s.setPrimaryObject(option=STANDALONE)
+ s.CircleByCenterPerimeter(center=(0.0, 0.0), point1=(0.0, param['dim'][1]))
+ s.rectangle(point1=(-param['dim'][2]/2., -param['dim'][2]/2.), point2=(param['dim'][2]/2., param['dim'][2]/2.))
+ p = mdb.models['Model-CrossSection'].Part(name='GeoSection', dimensionality=TWO_D_PLANAR, type=DEFORMABLE_BODY)
+ p.BaseShell(sketch=s) ; s.unsetPrimaryObject()
+ del mdb.models['Model-CrossSection'].sketches['__profile__']
+ #
+ p = mdb.models['Model-CrossSection'].parts['GeoSection']
+ session.viewports['Viewport: 1'].setValues(displayedObject=p)
+
+
+ # CROSS-SECTION SECTION
+ #----------------------------------------------------------------------------
+ tm.phase('CROSS-SECTION SECTION')
+ mdb.models['Model-CrossSection'].HomogeneousSolidSection(name='sec', material='alu', thickness=None)
+ p = mdb.models['Model-CrossSection'].parts['GeoSection']
+ p.SectionAssignment(sectionName='sec', offsetField='', offsetType=MIDDLE_SURFACE, offset=0.0, 
+   region=(p.faces.getByBoundingBox(),),  thicknessAssignment=FROM_SECTION)
+
+
+ # CROSS-SECTION MESH
+ #----------------------------------------------------------------------------
+ tm.phase('CROSS-SECTION MESH')
+ elemType1 = mesh.ElemType(elemCode=WARP2D4, elemLibrary=STANDARD, secondOrderAccuracy=ON)
+ elemType2 = mesh.ElemType(elemCode=WARP2D3, elemLibrary=STANDARD, secondOrderAccuracy=ON)
+ p.setElementType(regions=(p.faces.getByBoundingBox(),), elemTypes=(elemType1,elemType2))
+ p.seedPart(size=param['selt'][1], deviationFactor=0.1, minSizeFactor=0.1)
+ p.generateMesh(); tm.count(nodes=len(p.nodes), elements=len(p.elements))
+
+
+ # CROSS-SECTION ASSEMBLY
+ #----------------------------------------------------------------------------  
+ tm.phase('CROSS-SECTION ASSEMBLY')
+ a = mdb.models['Model-CrossSection'].rootAssembly;a.DatumCsysByDefault(CARTESIAN)
+ p = mdb.models['Model-CrossSection'].parts['GeoSection']
+ a.Instance(dependent=ON, name='CrossSection',part=p)
+
+
+ # STEP
+ #---------------------------------------------------------------------------- 
+ tm.phase('CROSS-SECTION STEP')
+ mdb.models['Model-CrossSection'].StaticStep(name='dummy', previous='Initial')
+ del mdb.models['Model-CrossSection'].fieldOutputRequests['F-Output-1']
+ del mdb.models['Model-CrossSection'].historyOutputRequests['H-Output-1']
+ #
+ #step content replaced by the section generation (one synchronization, edits committed together)
+ kw = KeywordEditor(mdb.models['Model-CrossSection'], reset=False)
+ j1 = kw.find('*Step')
+ kw.replace(j1, """*STEP""")
+ kw.replace(j1+1, """*BEAM SECTION GENERATE""")
+ kw.insert(j1+1, """*SECTION POINTS \n 1,1,1 \n 2,2,1 \n 3,3,1""")
+ kw.delete(range(j1+2, kw.find('*End Step')))
+ kw.commit()
+
+
+ # JOB
+ #----------------------------------------------------------------------------
+ tm.phase('CROSS-SECTION JOB')
+ mdb.Job(name='CrossSection', model='Model-CrossSection', description='', 
     type=ANALYSIS, atTime=None, waitMinutes=0, waitHours=0, queue=None, 
     memory=90, memoryUnits=PERCENTAGE, getMemoryFromAnalysis=True, 
     explicitPrecision=SINGLE, nodalOutputPrecision=FULL, echoPrint=OFF, 
     modelPrint=OFF, contactPrint=OFF, historyPrint=OFF, userSubroutine='', 
     scratch='', resultsFormat=ODB, numThreadsPerMpiProcess=1, 
     multiprocessingMode=DEFAULT, numCpus=1, numGPUs=0)
-mdb.jobs['CrossSection'].writeInput(consistencyChecking=OFF)
+ tm.phase('CROSS-SECTION WRITE INPUT')
+ mdb.jobs['CrossSection'].writeInput(consistencyChecking=OFF)
 
 
 
@@ -124,12 +168,14 @@ mdb.Model(name='Model-LoadBeam', modelType=STANDARD_EXPLICIT)
 
 # MATERIAL (11 22 33 12 13 23)
 #----------------------------------------------------------------------------
+tm.phase('BEAM MATERIAL')
 mdb.models['Model-LoadBeam'].Material(name='alu')
-mdb.models['Model-LoadBeam'].materials['alu'].Elastic(table=((70.0e9, 0.3), ))
+mdb.models['Model-LoadBeam'].materials['alu'].Elastic(table=(mat['alu']['elastic'], ))
 
 
 # BEAM GEOMETRY 
 #----------------------------------------------------------------------------   
+tm.phase('BEAM GEOMETRY')
 s = mdb.models['Model-LoadBeam'].ConstrainedSketch(name='__profile__', sheetSize=200.0); s.setPrimaryObject(option=STANDALONE)
 s.Line(point1=(0.0, 0.0), point2=(param['dim'][0], 0.0))
 p = mdb.models['Model-LoadBeam'].Part(name='Beam', dimensionality=TWO_D_PLANAR, type=DEFORMABLE_BODY)
@@ -142,12 +188,14 @@ session.viewports['Viewport: 1'].setValues(displayedObject=p)
 
 # SETS 
 #----------------------------------------------------------------------------  
+tm.phase('SETS')
 n1 = p.vertices.getByBoundingBox(xMax=1e-5); p.Set(name='X0', vertices=n1)
 n1 = p.vertices.getByBoundingBox(xMin=param['dim'][0]-1e-5); p.Set(name='XL', vertices=n1)
 
 
 # BEAM SECTION
 #----------------------------------------------------------------------------
+tm.phase('BEAM SECTION')
 p = mdb.models['Model-LoadBeam'].parts['Beam']
 mdb.models['Model-LoadBeam'].CircularProfile(name='dummy', r=1.0)
 mdb.models['Model-LoadBeam'].BeamSection(name='SecBeam', material='alu',  
@@ -160,6 +208,7 @@ p.assignBeamSectionOrientation(region=(p.edges.getByBoundingBox(),), method=N1_C
 
 # BEAM MESH
 #----------------------------------------------------------------------------
+tm.phase('BEAM MESH')
 if param['quad']:
  #quadratic 
  elemType1 = mesh.ElemType(elemCode=B22, elemLibrary=STANDARD)
@@ -168,11 +217,12 @@ else:
  elemType1 = mesh.ElemType(elemCode=B21, elemLibrary=STANDARD)
 p.setElementType(regions=(p.edges.getByBoundingBox(),), elemTypes=(elemType1,))
 p.seedPart(size=param['selt'][0], deviationFactor=0.1, minSizeFactor=0.1)
-p.generateMesh()
+p.generateMesh(); tm.count(nodes=len(p.nodes), elements=len(p.elements))
 
 
 # ASSEMBLY
 #----------------------------------------------------------------------------  
+tm.phase('BEAM ASSEMBLY')
 a = mdb.models['Model-LoadBeam'].rootAssembly;a.DatumCsysByDefault(CARTESIAN)
 p = mdb.models['Model-LoadBeam'].parts['Beam']
 a.Instance(dependent=ON, name='Beam',part=p)
@@ -180,17 +230,20 @@ a.Instance(dependent=ON, name='Beam',part=p)
 
 # STEP
 #---------------------------------------------------------------------------- 
+tm.phase('BEAM STEP')
 mdb.models['Model-LoadBeam'].StaticStep(name='Loading', previous='Initial')
 
 
 # OUTPUT
 #----------------------------------------------------------------------------
+tm.phase('OUTPUT')
 mdb.models['Model-LoadBeam'].fieldOutputRequests['F-Output-1'].setValues(variables=(
     'S', 'E', 'EE', 'U', 'RF'), timeInterval=0.1)
 
     
 # LOAD
 #---------------------------------------------------------------------------- 
+tm.phase('LOAD')
 a = mdb.models['Model-LoadBeam'].rootAssembly
 #
 mdb.models['Model-LoadBeam'].EncastreBC(name='fix', createStepName='Initial', region=a.instances['Beam'].sets['X0'], localCsys=None)
@@ -200,19 +253,26 @@ mdb.models['Model-LoadBeam'].ConcentratedForce(name='Load', createStepName='Load
 
 # MESHED-CROSS SECTION
 #---------------------------------------------------------------------------- 
-mdb.models['Model-LoadBeam'].keywordBlock.synchVersions()
-nKblock=len(mdb.models['Model-LoadBeam'].keywordBlock.sieBlocks)
-for j1 in range(nKblock):
-    st1=mdb.models['Model-LoadBeam'].keywordBlock.sieBlocks[j1]
-    if st1.startswith('*Beam Section'):break
-if j1<nKblock:
-    st2=st1.split('\n');st3=st2[0].split(',')
-    mdb.models['Model-LoadBeam'].keywordBlock.replace(j1, '*BEAM GENERAL SECTION, '+st3[1]+', SECTION=MESHED \n'+st2[-1])
-    mdb.models['Model-LoadBeam'].keywordBlock.insert(9, """*INCLUDE, input=CrossSection.bsp""")
+tm.phase('MESHED-CROSS SECTION')
+#section data lines read from the .bsp included right after the section block
+kw = KeywordEditor(mdb.models['Model-LoadBeam'], reset=False)
+j1 = kw.find('*Beam Section')
+st2=kw.blocks[j1].strip().split('\n');st3=st2[0].split(',')
+if param['secsolver']=='native':
+ #properties, n1 direction and moduli in the included file
+ write_bsp(os.path.join(os.getcwd(), 'CrossSection_native.bsp'), secprops, mat['alu']['elastic'][0], mat['alu']['elastic'][1], 
+   n1=[float(x) for x in st2[-1].split(',')])
+ kw.replace(j1, '*BEAM GENERAL SECTION, '+st3[1]+', SECTION=GENERAL')
+ kw.insert('after *Beam Section', """*INCLUDE, input=CrossSection_native.bsp""")
+else:
+ kw.replace(j1, '*BEAM GENERAL SECTION, '+st3[1]+', SECTION=MESHED \n'+st2[-1])
+ kw.insert('after *Beam Section', """*INCLUDE, input=CrossSection.bsp""")
+kw.commit()
 
 
 # JOB
 #----------------------------------------------------------------------------
+tm.phase('BEAM JOB')
 mdb.Job(name='demo_MeshCrossSectionBeam', model='Model-LoadBeam', description='', type=ANALYSIS, 
     atTime=None, waitMinutes=0, waitHours=0, queue=None, memory=90, 
     memoryUnits=PERCENTAGE, getMemoryFromAnalysis=True, 
@@ -220,23 +280,31 @@ mdb.Job(name='demo_MeshCrossSectionBeam', model='Model-LoadBeam', description=''
     modelPrint=OFF, contactPrint=OFF, historyPrint=OFF, userSubroutine='', 
     scratch='', resultsFormat=ODB, multiprocessingMode=DEFAULT, numCpus=2, 
     numDomains=2, numGPUs=0)
+tm.phase('BEAM WRITE INPUT')
 mdb.jobs['demo_MeshCrossSectionBeam'].writeInput(consistencyChecking=OFF)
 
 
 # RUN ALL
 #----------------------------------------------------------------------------
+tm.phase('RUN ALL')
 mdb.saveAs(pathName=os.path.join(os.getcwd(), 'demo_MeshCrossSectionBeam'))
 session.viewports['Viewport: 1'].setValues(displayedObject=mdb.models['Model-LoadBeam'].rootAssembly)
-if param['run']:
+if param['run'] and secjob:
+ tm.phase('CROSS-SECTION SOLVE')
  mdb.jobs['CrossSection'].submit(consistencyChecking=OFF)	
  mdb.jobs['CrossSection'].waitForCompletion()
+ if param['seclib'] and os.path.isfile(os.path.join(os.getcwd(), 'CrossSection.bsp')):
+  store(seckey, os.path.join(os.getcwd(), 'CrossSection.bsp'), secdesc)
+if param['run']:
  #
+ tm.phase('BEAM SOLVE')
  mdb.jobs['demo_MeshCrossSectionBeam'].submit(consistencyChecking=OFF)	
  mdb.jobs['demo_MeshCrossSectionBeam'].waitForCompletion()
  
 
 # POST
 #---------------------------------------------------------------------------- 
+tm.phase('POST')
 if param['run']:
  o3 = session.openOdb(name=os.path.join(os.getcwd(),'demo_MeshCrossSectionBeam.odb'))
  session.viewports['Viewport: 1'].setValues(displayedObject=o3)
@@ -245,3 +313,5 @@ if param['run']:
  session.viewports['Viewport: 1'].odbDisplay.setPrimaryVariable(variableLabel='S', 
     outputPosition=INTEGRATION_POINT, refinement=(COMPONENT, 'S11'), )
  session.viewports['Viewport: 1'].makeCurrent()
+
+tm.save()
@@ -4,6 +4,7 @@
  ARTS ET METIERS - ABAQUS DEMOS
  
  PLATE with a CENTERED CIRCULAR HOLE
+ (CAE-free input file: python abqtools/inpgen.py PlateWithHole)
  
  Eric Monteiro - PIMM - PARIS - FRANCE   
  
@@ -14,9 +15,17 @@ from abaqus import *
 from abaqusConstants import *
 from caeModules import *
 import numpy as np
-import os
+import os, sys, inspect
+sys.path.insert(0, os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe()))))
+from abqtools.sweep import apply_overrides, save_results, param_key
+from abqtools.odbpost import nodal_field
+from abqtools.fidelity import hole_stress, mises
+from abqtools.inpgen import plate_outline, graded_divisions, arc_size
+from abqtools.meshdata import graded_plate
+from abqtools.timing import PhaseTimer
 
 Mdb()
+tm = PhaseTimer('demo_PlateWithHole')
 
 # PARAMETERS  (units: SI)
 #----------------------------------------------------------------------------
@@ -28,10 +37,21 @@ param['selt']=[1.0e-3, 0.1]            # element size
 param['quad']=False                    # linear/quadratic elements
 param['load']=[1.e-3,0.e-3]            # applied displacement in X- & Y- direction
 param['run']=False                     # run
+param['submodel']=False                # global-local: coarse global model (selt), fine submodel around the hole
+param['subrad']=3.                     # submodel outer radius / hole radius
+param['subselt']=0.2e-3                # submodel element size
+param['mesh']='free'                   # 'free' (uniform seeds) or 'graded' (mappable partitions, biased seeds, all quad/hex)
+param['nelt']=400                      # graded: target number of in-plane elements
+param['bias']=8.                       # graded: radial element size ratio, outer edges / hole
+
+# SWEEP OVERRIDES  (abaqus cae noGUI=demo_PlateWithHole.py -- point.json)
+#----------------------------------------------------------------------------
+apply_overrides(param=param)
 
 
 # MATERIAL (11 22 33 12 13 23)
 #----------------------------------------------------------------------------
+tm.phase('MATERIAL')
 mdb.models['Model-1'].Material(name='alu')
 mdb.models['Model-1'].materials['alu'].Density(table=((2700.0, ), ))
 mdb.models['Model-1'].materials['alu'].Elastic(table=((70.0e9, 0.3), ))
@@ -39,6 +59,7 @@ mdb.models['Model-1'].materials['alu'].Elastic(table=((70.0e9, 0.3), ))
 
 # GEOMETRY
 #----------------------------------------------------------------------------   
+tm.phase('GEOMETRY')
 s = mdb.models['Model-1'].ConstrainedSketch(name='__profile__', sheetSize=200.0); s.setPrimaryObject(option=STANDALONE)
 s.Line(point1=(0.0, param['rad']), point2=(0.0, param['dim'][1]/2.))
 s.Line(point1=(0.0, param['dim'][1]/2.), point2=(param['dim'][0]/2., param['dim'][1]/2.))
@@ -58,6 +79,7 @@ del mdb.models['Model-1'].sketches['__profile__']
 
 # SETS & SURFACES
 #---------------------------------------------------------------------------- 
+tm.phase('SETS & SURFACES')
 p = mdb.models['Model-1'].parts['sample']
 if param['idim']==3 :
  f1 = p.faces.getByBoundingBox(xMax=1e-6); p.Set(name='x0', faces=f1) 
@@ -74,6 +96,7 @@ else:
 
 # SECTION
 #----------------------------------------------------------------------------
+tm.phase('SECTION')
 if param['idim']==3 :
   r1=p.cells.getByBoundingBox()
   mdb.models['Model-1'].HomogeneousSolidSection(name='sec', material='alu', thickness=None)
@@ -88,6 +111,7 @@ else:
 
 # MESH
 #----------------------------------------------------------------------------
+tm.phase('MESH')
 if param['idim']==3 :
  if param['quad']:
   #quadratic 
@@ -111,31 +135,47 @@ else:
   elemType2 = mesh.ElemType(elemCode=CPS3, elemLibrary=STANDARD)
  elemtypes=(elemType1,elemType2)  
 #   
-p.setElementType(regions=(r1,), elemTypes=elemtypes)
-p.seedPart(size=param['selt'][0], deviationFactor=param['selt'][1], minSizeFactor=0.1)
-p.generateMesh()
+hmesh = param['selt'][0]
+if param['mesh']=='graded':
+ #two mappable regions split at the corner, radial seeds biased from the hole, structured quad/hex
+ center, outer = plate_outline(param, 'PlateWithHole')
+ div = graded_divisions(param, 'PlateWithHole', param['nelt'], param['bias'])
+ nz = max(1, int(np.ceil(param['dim'][2]/2./param['selt'][0]))) if param['idim']==3 else None
+ graded_plate(mdb.models['Model-1'], p, center, outer, param['rad'], div, param['bias'], nz=nz,
+    depth=param['dim'][2]/2. if param['idim']==3 else None)
+ r1 = p.cells.getByBoundingBox() if param['idim']==3 else p.faces.getByBoundingBox()
+ hmesh = arc_size(param, 'PlateWithHole', div)
+ p.setElementType(regions=(r1,), elemTypes=elemtypes)
+else:
+ p.setElementType(regions=(r1,), elemTypes=elemtypes)
+ p.seedPart(size=param['selt'][0], deviationFactor=param['selt'][1], minSizeFactor=0.1)
+p.generateMesh(); tm.count(nodes=len(p.nodes), elements=len(p.elements))
 
 
 # ASSEMBLY
 #----------------------------------------------------------------------------  
+tm.phase('ASSEMBLY')
 a = mdb.models['Model-1'].rootAssembly;a.DatumCsysByDefault(CARTESIAN)
 a.Instance(dependent=ON, name='sample',part=p)
  
 
 # STEP
 #---------------------------------------------------------------------------- 
+tm.phase('STEP')
 mdb.models['Model-1'].ImplicitDynamicsStep(name='demo_TensileTest', previous='Initial', 
     timePeriod=10.0, maxNumInc=1000000, initialInc=1., minInc=1e-04, application=QUASI_STATIC, amplitude=RAMP)
 
 
 # OUTPUT
 #----------------------------------------------------------------------------
+tm.phase('OUTPUT')
 mdb.models['Model-1'].fieldOutputRequests['F-Output-1'].setValues(variables=(
     'S', 'E', 'EE', 'U', 'RF'), timeInterval=1.)
 
     
 # LOAD
 #---------------------------------------------------------------------------- 
+tm.phase('LOAD')
 a = mdb.models['Model-1'].rootAssembly
 #
 r1 = a.instances['sample'].sets['x0']
@@ -161,7 +201,12 @@ mdb.models['Model-1'].DisplacementBC(name='moveY', createStepName='demo_TensileT
 
 # JOB
 #----------------------------------------------------------------------------
-jobname='demo_PlateWithHole'
+tm.phase('JOB')
+jobname='demo_PlateWithHole'+('_global' if param['submodel'] else '')
+#global-local: the global run is re-used while the global model is unchanged
+gkey = param_key(**dict([(k, param[k]) for k in ('idim', 'dim', 'rad', 'selt', 'quad', 'load', 'mesh', 'nelt', 'bias')]))
+fkey = os.path.join(os.getcwd(), jobname+'_key.txt')
+reuse = param['submodel'] and os.path.isfile(os.path.join(os.getcwd(), jobname+'.odb')) and os.path.isfile(fkey) and open(fkey).read()==gkey
 
 mdb.Job(name=jobname, model='Model-1', description='', type=ANALYSIS, 
     atTime=None, waitMinutes=0, waitHours=0, queue=None, memory=90, 
@@ -173,15 +218,86 @@ mdb.Job(name=jobname, model='Model-1', description='', type=ANALYSIS,
 
 mdb.saveAs(pathName=os.path.join(os.getcwd(), jobname))
 session.viewports['Viewport: 1'].setValues(displayedObject=mdb.models['Model-1'].rootAssembly)
-if param['run']:
+if param['run'] and reuse:
+ print('global model unchanged: '+jobname+'.odb re-used')
+elif param['run']:
+ tm.phase('SOLVE')
  mdb.jobs[jobname].submit(consistencyChecking=OFF)	
  mdb.jobs[jobname].waitForCompletion()
+ if param['submodel'] and mdb.jobs[jobname].status==COMPLETED: open(fkey, 'w').write(gkey)
 else:
+ tm.phase('WRITE INPUT')
  mdb.jobs[jobname].writeInput(consistencyChecking=OFF)
 
+
+# SUBMODEL (quarter annulus around the hole driven by the displacements of the global run)
+#----------------------------------------------------------------------------
+if param['submodel']:
+ tm.phase('SUBMODEL')
+ rs=param['subrad']*param['rad']; c45=np.cos(pi/4.)
+ mdb.Model(name='Model-Sub', objectToCopy=mdb.models['Model-1'])
+ m = mdb.models['Model-Sub']
+ for key in ('moveX', 'moveY'): del m.boundaryConditions[key]
+ m.rootAssembly.deleteFeatures(('sample', ))
+ #geometry
+ s = m.ConstrainedSketch(name='__profile__', sheetSize=200.0); s.setPrimaryObject(option=STANDALONE)
+ s.Line(point1=(0.0, param['rad']), point2=(0.0, rs))
+ s.ArcByCenterEnds(center=(0.0, 0.0), point1=(0.0, rs), point2=(rs, 0.),  direction=CLOCKWISE)
+ s.Line(point1=(rs, 0.), point2=(param['rad'], 0.))
+ s.ArcByCenterEnds(center=(0.0, 0.0), point1=(0.0, param['rad']), point2=(param['rad'], 0.),  direction=CLOCKWISE)
+ if param['idim']==3:
+  p = m.Part(dimensionality=THREE_D, name='subsample', type=DEFORMABLE_BODY)
+  p.BaseSolidExtrude(depth=param['dim'][2]/2., sketch=s)
+  f1 = p.faces.getByBoundingBox(xMax=1e-6); p.Set(name='x0', faces=f1) 
+  f1 = p.faces.getByBoundingBox(yMax=1e-6); p.Set(name='y0', faces=f1) 
+  f1 = p.faces.getByBoundingBox(zMax=1e-6); p.Set(name='z0', faces=f1) 
+  f1 = p.faces.findAt(((rs*c45, rs*c45, param['dim'][2]/4.), )); p.Set(name='outer', faces=f1)
+  r1=p.cells.getByBoundingBox()
+ else:
+  p = m.Part(name='subsample', dimensionality=TWO_D_PLANAR, type=DEFORMABLE_BODY)
+  p.BaseShell(sketch=s) 
+  f1 = p.edges.getByBoundingBox(xMax=1e-6); p.Set(name='x0', edges=f1) 
+  f1 = p.edges.getByBoundingBox(yMax=1e-6); p.Set(name='y0', edges=f1) 
+  f1 = p.edges.findAt(((rs*c45, rs*c45, 0.), )); p.Set(name='outer', edges=f1)
+  r1=p.faces.getByBoundingBox()
+ s.unsetPrimaryObject(); del m.sketches['__profile__']
+ #section, mesh (same element types as the global model)
+ p.SectionAssignment(sectionName='sec', offsetField='', offsetType=MIDDLE_SURFACE, offset=0.0, 
+    region=(r1,),  thicknessAssignment=FROM_SECTION)
+ p.setElementType(regions=(r1,), elemTypes=elemtypes)
+ p.seedPart(size=param['subselt'], deviationFactor=param['selt'][1], minSizeFactor=0.1)
+ p.generateMesh(); tm.count(nodes=len(p.nodes), elements=len(p.elements))
+ #symmetries, global displacements on the outer arc
+ a = m.rootAssembly; a.Instance(dependent=ON, name='sample', part=p)
+ m.boundaryConditions['xsym'].setValues(region=a.instances['sample'].sets['x0'])
+ m.boundaryConditions['ysym'].setValues(region=a.instances['sample'].sets['y0'])
+ if param['idim']==3: m.boundaryConditions['zsym'].setValues(region=a.instances['sample'].sets['z0'])
+ m.setValues(globalJob=jobname)
+ m.SubmodelBC(name='global', createStepName='demo_TensileTest', region=a.instances['sample'].sets['outer'], 
+    globalStep='1', globalIncrement=0, timeScale=OFF, dof=(1, 2, 3) if param['idim']==3 else (1, 2), 
+    globalDrivingRegion='', absoluteExteriorTolerance=None, exteriorTolerance=0.05, localCsys=None)
+ #
+ jobname='demo_PlateWithHole_sub'
+ mdb.Job(name=jobname, model='Model-Sub', description='', type=ANALYSIS, 
+    atTime=None, waitMinutes=0, waitHours=0, queue=None, memory=90, 
+    memoryUnits=PERCENTAGE, getMemoryFromAnalysis=True, 
+    explicitPrecision=SINGLE, nodalOutputPrecision=FULL, echoPrint=OFF, 
+    modelPrint=OFF, contactPrint=OFF, historyPrint=OFF, userSubroutine='', 
+    scratch='', resultsFormat=ODB, multiprocessingMode=DEFAULT, numCpus=2, 
+    numDomains=2, numGPUs=0)
+ mdb.saveAs(pathName=os.path.join(os.getcwd(), 'demo_PlateWithHole'))
+ if param['run']:
+  tm.phase('SUBMODEL SOLVE')
+  mdb.jobs[jobname].submit(consistencyChecking=OFF)	
+  mdb.jobs[jobname].waitForCompletion()
+ else:
+  tm.phase('SUBMODEL WRITE INPUT')
+  mdb.jobs[jobname].writeInput(consistencyChecking=OFF)
+
  
 # POST
 #---------------------------------------------------------------------------- 
+tm.phase('POST')
 if param['run']:
  o3 = session.openOdb(name=os.path.join(os.getcwd(), jobname+'.odb'))
  session.viewports['Viewport: 1'].setValues(displayedObject=o3)
@@ -190,5 +306,10 @@ if param['run']:
  session.viewports['Viewport: 1'].odbDisplay.setPrimaryVariable(variableLabel='S', 
     outputPosition=INTEGRATION_POINT, refinement=(COMPONENT, 'S11'), )
  session.viewports['Viewport: 1'].makeCurrent()
+ #stress concentration at the hole: peak von Mises, gradient along the ligament (fidelity.py indicators)
+ inst = o3.rootAssembly.instances['SAMPLE']
+ fS = o3.steps['demo_TensileTest'].frames[-1].fieldOutputs['S']; lab, S, xyz = nodal_field(fS, inst)
+ res = hole_stress(xyz, mises(S, fS.componentLabels), (0., 0.), param['rad'], param['subselt'] if param['submodel'] else hmesh, thickness=param['dim'][2])
+ save_results('demo_PlateWithHole', idim=param['idim'], nodes=len(inst.nodes), submodel=param['submodel'], **res)
 
- 
\ No newline at end of file
+tm.save()